@@ -0,0 +1,1851 @@
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+import copy, functools, hashlib, json, os, re
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# SVI-JW params as exchanged with api/v1 (see to_SVI / to_SVIJW in OptionQuantLibClientAPI)
+SVIJW_KEYS = ["vol", "skew", "pWing", "cWing", "minVol", "tau", "forward"]
+SVI_KEYS = ["a", "b", "rho", "m", "sigma", "tau", "forward"]
+
+# default max abs vol difference of check_SVIJWLocal (local evaluation vs api/v1/SVIJW_*Money) and of the check_SVIArb g / calendar tests
+SVI_TOLERANCE = 1e-8
+# |beta|, |m|, b below this are treated as zero by the SVI <-> SVI-JW conversions
+SVI_DEGENERATE = 1e-12
+
+# helper functions
+def mergeDict(d1, d2):
+
+    return {k:v for k,v in list(d1.items())+list(d2.items())}
+
+def stack_params(params, keys):
+
+    # accept one params dict, a list of params dicts, a dict of lists or a DataFrame
+    if isinstance(params, pd.DataFrame):
+        return {k: params[k].to_numpy(dtype=float) for k in keys}
+
+    if isinstance(params, dict):
+        return {k: np.atleast_1d(np.asarray(params[k], dtype=float)) for k in keys}
+
+    return {k: np.array([p[k] for p in params], dtype=float) for k in keys}
+
+def _degenerateSVI(bad, reason):
+
+    if np.any(bad):
+        raise ValueError("degenerate SVI slice {}: {}".format(np.nonzero(bad)[0].tolist(), reason))
+
+def SVIJW_to_SVI(paramsSVIJW):
+
+    p = stack_params(paramsSVIJW, SVIJW_KEYS)
+    tau = p["tau"]
+    _degenerateSVI(~(tau > 0) | ~(p["vol"] > 0) | ~(p["minVol"] > 0), "tau, vol and minVol must be positive")
+    _degenerateSVI(~(p["pWing"] >= 0) | ~(p["cWing"] >= 0), "negative wing")
+
+    # Gatheral & Jacquier (2014), SVI-JW -> raw SVI; a flat smile (no wings, no skew, vol = minVol) maps to b = 0
+    v = p["vol"] ** 2
+    vMin = p["minVol"] ** 2
+    w = v * tau
+    sqrtW = np.sqrt(w)
+
+    b = 0.5 * sqrtW * (p["cWing"] + p["pWing"])
+    flat = b < SVI_DEGENERATE
+    _degenerateSVI(flat & ((np.abs(p["skew"]) > SVI_DEGENERATE) | (np.abs(v - vMin) * tau > SVI_DEGENERATE)), "no wings but skew or vol above minVol")
+    safeB = np.where(flat, 1.0, b)
+    rho = np.where(flat, 0.0, 1 - p["pWing"] * sqrtW / safeB)
+    beta = np.where(flat, 1.0, rho - 2 * p["skew"] * sqrtW / safeB)
+    _degenerateSVI(np.abs(beta) > 1, "|beta| > 1, the smile has no minimum")
+    # beta = 0 puts the smile minimum at infinity, m = 0 (vol = minVol) leaves sigma undetermined
+    _degenerateSVI(~flat & (np.abs(beta) < SVI_DEGENERATE), "beta = 0")
+    _degenerateSVI(~flat & (np.abs(v - vMin) * tau < SVI_DEGENERATE), "vol = minVol gives m = 0")
+
+    safeBeta = np.where(flat, 1.0, beta)
+    alpha = np.sign(safeBeta) * np.sqrt(np.maximum(1 / safeBeta ** 2 - 1, 0.0))
+    denom = b * (-rho + np.sign(alpha) * np.sqrt(1 + alpha ** 2) - alpha * np.sqrt(1 - rho ** 2))
+    _degenerateSVI(~flat & (np.abs(denom) < SVI_DEGENERATE), "m undetermined")
+    m = np.where(flat, 0.0, (v - vMin) * tau / np.where(flat, 1.0, denom))
+    sigma = alpha * m
+    a = vMin * tau - b * sigma * np.sqrt(1 - rho ** 2)
+
+    return {"a": a, "b": b, "rho": rho, "m": m, "sigma": sigma, "tau": tau, "forward": p["forward"]}
+
+def SVI_to_SVIJW(paramsSVI):
+
+    p = stack_params(paramsSVI, SVI_KEYS)
+    a, b, rho, m, sigma, tau = p["a"], p["b"], p["rho"], p["m"], p["sigma"], p["tau"]
+    _degenerateSVI(~(tau > 0) | ~(b >= 0) | ~(np.abs(rho) < 1) | ~(sigma >= 0), "needs tau > 0, b >= 0, |rho| < 1, sigma >= 0")
+
+    root = np.sqrt(m ** 2 + sigma ** 2)
+    w = a + b * (-rho * m + root)
+    _degenerateSVI(~(w > 0), "ATM total variance <= 0")
+    _degenerateSVI((b >= SVI_DEGENERATE) & (root < SVI_DEGENERATE), "m = sigma = 0, the ATM skew is undefined")
+    root = np.where(root < SVI_DEGENERATE, 1.0, root)
+    sqrtW = np.sqrt(w)
+
+    return {"vol": np.sqrt(w / tau),
+            "skew": 0.5 * b / sqrtW * (rho - m / root),
+            "pWing": b * (1 - rho) / sqrtW,
+            "cWing": b * (1 + rho) / sqrtW,
+            "minVol": np.sqrt((a + b * sigma * np.sqrt(1 - rho ** 2)) / tau),
+            "tau": tau,
+            "forward": p["forward"]}
+
+def calc_SVITotalVariance(logMoneyness, paramsSVI):
+
+    p = stack_params(paramsSVI, SVI_KEYS)
+    k = np.asarray(logMoneyness, dtype=float)
+    if k.ndim < 2:
+        k = np.broadcast_to(np.atleast_1d(k), (len(p["tau"]), np.atleast_1d(k).size))
+
+    x = k - p["m"][:, None]
+
+    return p["a"][:, None] + p["b"][:, None] * (p["rho"][:, None] * x + np.sqrt(x ** 2 + p["sigma"][:, None] ** 2))
+
+def _moneynessToLogFwd(moneyness, forward, moneynessType):
+
+    k = np.asarray(moneyness, dtype=float)
+    if k.ndim < 2:
+        k = np.broadcast_to(np.atleast_1d(k), (len(forward), np.atleast_1d(k).size))
+
+    # "forward" in the SVI params is the forward as a ratio of spot
+    if moneynessType == "spot":
+        return np.log(k / forward[:, None])
+    else:
+        return np.log(k)
+
+def calc_SVIVol(moneyness, paramsSVI, moneynessType="fwd"):
+
+    p = stack_params(paramsSVI, SVI_KEYS)
+    k = _moneynessToLogFwd(moneyness, p["forward"], moneynessType)
+    w = calc_SVITotalVariance(k, p)
+
+    return np.sqrt(np.maximum(w, 0.0) / p["tau"][:, None])
+
+def calc_SVIJWVol(moneyness, paramsSVIJW, moneynessType="fwd"):
+
+    # moneyness: (nK,) shared by all tenors or (nTenor, nK); returns vols of shape (nTenor, nK)
+    return calc_SVIVol(moneyness, SVIJW_to_SVI(paramsSVIJW), moneynessType)
+
+def calc_SVIJW_SpotMoneyLocal(moneyness, paramsSVI):
+
+    return calc_SVIJWVol(moneyness, paramsSVI, "spot")
+
+def calc_SVIJW_FwdMoneyLocal(moneyness, paramsSVI):
+
+    return calc_SVIJWVol(moneyness, paramsSVI, "fwd")
+
+# Black-Scholes helper functions
+VEGA_SCALE = 0.01           # vega per 1 vol point
+THETA_SCALE = 1.0 / 365     # theta per calendar day
+RHO_SCALE = 0.01            # rho per 1% rate move
+DAY_COUNT = 365.0
+
+def norm_pdf(x):
+
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+def norm_cdf(x):
+
+    # Hart (1968) double precision approximation, see West (2005)
+    x = np.asarray(x, dtype=float)
+    xAbs = np.abs(x)
+    expo = np.exp(-0.5 * xAbs * xAbs)
+
+    num = 3.52624965998911e-02 * xAbs + 0.700383064443688
+    for c in [6.37396220353165, 33.912866078383, 112.079291497871, 221.213596169931, 220.206867912376]:
+        num = num * xAbs + c
+    den = 8.83883476483184e-02 * xAbs + 1.75566716318264
+    for c in [16.064177579207, 86.7807322029461, 296.564248779674, 637.333633378831, 793.826512519948, 440.413735824752]:
+        den = den * xAbs + c
+    tail = xAbs + 0.65
+    for c in [4.0, 3.0, 2.0, 1.0]:
+        tail = xAbs + c / tail
+
+    cdf = np.where(xAbs < 7.07106781186547, expo * num / den, expo / tail / 2.506628274631)
+    cdf = np.where(xAbs > 37, 0.0, cdf)
+
+    return np.where(x > 0, 1 - cdf, cdf)
+
+def to_date(d):
+
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return datetime.strptime(str(d).split("T")[0], "%Y-%m-%d").date()
+
+def year_fraction(fromDate, toDate):
+
+    return (to_date(toDate) - to_date(fromDate)).days / DAY_COUNT
+
+def interp_yieldCurve(yieldCurve, tau):
+
+    # yieldCurve as returned by get_yieldCurve: {"currency": ..., "yieldCurve": {yearFrac: rate}}
+    curve = yieldCurve["yieldCurve"] if "yieldCurve" in yieldCurve.keys() else yieldCurve
+    t = np.array([float(k) for k in curve.keys()])
+    r = np.array([float(v) for v in curve.values()])
+    order = np.argsort(t)
+
+    return np.interp(tau, t[order], r[order])
+
+def interp_repoCurve(repoCurve, valueDate, tau):
+
+    # repoCurve as returned by get_repo: {"undlName": ..., "Schedule": {date: rate}}
+    schedule = repoCurve["Schedule"] if "Schedule" in repoCurve.keys() else repoCurve
+    if len(schedule) == 0:
+        return np.zeros_like(np.asarray(tau, dtype=float))
+
+    t = np.array([year_fraction(valueDate, d) for d in schedule.keys()])
+    r = np.array([float(v) for v in schedule.values()])
+    order = np.argsort(t)
+
+    return np.interp(tau, t[order], r[order])
+
+def div_schedule(divCurve, valueDate):
+
+    # divCurve as returned by get_dividend: {"undlName": ..., "Schedule": {date: {"value": cash, "type": ...}}}
+    schedule = divCurve["Schedule"] if "Schedule" in divCurve.keys() else divCurve
+    t = np.array([year_fraction(valueDate, d) for d in schedule.keys()], dtype=float)
+    amount = np.array([float(v["value"]) if isinstance(v, dict) else float(v) for v in schedule.values()], dtype=float)
+    keep = t > 0
+    order = np.argsort(t[keep])
+
+    return t[keep][order], amount[keep][order]
+
+def pv_dividends(tau, rate, divTimes, divAmounts):
+
+    # PV of cash dividends paid before expiry, divTimes/divAmounts of shape (nDiv,) or (nOpt, nDiv)
+    tau = np.atleast_1d(np.asarray(tau, dtype=float))
+    if divTimes is None or np.size(divTimes) == 0:
+        return np.zeros_like(tau)
+
+    divTimes = np.asarray(divTimes, dtype=float)
+    divAmounts = np.asarray(divAmounts, dtype=float)
+    if divTimes.ndim == 1:
+        divTimes = np.broadcast_to(divTimes, (len(tau), len(divTimes)))
+        divAmounts = np.broadcast_to(divAmounts, divTimes.shape)
+    rate = np.broadcast_to(np.asarray(rate, dtype=float), tau.shape)
+
+    paid = (divTimes > 0) & (divTimes <= tau[:, None])
+
+    return np.sum(np.where(paid, divAmounts * np.exp(-rate[:, None] * divTimes), 0.0), axis=1)
+
+def _black(forward, strike, stdev, df, isCall):
+
+    stdev = np.maximum(stdev, 1e-12)
+    d1 = np.log(forward / strike) / stdev + 0.5 * stdev
+    d2 = d1 - stdev
+    omega = np.where(isCall, 1.0, -1.0)
+    npv = df * omega * (forward * norm_cdf(omega * d1) - strike * norm_cdf(omega * d2))
+
+    return npv, d1, d2, omega
+
+def calc_BlackArrays(forward, strike, tau, df, growth, vol, isCall, calcWhat=["NPV"]):
+
+    # price and spot Greeks from precomputed forwards / discount factors, growth = dForward / dSpot
+    sqrtTau = np.sqrt(np.maximum(tau, 0.0))
+    npv, d1, d2, omega = _black(forward, strike, vol * sqrtTau, df, isCall)
+
+    result = {}
+    if "NPV" in calcWhat:
+        result["NPV"] = npv
+    if "forward" in calcWhat:
+        result["forward"] = np.broadcast_to(forward, npv.shape)
+    if "delta" in calcWhat:
+        result["delta"] = omega * norm_cdf(omega * d1) * df * growth
+    if "gamma" in calcWhat:
+        result["gamma"] = norm_pdf(d1) * df * growth ** 2 / (forward * np.maximum(vol * sqrtTau, 1e-12))
+    if "vega" in calcWhat:
+        result["vega"] = df * forward * norm_pdf(d1) * sqrtTau * VEGA_SCALE
+
+    return result
+
+def calc_EuropeanArrays(spot, strike, tau, rate, repo, vol, isCall, divTimes=None, divAmounts=None, calcWhat=["NPV"]):
+
+    # escrowed dividend Black-Scholes on column arrays, one option per row
+    spot, strike, tau, rate, repo, vol, isCall = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype=float)) for x in [spot, strike, tau, rate, repo, vol, isCall]])
+    isCall = isCall.astype(bool)
+
+    pvDiv = pv_dividends(tau, rate, divTimes, divAmounts)
+    growth = np.exp((rate - repo) * tau)
+    df = np.exp(-rate * tau)
+    forward = (spot - pvDiv) * growth
+
+    result = calc_BlackArrays(forward, strike, tau, df, growth, vol, isCall, calcWhat + ["NPV"])
+    npv = result["NPV"] if "NPV" in calcWhat else result.pop("NPV")
+    if "theta" in calcWhat:
+        shiftTimes = None if divTimes is None else np.asarray(divTimes, dtype=float) - THETA_SCALE
+        tauShift = np.maximum(tau - THETA_SCALE, 0.0)
+        npvShift = calc_EuropeanArrays(spot, strike, tauShift, rate, repo, vol, isCall, shiftTimes, divAmounts, ["NPV"])["NPV"]
+        result["theta"] = npvShift - npv
+    if "rho" in calcWhat:
+        npvShift = calc_EuropeanArrays(spot, strike, tau, rate + RHO_SCALE, repo, vol, isCall, divTimes, divAmounts, ["NPV"])["NPV"]
+        result["rho"] = npvShift - npv
+
+    return result
+
+# European params helper functions
+def flatten_params(params):
+
+    # accept the flat params dict or the {"specs": ..., "marketData": ...} layout of the pricer log
+    if "specs" in params.keys():
+        return mergeDict(params["specs"], params.get("marketData", {}))
+    return params
+
+def _getParam(params, keys, default=None):
+
+    for k in keys:
+        if k in params.keys() and params[k] is not None and params[k] != "None":
+            return params[k]
+    return default
+
+def params_to_columns(paramsList):
+
+    # convert European/American params dicts into column arrays for calc_EuropeanArrays;
+    # curves shared by reference across params are parsed once
+    cols = {"spot": [], "strike": [], "tau": [], "rate": [], "repo": [], "vol": [], "isCall": [], "divTimes": [], "divAmounts": []}
+    curves = {}
+
+    def curve(kind, obj, valueDate):
+        key = (kind, id(obj), str(valueDate))
+        if key not in curves.keys():
+            if kind == "yieldCurve":
+                yieldCurve = YieldCurve(obj)
+                curves[key] = (yieldCurve.pillars, yieldCurve.zeroRates)
+            elif kind == "repoCurve":
+                curves[key] = RepoCurve(obj, valueDate)
+            else:
+                curves[key] = div_schedule(obj, valueDate)
+        return curves[key]
+
+    for params in paramsList:
+        p = flatten_params(params)
+        valueDate = _getParam(p, ["valueDate"])
+        tau = _getParam(p, ["tau"])
+        if tau is None:
+            tau = year_fraction(valueDate, _getParam(p, ["maturity", "maturityDate"]))
+        tau = float(tau)
+
+        rate = _getParam(p, ["rate"])
+        if rate is None:
+            rate = np.interp(tau, *curve("yieldCurve", p["yieldCurve"], valueDate)) if "yieldCurve" in p.keys() else 0.0
+        repo = _getParam(p, ["repo"])
+        if repo is None:
+            repo = curve("repoCurve", p["repoCurve"], valueDate).rate(tau) if "repoCurve" in p.keys() else 0.0
+
+        divCurve = _getParam(p, ["divCurve"])
+        if divCurve is not None:
+            divTimes, divAmounts = curve("divCurve", divCurve, valueDate)
+        else:
+            divTimes, divAmounts = np.array([]), np.array([])
+
+        cols["spot"].append(float(_getParam(p, ["spotRef", "spot"])))
+        cols["strike"].append(float(_getParam(p, ["strike", "strike$"])))
+        cols["tau"].append(tau)
+        cols["rate"].append(float(rate))
+        cols["repo"].append(float(repo))
+        cols["vol"].append(float(_getParam(p, ["vol"], np.nan)))
+        cols["isCall"].append(str(p["optionType"]).upper().startswith("C"))
+        cols["divTimes"].append(divTimes)
+        cols["divAmounts"].append(divAmounts)
+
+    # pad dividend schedules to a rectangular (nOpt, nDiv) block
+    nDiv = max([len(d) for d in cols["divTimes"]] + [0])
+    divTimes = np.zeros((len(paramsList), nDiv))
+    divAmounts = np.zeros((len(paramsList), nDiv))
+    for i, (t, a) in enumerate(zip(cols["divTimes"], cols["divAmounts"])):
+        divTimes[i, :len(t)] = t
+        divAmounts[i, :len(a)] = a
+
+    result = {k: np.array(v, dtype=float) for k, v in cols.items() if k not in ["isCall", "divTimes", "divAmounts"]}
+    result["isCall"] = np.array(cols["isCall"], dtype=bool)
+    result["divTimes"] = divTimes
+    result["divAmounts"] = divAmounts
+
+    return result
+
+def params_to_curves(paramsList):
+
+    # zero rate functions of year fraction per option for the American grid, None where the params carry a flat rate / repo or no curve;
+    # one function per curve shared by reference, so options on the same curves still price on one grid
+    curves = {"rate": np.empty(len(paramsList), dtype=object), "repo": np.empty(len(paramsList), dtype=object)}
+    parsed = {}
+
+    for i, params in enumerate(paramsList):
+        p = flatten_params(params)
+        valueDate = _getParam(p, ["valueDate"])
+        if _getParam(p, ["rate"]) is None and "yieldCurve" in p.keys():
+            key = ("yieldCurve", id(p["yieldCurve"]))
+            if key not in parsed.keys():
+                yieldCurve = YieldCurve(p["yieldCurve"])
+                # zero rates linear in tau like the params_to_columns rate, so a curve and its flat rate agree at maturity
+                parsed[key] = functools.partial(np.interp, xp=yieldCurve.pillars, fp=yieldCurve.zeroRates)
+            curves["rate"][i] = parsed[key]
+        if _getParam(p, ["repo"]) is None and "repoCurve" in p.keys():
+            key = ("repoCurve", id(p["repoCurve"]), str(valueDate))
+            if key not in parsed.keys():
+                parsed[key] = RepoCurve(p["repoCurve"], valueDate).rate
+            curves["repo"][i] = parsed[key]
+
+    return curves
+
+def calc_EuropeanBatch(paramsList, calcWhat=["NPV"]):
+
+    cols = params_to_columns(paramsList)
+
+    return calc_EuropeanArrays(calcWhat=calcWhat, **cols)
+
+def calc_EuropeanLocal(params, calcWhat=["NPV"]):
+
+    # drop-in for calc_European(params, calcWhat), params is not modified
+    result = calc_EuropeanBatch([params], calcWhat)
+
+    return {k: float(v[0]) for k, v in result.items()}
+
+# American tree helper functions
+def pv_dividendsBetween(t, tau, rate, divTimes, divAmounts):
+
+    # PV as of time t of cash dividends paid in (t, tau], per option
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    tau = np.broadcast_to(np.asarray(tau, dtype=float), t.shape)
+    if divTimes is None or np.size(divTimes) == 0:
+        return np.zeros_like(t)
+
+    divTimes = np.asarray(divTimes, dtype=float)
+    divAmounts = np.asarray(divAmounts, dtype=float)
+    if divTimes.ndim == 1:
+        divTimes = np.broadcast_to(divTimes, (len(t), len(divTimes)))
+        divAmounts = np.broadcast_to(divAmounts, divTimes.shape)
+    rate = np.broadcast_to(np.asarray(rate, dtype=float), t.shape)
+
+    paid = (divTimes > t[:, None]) & (divTimes <= tau[:, None])
+
+    return np.sum(np.where(paid, divAmounts * np.exp(-rate[:, None] * (divTimes - t[:, None])), 0.0), axis=1)
+
+def calc_AmericanTreeArrays(spot, strike, tau, rate, repo, vol, isCall, divTimes=None, divAmounts=None, nSteps=200):
+
+    # escrowed dividend binomial tree, vectorized across options (one tree per row, same number of steps);
+    # nodes are centred on the forward so p stays inside (0, 1) at low vol, where a plain CRR tree would need clipping
+    spot, strike, tau, rate, repo, vol, isCall = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype=float)) for x in [spot, strike, tau, rate, repo, vol, isCall]])
+    omega = np.where(isCall.astype(bool), 1.0, -1.0)
+
+    tauSafe = np.maximum(tau, 1e-8)
+    dt = tauSafe / nSteps
+    logU = np.maximum(vol, 1e-8) * np.sqrt(dt)
+    p = (1 - np.exp(-logU)) / (np.exp(logU) - np.exp(-logU))
+    disc = np.exp(-rate * dt)
+
+    sStar0 = spot - pv_dividends(tauSafe, rate, divTimes, divAmounts)
+    drift = ((rate - repo) * dt)[:, None]
+    logU = logU[:, None]
+
+    j = np.arange(nSteps + 1)
+    values = np.maximum(omega[:, None] * (sStar0[:, None] * np.exp(drift * nSteps + logU * (2 * j - nSteps)) - strike[:, None]), 0.0)
+
+    for i in range(nSteps - 1, -1, -1):
+        values = disc[:, None] * (p[:, None] * values[:, 1:i + 2] + (1 - p[:, None]) * values[:, :i + 1])
+        s = sStar0[:, None] * np.exp(drift * i + logU * (2 * j[:i + 1] - i)) + pv_dividendsBetween(i * dt, tauSafe, rate, divTimes, divAmounts)[:, None]
+        values = np.maximum(values, omega[:, None] * (s - strike[:, None]))
+
+    return np.where(tau > 0, values[:, 0], np.maximum(omega * (spot - strike), 0.0))
+
+# implied vol helper functions
+IV_TOLERANCE = 1e-8     # implied vol tolerance
+IV_MAX_ITER = 50
+IV_MIN_VOL = 1e-4
+IV_MAX_VOL = 5.0
+
+def calc_EuropeanImpliedVolArrays(price, spot, strike, tau, rate, repo, isCall, divTimes=None, divAmounts=None,
+                                  tolerance=IV_TOLERANCE, maxIter=IV_MAX_ITER):
+
+    # safeguarded Newton on the undiscounted Black price: Newton steps falling outside the bracket are replaced by bisection
+    price, spot, strike, tau, rate, repo, isCall = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype=float)) for x in [price, spot, strike, tau, rate, repo, isCall]])
+    isCall = isCall.astype(bool)
+    omega = np.where(isCall, 1.0, -1.0)
+
+    df = np.exp(-rate * tau)
+    forward = (spot - pv_dividends(tau, rate, divTimes, divAmounts)) * np.exp((rate - repo) * tau)
+    target = price / df
+    sqrtTau = np.sqrt(np.maximum(tau, 1e-12))
+
+    # no-arbitrage bounds of the undiscounted price
+    lower = np.maximum(omega * (forward - strike), 0.0)
+    upper = np.where(isCall, forward, strike)
+    valid = (target > lower) & (target < upper) & (tau > 0)
+
+    # Brenner-Subrahmanyam / Corrado-Miller style initial guess
+    mid = 0.5 * (forward + strike)
+    timeValue = target - lower
+    guess = np.sqrt(2 * np.pi) / sqrtTau * np.maximum(timeValue, 1e-12) / mid
+    vol = np.clip(guess, 0.05, 2.0)
+    lo = np.full_like(vol, IV_MIN_VOL)
+    hi = np.full_like(vol, IV_MAX_VOL)
+
+    converged = ~valid
+    iterations = np.zeros(vol.shape, dtype=int)
+
+    for it in range(maxIter):
+        active = ~converged
+        if not np.any(active):
+            break
+
+        stdev = vol[active] * sqrtTau[active]
+        model, d1, d2, om = _black(forward[active], strike[active], stdev, 1.0, isCall[active])
+        diff = model - target[active]
+        vega = forward[active] * norm_pdf(d1) * sqrtTau[active]
+
+        done = (np.abs(diff) < tolerance * vega) | (hi[active] - lo[active] < tolerance)
+        iterations[active] += 1
+
+        lo[active] = np.where(diff < 0, vol[active], lo[active])
+        hi[active] = np.where(diff > 0, vol[active], hi[active])
+        step = vol[active] - diff / np.maximum(vega, 1e-300)
+        outside = (step <= lo[active]) | (step >= hi[active]) | ~np.isfinite(step)
+        newVol = np.where(outside, 0.5 * (lo[active] + hi[active]), step)
+
+        vol[active] = np.where(done, vol[active], newVol)
+        converged[active] = done
+
+    vol = np.where(valid & converged, vol, np.nan)
+
+    return {"vol": vol, "converged": valid & converged, "iterations": iterations}
+
+def calc_AmericanImpliedVolArrays(price, spot, strike, tau, rate, repo, isCall, divTimes=None, divAmounts=None,
+                                  tolerance=IV_TOLERANCE, maxIter=IV_MAX_ITER, pricer=None):
+
+    # Illinois regula falsi on the batched American pricer, bracket capped by the European implied vol
+    price, spot, strike, tau, rate, repo, isCall = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype=float)) for x in [price, spot, strike, tau, rate, repo, isCall]])
+    isCall = isCall.astype(bool)
+    omega = np.where(isCall, 1.0, -1.0)
+
+    if pricer is None:
+        pricer = calc_AmericanTreeArrays
+
+    def price_rows(rows, vol):
+        dt, da = divTimes, divAmounts
+        if dt is not None and np.ndim(dt) == 2:
+            dt, da = np.asarray(dt)[rows], np.asarray(da)[rows]
+        return pricer(spot[rows], strike[rows], tau[rows], rate[rows], repo[rows], vol, isCall[rows], dt, da)
+
+    european = calc_EuropeanImpliedVolArrays(price, spot, strike, tau, rate, repo, isCall, divTimes, divAmounts, tolerance, maxIter)
+    scale = np.maximum(spot, 1e-12)
+    valid = (price > np.maximum(omega * (spot - strike), 0.0)) & (tau > 0)
+
+    rows = np.arange(len(price))[valid]
+    lo = np.full(len(rows), IV_MIN_VOL)
+    hi = np.where(np.isfinite(european["vol"][rows]), np.minimum(european["vol"][rows] * 1.05 + 0.01, IV_MAX_VOL), IV_MAX_VOL)
+    fLo = price_rows(rows, lo) - price[rows]
+    fHi = price_rows(rows, hi) - price[rows]
+
+    vol = np.full(len(price), np.nan)
+    converged = np.zeros(len(price), dtype=bool)
+    iterations = np.zeros(len(price), dtype=int)
+
+    bracketed = (fLo <= 0) & (fHi >= 0)
+    rows, lo, hi, fLo, fHi = rows[bracketed], lo[bracketed], hi[bracketed], fLo[bracketed], fHi[bracketed]
+    side = np.zeros(len(rows), dtype=int)
+
+    for it in range(maxIter):
+        if len(rows) == 0:
+            break
+
+        x = np.where(fHi != fLo, hi - fHi * (hi - lo) / np.where(fHi != fLo, fHi - fLo, 1.0), 0.5 * (lo + hi))
+        fx = price_rows(rows, x) - price[rows]
+        iterations[rows] += 1
+
+        done = (np.abs(fx) < 1e-12 * scale[rows]) | (hi - lo < tolerance)
+        vol[rows[done]] = x[done]
+        converged[rows[done]] = True
+
+        # Illinois modification halves the stale end point when the same side is kept twice
+        up = fx > 0
+        fLo = np.where(up, np.where(side == 1, 0.5 * fLo, fLo), fx)
+        fHi = np.where(up, fx, np.where(side == -1, 0.5 * fHi, fHi))
+        lo = np.where(up, lo, x)
+        hi = np.where(up, x, hi)
+        side = np.where(up, 1, -1)
+
+        keep = ~done
+        rows, lo, hi, fLo, fHi, side = rows[keep], lo[keep], hi[keep], fLo[keep], fHi[keep], side[keep]
+
+    return {"vol": vol, "converged": converged, "iterations": iterations}
+
+# option chain implied vol
+CHAIN_COLUMNS = {"maturity": "maturity", "strike": "strike", "optionType": "optionType", "price": "mid"}
+
+def chain_to_frame(optionChainData, columns=CHAIN_COLUMNS):
+
+    # option chain quotes as a DataFrame; accepts a DataFrame, a list of quote records or a dict holding them under "data"
+    if isinstance(optionChainData, pd.DataFrame):
+        frame = optionChainData.copy()
+    elif isinstance(optionChainData, dict) and "data" in optionChainData.keys():
+        frame = pd.DataFrame(optionChainData["data"])
+    else:
+        frame = pd.DataFrame(optionChainData)
+
+    return frame.rename(columns={v: k for k, v in columns.items() if v != k})
+
+def solve_chainImpliedVol(optionChainData, spotRef=None, valueDate=None, yieldCurve=None, divCurve=None, repoCurve=None,
+                          exerciseType="European", columns=CHAIN_COLUMNS, tolerance=IV_TOLERANCE, maxIter=IV_MAX_ITER):
+
+    # re-mark a full option chain at once; market data defaults to the fields carried by the chain dict
+    chainInfo = optionChainData if isinstance(optionChainData, dict) else {}
+    spotRef = float(_getParam(chainInfo, ["spotRef", "spot"]) if spotRef is None else spotRef)
+    valueDate = _getParam(chainInfo, ["valueDate"]) if valueDate is None else valueDate
+    yieldCurve = _getParam(chainInfo, ["yieldCurve"]) if yieldCurve is None else yieldCurve
+    divCurve = _getParam(chainInfo, ["divCurve"]) if divCurve is None else divCurve
+    repoCurve = _getParam(chainInfo, ["repoCurve"]) if repoCurve is None else repoCurve
+
+    frame = chain_to_frame(optionChainData, columns)
+    tau = np.array([year_fraction(valueDate, m) for m in frame["maturity"]])
+    rate = interp_yieldCurve(yieldCurve, tau) if yieldCurve is not None else np.zeros_like(tau)
+    repo = interp_repoCurve(repoCurve, valueDate, tau) if repoCurve is not None else np.zeros_like(tau)
+    divTimes, divAmounts = div_schedule(divCurve, valueDate) if divCurve is not None else (None, None)
+    isCall = np.array([str(x).upper().startswith("C") for x in frame["optionType"]])
+
+    solver = calc_AmericanImpliedVolArrays if exerciseType == "American" else calc_EuropeanImpliedVolArrays
+    result = solver(frame["price"].to_numpy(dtype=float), spotRef, frame["strike"].to_numpy(dtype=float), tau, rate, repo, isCall,
+                    divTimes, divAmounts, tolerance, maxIter)
+
+    frame["impliedVol"] = result["vol"]
+    frame["converged"] = result["converged"]
+    frame["iterations"] = result["iterations"]
+
+    return frame
+
+# American finite difference engine
+AMERICAN_PRESETS = {"fast": {"nSpace": 120, "nTime": 60},
+                    "standard": {"nSpace": 250, "nTime": 150},
+                    "accurate": {"nSpace": 500, "nTime": 400}}
+
+def solve_tridiagonal(lower, diag, upper, rhs):
+
+    # Thomas algorithm along axis 0, batched over the remaining axes (one system per column)
+    n = diag.shape[0]
+    c = np.empty_like(diag)
+    d = np.empty_like(rhs)
+    c[0] = upper[0] / diag[0]
+    d[0] = rhs[0] / diag[0]
+    for i in range(1, n):
+        m = diag[i] - lower[i] * c[i - 1]
+        c[i] = upper[i] / m
+        d[i] = (rhs[i] - lower[i] * d[i - 1]) / m
+
+    x = np.empty_like(rhs)
+    x[-1] = d[-1]
+    for i in range(n - 2, -1, -1):
+        x[i] = d[i] - c[i] * x[i + 1]
+
+    return x
+
+def _zeroRateFn(rate):
+
+    # rate can be a flat number or a zero rate function of year fraction
+    if callable(rate):
+        return rate
+    return lambda t: np.full_like(np.asarray(t, dtype=float), float(rate))
+
+def _forwardRate(zeroFn, t1, t2):
+
+    if t2 - t1 < 1e-12:
+        return float(zeroFn(np.array(t2)))
+    return float((zeroFn(np.array(t2)) * t2 - zeroFn(np.array(t1)) * t1) / (t2 - t1))
+
+AMERICAN_MEASURES = ["NPV", "forward", "delta", "gamma", "vega", "theta", "rho"]
+
+def calc_expiredArrays(spot, strike, isCall, calcWhat=["NPV"]):
+
+    # options at or past expiry: intrinsic NPV, forward = spot, delta of the exercised position, zero gamma / vega / theta / rho
+    spot, strike, isCall = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in [spot, strike, isCall]])
+    omega = np.where(isCall.astype(bool), 1.0, -1.0)
+    npv = np.maximum(omega * (spot - strike), 0.0)
+    expired = {"NPV": npv, "forward": spot.copy(), "delta": np.where(omega * (spot - strike) > 0, omega, 0.0)}
+
+    return {k: expired.get(k, np.zeros_like(npv)) for k in AMERICAN_MEASURES if k in calcWhat}
+
+def calc_AmericanFDArrays(spot, strike, tau, vol, isCall, rate=0.0, repo=0.0, divTimes=None, divAmounts=None,
+                          preset="standard", nSpace=None, nTime=None, nStdev=5.0, rannacherSteps=2, calcWhat=["NPV"]):
+
+    # Crank-Nicolson in log-spot with Rannacher start, all strikes of one maturity share the space/time grid
+    for k in calcWhat:
+        if k not in AMERICAN_MEASURES:
+            raise ValueError("unsupported American measure " + str(k))
+    grid = AMERICAN_PRESETS[preset]
+    nSpace = grid["nSpace"] if nSpace is None else nSpace
+    nTime = grid["nTime"] if nTime is None else nTime
+
+    strike, vol, isCall = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype=float)) for x in [strike, vol, isCall]])
+    omega = np.where(isCall.astype(bool), 1.0, -1.0)
+    spot, tau = float(spot), float(tau)
+    rateFn, repoFn = _zeroRateFn(rate), _zeroRateFn(repo)
+
+    if tau <= 0:
+        return calc_expiredArrays(spot, strike, isCall, calcWhat)
+
+    # space grid centred on spot, wide enough for every strike in the batch
+    half = nSpace // 2
+    width = nStdev * np.max(vol) * np.sqrt(tau)
+    width = max(width, np.max(np.abs(np.log(strike / spot))) + 0.5 * width)
+    dx = width / half
+    x = np.log(spot) + dx * (np.arange(nSpace + 1) - half)
+    s = np.exp(x)
+
+    # time grid in time-to-expiry, dividend dates are grid nodes
+    dividends = []
+    if divTimes is not None and np.size(divTimes) > 0:
+        dividends = [(tau - t, a) for t, a in zip(np.ravel(divTimes), np.ravel(divAmounts)) if 0 < t < tau and a != 0]
+    steps = np.union1d(np.linspace(0.0, tau, nTime + 1), [d[0] for d in dividends])
+    steps = steps[np.concatenate([[True], np.diff(steps) > 1e-10])]
+
+    payoff = np.maximum(omega[None, :] * (s[:, None] - strike[None, :]), 0.0)
+    values = payoff.copy()
+    var = vol[None, :] ** 2
+    interior = slice(1, nSpace)
+
+    for n in range(len(steps) - 1):
+        dtau = steps[n + 1] - steps[n]
+        # calendar interval [tau - steps[n+1], tau - steps[n]]
+        t1, t2 = tau - steps[n + 1], tau - steps[n]
+        r = _forwardRate(rateFn, max(t1, 0.0), t2)
+        q = _forwardRate(repoFn, max(t1, 0.0), t2)
+
+        mu = r - q - 0.5 * var
+        a = 0.5 * var / dx ** 2 - 0.5 * mu / dx
+        c = 0.5 * var / dx ** 2 + 0.5 * mu / dx
+        b = -var / dx ** 2 - r
+
+        theta = 1.0 if n < rannacherSteps else 0.5
+        shape = (nSpace - 1, len(strike))
+        lower = np.broadcast_to(-theta * dtau * a, shape).copy()
+        diag = np.broadcast_to(1 - theta * dtau * b, shape).copy()
+        upper = np.broadcast_to(-theta * dtau * c, shape).copy()
+
+        explicit = values[interior] + (1 - theta) * dtau * (a * values[:-2] + b * values[interior] + c * values[2:])
+
+        # boundaries held at exercise value
+        newValues = values.copy()
+        newValues[0] = payoff[0]
+        newValues[-1] = payoff[-1]
+        explicit[0] += theta * dtau * a[0] * newValues[0] if np.ndim(a) else theta * dtau * a * newValues[0]
+        explicit[-1] += theta * dtau * c[0] * newValues[-1] if np.ndim(c) else theta * dtau * c * newValues[-1]
+        lower[0] = 0.0
+        upper[-1] = 0.0
+
+        newValues[interior] = solve_tridiagonal(lower, diag, upper, explicit)
+        values = np.maximum(newValues, payoff)
+
+        # jump condition across a cash dividend: V(S, t-) = V(S - D, t+)
+        for divTau, divAmount in dividends:
+            if abs(divTau - steps[n + 1]) < 1e-10:
+                shifted = np.log(np.maximum(s - divAmount, s[0]))
+                pos = np.clip((shifted - x[0]) / dx, 0, nSpace - 1e-9)
+                i0 = np.floor(pos).astype(int)
+                w = (pos - i0)[:, None]
+                values = (1 - w) * values[i0] + w * values[np.minimum(i0 + 1, nSpace)]
+                values = np.maximum(values, payoff)
+
+    result = {}
+    if "NPV" in calcWhat:
+        result["NPV"] = values[half]
+    if "delta" in calcWhat or "gamma" in calcWhat:
+        dVdx = (values[half + 1] - values[half - 1]) / (2 * dx)
+        d2Vdx2 = (values[half + 1] - 2 * values[half] + values[half - 1]) / dx ** 2
+        if "delta" in calcWhat:
+            result["delta"] = dVdx / spot
+        if "gamma" in calcWhat:
+            result["gamma"] = (d2Vdx2 - dVdx) / spot ** 2
+    if "vega" in calcWhat:
+        bumped = calc_AmericanFDArrays(spot, strike, tau, vol + VEGA_SCALE, isCall, rate, repo, divTimes, divAmounts, preset, nSpace, nTime, nStdev, rannacherSteps)
+        result["vega"] = bumped["NPV"] - values[half]
+    if "theta" in calcWhat:
+        shiftTimes = None if divTimes is None else np.asarray(divTimes, dtype=float) - THETA_SCALE
+        bumped = calc_AmericanFDArrays(spot, strike, max(tau - THETA_SCALE, 0.0), vol, isCall, rate, repo, shiftTimes, divAmounts, preset, nSpace, nTime, nStdev, rannacherSteps)
+        result["theta"] = bumped["NPV"] - values[half]
+    if "rho" in calcWhat:
+        rateBump = (lambda t: rateFn(t) + RHO_SCALE) if callable(rate) else float(rate) + RHO_SCALE
+        bumped = calc_AmericanFDArrays(spot, strike, tau, vol, isCall, rateBump, repo, divTimes, divAmounts, preset, nSpace, nTime, nStdev, rannacherSteps)
+        result["rho"] = bumped["NPV"] - values[half]
+    if "forward" in calcWhat:
+        pvDiv = 0.0
+        if divTimes is not None and np.size(divTimes) > 0:
+            paid = [(t, a) for t, a in zip(np.ravel(divTimes), np.ravel(divAmounts)) if 0 < t <= tau]
+            pvDiv = sum(a * np.exp(-float(rateFn(np.array(t))) * t) for t, a in paid)
+        growth = np.exp((float(rateFn(np.array(tau))) - float(repoFn(np.array(tau)))) * tau)
+        result["forward"] = np.full(len(strike), (spot - pvDiv) * growth)
+
+    return {k: result[k] for k in AMERICAN_MEASURES if k in result.keys()}
+
+def calc_AmericanBatch(paramsList, calcWhat=["NPV"], preset="standard", **gridKwargs):
+
+    return calc_AmericanColumns(params_to_columns(paramsList), calcWhat, preset, params_to_curves(paramsList), **gridKwargs)
+
+def calc_AmericanColumns(cols, calcWhat=["NPV"], preset="standard", curves=None, **gridKwargs):
+
+    # options sharing spot, maturity, rate / repo curves and dividends are priced on one grid, cols as returned by params_to_columns;
+    # curves as returned by params_to_curves, without them (or where an entry is None) the grid runs on the flat cols rate / repo
+    for k in calcWhat:
+        if k not in AMERICAN_MEASURES:
+            raise ValueError("unsupported American measure " + str(k))
+    nOpt = len(cols["strike"])
+    rates = [cols["rate"][i] if curves is None or curves["rate"][i] is None else curves["rate"][i] for i in range(nOpt)]
+    repos = [cols["repo"][i] if curves is None or curves["repo"][i] is None else curves["repo"][i] for i in range(nOpt)]
+    groupKeys = [(cols["spot"][i], cols["tau"][i], id(rates[i]) if callable(rates[i]) else rates[i], id(repos[i]) if callable(repos[i]) else repos[i],
+                  cols["divTimes"][i].tobytes(), cols["divAmounts"][i].tobytes()) for i in range(nOpt)]
+
+    groups = {}
+    for i, key in enumerate(groupKeys):
+        groups.setdefault(key, []).append(i)
+
+    result = {k: np.full(nOpt, np.nan) for k in calcWhat}
+    for key, rows in groups.items():
+        rows = np.array(rows)
+        i = rows[0]
+        groupResult = calc_AmericanFDArrays(cols["spot"][i], cols["strike"][rows], cols["tau"][i], cols["vol"][rows], cols["isCall"][rows],
+                                            rates[i], repos[i], cols["divTimes"][i], cols["divAmounts"][i],
+                                            preset=preset, calcWhat=calcWhat, **gridKwargs)
+        for k, v in groupResult.items():
+            result[k][rows] = v
+
+    return result
+
+def calc_AmericanLocal(params, calcWhat=["NPV"], preset="standard"):
+
+    # drop-in for calc_American(params, calcWhat), params is not modified
+    result = calc_AmericanBatch([params], calcWhat, preset)
+
+    return {k: float(v[0]) for k, v in result.items()}
+
+
+# local SVI vol surface
+def freeze_surface(obj):
+
+    # read-only nested copy of a surface dict: dicts -> MappingProxyType, lists -> tuples
+    if isinstance(obj, Mapping):
+        return MappingProxyType({k: freeze_surface(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze_surface(v) for v in obj)
+    return copy.deepcopy(obj)
+
+def thaw_surface(obj):
+
+    if isinstance(obj, Mapping):
+        return {k: thaw_surface(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw_surface(v) for v in obj]
+    return copy.deepcopy(obj)
+
+class VolSurfaceSVI:
+
+    # immutable SVI-JW surface built from the get_volSurfaceSVI dict
+    # total variance is interpolated linearly in tau at fixed log-forward-moneyness, flat vol outside the slices
+    def __init__(self, volSurfaceSVI, spotRef=None, valueDate=None):
+
+        if "SVI-JW" not in volSurfaceSVI.keys():
+            raise ValueError("VolSurfaceSVI supports SVI-JW parameters only")
+
+        slices = sorted(volSurfaceSVI["SVI-JW"].items(), key=lambda kv: float(kv[1]["tau"]))
+        if len(slices) == 0:
+            raise ValueError("VolSurfaceSVI without SVI-JW slices")
+        paramsSVI = SVIJW_to_SVI([p for m, p in slices])
+        for v in paramsSVI.values():
+            v.setflags(write=False)
+
+        state = {"surface": freeze_surface(volSurfaceSVI),
+                 "undlName": volSurfaceSVI.get("undlName"),
+                 "maturities": tuple(m for m, p in slices),
+                 "spotRef": float(_getParam(volSurfaceSVI, ["anchor"]) if spotRef is None else spotRef),
+                 "valueDate": to_date(_getParam(volSurfaceSVI, ["anchorDate", "lastUpdate"]) if valueDate is None else valueDate),
+                 "paramsSVI": paramsSVI,
+                 "tau": paramsSVI["tau"]}
+        for k, v in state.items():
+            object.__setattr__(self, k, v)
+
+    def __setattr__(self, name, value):
+
+        raise AttributeError("VolSurfaceSVI is immutable")
+
+    def __delattr__(self, name):
+
+        raise AttributeError("VolSurfaceSVI is immutable")
+
+    def __reduce__(self):
+
+        return (VolSurfaceSVI, (thaw_surface(self.surface), self.spotRef, self.valueDate))
+
+    def __repr__(self):
+
+        return "VolSurfaceSVI({}, {}, {} slices)".format(self.undlName, self.valueDate, len(self.tau))
+
+    def to_tau(self, maturities):
+
+        maturities = np.atleast_1d(maturities)
+        if np.issubdtype(maturities.dtype, np.number):
+            return maturities.astype(float)
+        return np.array([year_fraction(self.valueDate, m) for m in maturities])
+
+    def forward(self, tau):
+
+        # forward as a ratio of spot, log-linear in tau through the slice forwards
+        tau = np.asarray(tau, dtype=float)
+        yieldRate = np.log(self.paramsSVI["forward"]) / self.tau
+
+        return np.exp(np.interp(tau, self.tau, yieldRate) * tau)
+
+    def _interpWeights(self, tau):
+
+        # slice indices and weights of the linear-in-tau total variance interpolation, flat vol outside the slices
+        nSlice = len(self.tau)
+        lo = np.clip(np.searchsorted(self.tau, tau) - 1, 0, nSlice - 1)
+        hi = np.minimum(lo + 1, nSlice - 1)
+
+        span = self.tau[hi] - self.tau[lo]
+        weight = np.clip((tau - self.tau[lo]) / np.where(span > 0, span, 1.0), 0.0, 1.0)
+        cLo, cHi = 1 - weight, weight
+        before = tau < self.tau[0]
+        after = tau > self.tau[-1]
+        cLo = np.where(before, tau / self.tau[0], np.where(after, 0.0, cLo))
+        cHi = np.where(before, 0.0, np.where(after, tau / self.tau[-1], cHi))
+
+        return lo, hi, cLo[:, None], cHi[:, None]
+
+    def _sliceParams(self, idx):
+
+        return {key: v[idx] for key, v in self.paramsSVI.items()}
+
+    def _toGrid(self, logMoneyness, tau):
+
+        tau = np.atleast_1d(np.asarray(tau, dtype=float))
+        k = np.asarray(logMoneyness, dtype=float)
+        if k.ndim < 2:
+            k = np.broadcast_to(np.atleast_1d(k), (len(tau), np.atleast_1d(k).size))
+
+        return k, tau
+
+    def total_variance(self, logMoneyness, tau):
+
+        # logMoneyness (nT, nK) or (nK,), tau (nT,); returns total variance (nT, nK)
+        k, tau = self._toGrid(logMoneyness, tau)
+        lo, hi, cLo, cHi = self._interpWeights(tau)
+
+        return cLo * calc_SVITotalVariance(k, self._sliceParams(lo)) + cHi * calc_SVITotalVariance(k, self._sliceParams(hi))
+
+    def variance_derivatives(self, logMoneyness, tau):
+
+        # total variance and its first two log-moneyness derivatives under the same tau interpolation
+        k, tau = self._toGrid(logMoneyness, tau)
+        lo, hi, cLo, cHi = self._interpWeights(tau)
+        derivLo = calc_SVIDerivatives(k, self._sliceParams(lo))
+        derivHi = calc_SVIDerivatives(k, self._sliceParams(hi))
+
+        return tuple(cLo * dLo + cHi * dHi for dLo, dHi in zip(derivLo, derivHi))
+
+    def vol_grid(self, strikes, maturities, spotRef=None, strikeType="absolute"):
+
+        # strikes (nK,) absolute or as ratio of spot, maturities (nT,) as dates or year fractions; returns vols (nT, nK)
+        spotRef = self.spotRef if spotRef is None else spotRef
+        tau = np.maximum(self.to_tau(maturities), 1e-8)
+        strikes = np.atleast_1d(np.asarray(strikes, dtype=float))
+        moneyness = strikes if strikeType == "percent" else strikes / spotRef
+        k = np.log(moneyness[None, :] / self.forward(tau)[:, None])
+
+        return np.sqrt(np.maximum(self.total_variance(k, tau), 0.0) / tau[:, None])
+
+    def vol_smile(self, strikes, maturity, spotRef=None, strikeType="absolute"):
+
+        return self.vol_grid(strikes, [maturity], spotRef, strikeType)[0]
+
+    def vol_pairs(self, strikes, maturities, spotRef=None):
+
+        # vols of (strike, maturity) pairs, strikes / maturities (nOpt,) and spotRef scalar or (nOpt,)
+        spotRef = self.spotRef if spotRef is None else np.asarray(spotRef, dtype=float)
+        tau = np.maximum(self.to_tau(maturities), 1e-8)
+        k = np.log(np.asarray(strikes, dtype=float) / (spotRef * self.forward(tau)))
+
+        return np.sqrt(np.maximum(self.total_variance(k[:, None], tau)[:, 0], 0.0) / tau)
+
+    def vol(self, strike, maturity, spotRef=None, strikeType="absolute"):
+
+        return float(self.vol_grid([strike], [maturity], spotRef, strikeType)[0, 0])
+
+    def pct_delta_strike(self, pctDelta, maturities, spotRef=None, nIter=60):
+
+        # strike whose forward delta equals pctDelta (calls > 0, puts < 0), bisection in log-forward-moneyness
+        spotRef = self.spotRef if spotRef is None else spotRef
+        tau = np.maximum(self.to_tau(maturities), 1e-8)
+        pctDelta = np.broadcast_to(np.asarray(pctDelta, dtype=float), tau.shape)
+        target = np.where(pctDelta > 0, pctDelta, 1 + pctDelta)
+
+        atmStdev = np.sqrt(np.maximum(self.total_variance(np.zeros((len(tau), 1)), tau)[:, 0], 1e-12))
+        lo, hi = -10 * atmStdev, 10 * atmStdev
+        for i in range(nIter):
+            k = 0.5 * (lo + hi)
+            stdev = np.sqrt(np.maximum(self.total_variance(k[:, None], tau)[:, 0], 1e-12))
+            callDelta = norm_cdf(-k / stdev + 0.5 * stdev)
+            # call delta is decreasing in k
+            lo = np.where(callDelta > target, k, lo)
+            hi = np.where(callDelta > target, hi, k)
+
+        k = 0.5 * (lo + hi)
+        w = np.maximum(self.total_variance(k[:, None], tau)[:, 0], 0.0)
+
+        return {"strike": spotRef * self.forward(tau) * np.exp(k), "vol": np.sqrt(w / tau)}
+
+# local business-day calendar
+WEEKMASK = "1111100"
+
+def to_datetime64(dates):
+
+    # accepts "YYYY-MM-DD[Thh:mm:ss]" strings, date/datetime objects or datetime64, scalar or array
+    dates = np.asarray(dates)
+    if dates.dtype.kind in ("U", "S", "O"):
+        dates = np.array([str(d).split("T")[0].split(" ")[0] for d in dates.ravel()], dtype="datetime64[D]").reshape(dates.shape)
+
+    return dates.astype("datetime64[D]")
+
+class BusinessCalendar:
+
+    # sorted holiday array compiled into a numpy busdaycalendar, all queries are vectorized
+    def __init__(self, holidays, weekmask=WEEKMASK, name=None):
+
+        holidays = np.unique(to_datetime64([h for h in holidays if h not in (None, "", "None")]))
+        holidays.setflags(write=False)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "holidays", holidays)
+        object.__setattr__(self, "weekmask", weekmask)
+        object.__setattr__(self, "busdaycal", np.busdaycalendar(weekmask=weekmask, holidays=holidays))
+
+    def __setattr__(self, name, value):
+
+        raise AttributeError("BusinessCalendar is immutable")
+
+    def __reduce__(self):
+
+        return (BusinessCalendar, (self.holidays, self.weekmask, self.name))
+
+    def is_businessDay(self, dates):
+
+        return np.is_busday(to_datetime64(dates), busdaycal=self.busdaycal)
+
+    def is_holiday(self, dates):
+
+        return ~self.is_businessDay(dates)
+
+    def net_businessDays(self, fromDates, toDates):
+
+        # business days in [fromDate, toDate), negative when toDate < fromDate
+        return np.busday_count(to_datetime64(fromDates), to_datetime64(toDates), busdaycal=self.busdaycal)
+
+    def next_businessDay(self, refDates, dayShift=1):
+
+        # dayShift = 0 rolls forward to a business day, otherwise counts dayShift business days from refDate
+        refDates = to_datetime64(refDates)
+        dayShift = np.asarray(dayShift, dtype=int)
+        refDates, dayShift = np.broadcast_arrays(refDates, dayShift)
+        backward = np.busday_offset(refDates, dayShift, roll="backward", busdaycal=self.busdaycal)
+        forward = np.busday_offset(refDates, dayShift, roll="forward", busdaycal=self.busdaycal)
+
+        return np.where(dayShift > 0, backward, forward)
+
+    def business_days(self, fromDate, toDate):
+
+        # all business days in [fromDate, toDate]
+        days = np.arange(to_datetime64(fromDate), to_datetime64(toDate) + 1, dtype="datetime64[D]")
+
+        return days[self.is_businessDay(days)]
+
+# local curve objects
+def year_fractions(valueDate, dates):
+
+    # vectorized year_fraction; numeric input is taken as year fractions already
+    dates = np.atleast_1d(dates)
+    if np.issubdtype(dates.dtype, np.number):
+        return dates.astype(float)
+
+    return (to_datetime64(dates) - to_datetime64(to_date(valueDate))).astype(float) / DAY_COUNT
+
+class YieldCurve:
+
+    # log discount factors linear in tau between pillars, flat zero rate outside
+    def __init__(self, yieldCurve):
+
+        curve = yieldCurve["yieldCurve"] if "yieldCurve" in yieldCurve.keys() else yieldCurve
+        t = np.array([float(k) for k in curve.keys()])
+        r = np.array([float(v) for v in curve.values()])
+        order = np.argsort(t)
+        self.currency = yieldCurve.get("currency")
+        self.pillars = t[order]
+        self.zeroRates = r[order]
+        self.logDF = -self.zeroRates * self.pillars
+
+    def log_discount(self, tau):
+
+        tau = np.asarray(tau, dtype=float)
+        logDF = np.interp(tau, self.pillars, self.logDF)
+        logDF = np.where(tau < self.pillars[0], -self.zeroRates[0] * tau, logDF)
+
+        return np.where(tau > self.pillars[-1], -self.zeroRates[-1] * tau, logDF)
+
+    def discount(self, tau):
+
+        return np.exp(self.log_discount(tau))
+
+    def zero_rate(self, tau):
+
+        tau = np.asarray(tau, dtype=float)
+        safeTau = np.where(tau > 0, tau, 1.0)
+
+        return np.where(tau > 0, -self.log_discount(safeTau) / safeTau, self.zeroRates[0])
+
+    def discount_cashFlow(self, cashFlows, tau):
+
+        return np.asarray(cashFlows, dtype=float) * self.discount(tau)
+
+class RepoCurve:
+
+    # repo schedule {date: rate} as zero rates, log growth linear in tau
+    def __init__(self, repoCurve, valueDate):
+
+        schedule = repoCurve["Schedule"] if "Schedule" in repoCurve.keys() else repoCurve
+        t = year_fractions(valueDate, list(schedule.keys())) if len(schedule) > 0 else np.zeros(0)
+        r = np.array([float(v) for v in schedule.values()])
+        order = np.argsort(t)
+        self.pillars = t[order]
+        self.rates = r[order]
+
+    def rate(self, tau):
+
+        tau = np.asarray(tau, dtype=float)
+        if len(self.pillars) == 0:
+            return np.zeros_like(tau)
+        return np.interp(tau, self.pillars, self.rates)
+
+    def growth(self, tau):
+
+        return np.exp(-self.rate(tau) * np.asarray(tau, dtype=float))
+
+class DividendCurve:
+
+    # discrete cash dividends with cumulative PV, so the PV paid up to any tau is a single searchsorted
+    def __init__(self, divCurve, valueDate, yieldCurve):
+
+        self.divTimes, self.divAmounts = div_schedule(divCurve, valueDate)
+        self.cumPV = np.concatenate([[0.0], np.cumsum(self.divAmounts * yieldCurve.discount(self.divTimes))])
+
+    def pv(self, tau):
+
+        return self.cumPV[np.searchsorted(self.divTimes, np.asarray(tau, dtype=float), side="right")]
+
+    def pv_between(self, t1, t2):
+
+        return self.pv(t2) - self.pv(t1)
+
+class ForwardCurve:
+
+    # F(T) = (S - PV(divs <= T)) / DF(T) * exp(-repo(T) T)
+    def __init__(self, spotRef, valueDate, yieldCurve, divCurve=None, repoCurve=None):
+
+        self.spotRef = float(spotRef)
+        self.valueDate = to_date(valueDate)
+        self.yieldCurve = yieldCurve if isinstance(yieldCurve, YieldCurve) else YieldCurve(yieldCurve)
+        self.divCurve = divCurve if isinstance(divCurve, DividendCurve) else DividendCurve({} if divCurve is None else divCurve, self.valueDate, self.yieldCurve)
+        self.repoCurve = repoCurve if isinstance(repoCurve, RepoCurve) else RepoCurve({} if repoCurve is None else repoCurve, self.valueDate)
+
+    def to_tau(self, maturities):
+
+        return year_fractions(self.valueDate, maturities)
+
+    def forward(self, maturities, spotRef=None):
+
+        tau = self.to_tau(maturities)
+        spotRef = self.spotRef if spotRef is None else np.asarray(spotRef, dtype=float)
+
+        return (spotRef - self.divCurve.pv(tau)) / self.yieldCurve.discount(tau) * self.repoCurve.growth(tau)
+
+    def discount(self, maturities):
+
+        return self.yieldCurve.discount(self.to_tau(maturities))
+
+    def discount_cashFlow(self, cashFlows, payDates):
+
+        return self.yieldCurve.discount_cashFlow(cashFlows, self.to_tau(payDates))
+
+    def market_data(self, maturities):
+
+        # flat rate / repo / pv of dividends per maturity, the column inputs of calc_EuropeanArrays
+        tau = self.to_tau(maturities)
+        return {"tau": tau, "rate": self.yieldCurve.zero_rate(tau), "repo": self.repoCurve.rate(tau), "pvDiv": self.divCurve.pv(tau),
+                "forward": self.forward(tau)}
+
+# incremental SVI-JW refit
+SVI_FIT_KEYS = ["vol", "skew", "pWing", "cWing", "minVol"]
+CALENDAR_GRID = np.linspace(-1.5, 1.5, 61)     # log-forward-moneyness grid for calendar arbitrage constraints
+
+def _sliceSVI(x, tau, forward):
+
+    return SVIJW_to_SVI({"vol": x[0], "skew": x[1], "pWing": x[2], "cWing": x[3], "minVol": x[4], "tau": tau, "forward": forward})
+
+def _clipSVIJW(x):
+
+    x = x.copy()
+    x[0] = max(x[0], 1e-3)
+    x[2] = max(x[2], 1e-6)
+    x[3] = max(x[3], 1e-6)
+    x[4] = min(max(x[4], 1e-3), x[0] * (1 - 1e-6))
+
+    return x
+
+def fit_SVIJWSlice(logMoneyness, vol, tau, forward, initial, weight=None, wLower=None, wUpper=None,
+                   penalty=1e3, maxIter=50, tolerance=1e-10):
+
+    # Levenberg-Marquardt on the 5 SVI-JW parameters of one slice, warm-started from initial; butterfly arbitrage
+    # and total variance outside the neighbouring slices' wLower / wUpper on CALENDAR_GRID are penalised
+    k = np.asarray(logMoneyness, dtype=float)
+    vol = np.asarray(vol, dtype=float)
+    weight = np.ones_like(vol) if weight is None else np.asarray(weight, dtype=float)
+    sqrtWeight = np.sqrt(weight / weight.sum())
+    sqrtTau = np.sqrt(tau)
+
+    def residuals(x):
+        # parameters the SVI-JW map cannot invert give an infinite cost, the step is rejected
+        try:
+            paramsSVI = _sliceSVI(x, tau, forward)
+        except ValueError:
+            return np.full(len(k) + len(CALENDAR_GRID) * (1 + (wLower is not None) + (wUpper is not None)), np.inf)
+        w = calc_SVITotalVariance(np.concatenate([k, CALENDAR_GRID]), paramsSVI)[0]
+        res = [(np.sqrt(np.maximum(w[:len(k)], 0.0)) / sqrtTau - vol) * sqrtWeight]
+        wGrid = w[len(k):]
+        res.append(penalty * np.maximum(-calc_SVIButterflyG(CALENDAR_GRID, paramsSVI)[0], 0.0))
+        if wLower is not None:
+            res.append(penalty * np.maximum(wLower - wGrid, 0.0))
+        if wUpper is not None:
+            res.append(penalty * np.maximum(wGrid - wUpper, 0.0))
+        return np.concatenate(res)
+
+    x = _clipSVIJW(np.array([float(initial[key]) for key in SVI_FIT_KEYS]))
+    r = residuals(x)
+    cost = r @ r
+    lam = 1e-3
+    for i in range(maxIter):
+        h = 1e-6 * np.maximum(np.abs(x), 1e-2)
+        J = np.stack([(residuals(x + h[j] * np.eye(5)[j]) - r) / h[j] for j in range(5)], axis=1)
+        JtJ = J.T @ J
+        grad = J.T @ r
+        step = np.linalg.solve(JtJ + lam * np.diag(np.diag(JtJ) + 1e-12), -grad)
+        xNew = _clipSVIJW(x + step)
+        rNew = residuals(xNew)
+        costNew = rNew @ rNew
+        if not np.isfinite(costNew) or costNew >= cost:
+            lam *= 10
+            if lam > 1e10:
+                break
+            continue
+        converged = cost - costNew < tolerance * max(cost, 1e-16)
+        x, r, cost, lam = xNew, rNew, costNew, max(lam / 10, 1e-12)
+        if converged:
+            break
+
+    return mergeDict(initial, {key: float(v) for key, v in zip(SVI_FIT_KEYS, x)})
+
+def _sliceQuotes(frame, maturity, spotRef, forward):
+
+    quotes = frame[frame["maturityDate"] == to_date(maturity)]
+    k = np.log(quotes["strike"].to_numpy(dtype=float) / (spotRef * forward))
+    weight = quotes["weight"].to_numpy(dtype=float) if "weight" in quotes.columns else None
+
+    return k, quotes["impliedVol"].to_numpy(dtype=float), weight
+
+def refit_volSurfaceSVI(volSurfaceSVI, quotes, spotRef=None, threshold=0.005, minQuotes=5, maxIter=50):
+
+    # warm-started refit of the SVI-JW slices whose quotes moved: a slice is refit when the weighted RMS
+    # of (quote IV - surface IV) exceeds threshold, other slices stay fixed and bound the refit slices
+    # through calendar arbitrage constraints. quotes: maturity / strike / impliedVol (optional weight, converged) records
+    frame = chain_to_frame(quotes, {"maturity": "maturity", "strike": "strike", "impliedVol": "impliedVol"})
+    if "converged" in frame.columns:
+        frame = frame[frame["converged"].astype(bool)]
+    frame = frame[np.isfinite(frame["impliedVol"].to_numpy(dtype=float))]
+    frame = frame.assign(maturityDate=[to_date(m) for m in frame["maturity"]])
+
+    spotRef = float(_getParam(volSurfaceSVI, ["anchor"]) if spotRef is None else spotRef)
+    slices = sorted(volSurfaceSVI["SVI-JW"].items(), key=lambda kv: float(kv[1]["tau"]))
+    params = [dict(p) for m, p in slices]
+    wGrid = [calc_SVITotalVariance(CALENDAR_GRID, SVIJW_to_SVI(p))[0] for p in params]
+
+    report = {}
+    for i, (maturity, p) in enumerate(slices):
+        k, vol, weight = _sliceQuotes(frame, maturity, spotRef, float(p["forward"]))
+        if len(k) < minQuotes:
+            report[maturity] = {"refit": False, "nQuotes": len(k)}
+            continue
+
+        w = np.ones_like(vol) if weight is None else weight
+        tau = float(p["tau"])
+        modelVol = np.sqrt(np.maximum(calc_SVITotalVariance(k, SVIJW_to_SVI(p))[0], 0.0) / tau)
+        rmseBefore = float(np.sqrt(np.sum(w * (modelVol - vol) ** 2) / np.sum(w)))
+        report[maturity] = {"refit": rmseBefore > threshold, "nQuotes": len(k), "rmseBefore": rmseBefore}
+        if rmseBefore <= threshold:
+            continue
+
+        params[i] = fit_SVIJWSlice(k, vol, tau, float(p["forward"]), p, weight,
+                                   wGrid[i - 1] if i > 0 else None, wGrid[i + 1] if i < len(slices) - 1 else None, maxIter=maxIter)
+        wGrid[i] = calc_SVITotalVariance(CALENDAR_GRID, SVIJW_to_SVI(params[i]))[0]
+        modelVol = np.sqrt(np.maximum(calc_SVITotalVariance(k, SVIJW_to_SVI(params[i]))[0], 0.0) / tau)
+        report[maturity]["rmseAfter"] = float(np.sqrt(np.sum(w * (modelVol - vol) ** 2) / np.sum(w)))
+
+    result = mergeDict(volSurfaceSVI, {"SVI-JW": {m: p for (m, old), p in zip(slices, params)}})
+    arbCheck = check_SVIArb(result, CALENDAR_GRID)
+
+    return {"volSurfaceSVI": result, "report": report, "calendarArbFree": arbCheck["calendarArbFree"], "arbCheck": arbCheck}
+
+# local SVI arbitrage checks
+ARB_GRID = np.linspace(-2.0, 2.0, 401)
+
+def calc_SVIDerivatives(logMoneyness, paramsSVI):
+
+    # total variance and its first two derivatives in log-forward-moneyness, each (nT, nK)
+    p = stack_params(paramsSVI, SVI_KEYS)
+    k = np.asarray(logMoneyness, dtype=float)
+    if k.ndim < 2:
+        k = np.broadcast_to(np.atleast_1d(k), (len(p["tau"]), np.atleast_1d(k).size))
+
+    a, b, rho, m, sigma = [p[key][:, None] for key in ["a", "b", "rho", "m", "sigma"]]
+    x = k - m
+    root = np.sqrt(x ** 2 + sigma ** 2)
+    # a flat smile (b = 0) maps to m = sigma = 0, its root vanishes at k = 0 but the derivatives are 0
+    safeRoot = np.where(root > 0, root, 1.0)
+
+    w = a + b * (rho * x + root)
+    dw = b * (rho + x / safeRoot)
+    d2w = b * sigma ** 2 / safeRoot ** 3
+
+    return w, dw, d2w
+
+def calc_SVIButterflyG(logMoneyness, paramsSVI):
+
+    # Gatheral's g(k); the slice is free of butterfly arbitrage where g >= 0
+    k = np.asarray(logMoneyness, dtype=float)
+    w, dw, d2w = calc_SVIDerivatives(k, paramsSVI)
+    w = np.maximum(w, 1e-16)
+
+    return (1 - k * dw / (2 * w)) ** 2 - dw ** 2 / 4 * (1 / w + 0.25) + d2w / 2
+
+def _violationRegions(k, violated, values):
+
+    # contiguous runs of violated grid points as (kLow, kHigh, worst value)
+    regions = []
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], violated.astype(np.int8), [0]])))
+    for lo, hi in zip(edges[::2], edges[1::2]):
+        regions.append((float(k[lo]), float(k[hi - 1]), float(np.min(values[lo:hi]))))
+
+    return regions
+
+def calc_SVIArbPenalty(paramsSVI, logMoneyness=ARB_GRID):
+
+    # sum of negative parts of g and of calendar total variance spreads, cheap enough for a fitter objective
+    p = stack_params(paramsSVI, SVI_KEYS)
+    order = np.argsort(p["tau"])
+    p = {key: v[order] for key, v in p.items()}
+    w = calc_SVITotalVariance(logMoneyness, p)
+    g = calc_SVIButterflyG(logMoneyness, p)
+
+    return float(np.sum(np.maximum(-g, 0.0)) + np.sum(np.maximum(-np.diff(w, axis=0), 0.0)))
+
+def check_SVIArb(volSurfaceSVI, logMoneyness=ARB_GRID, tolerance=SVI_TOLERANCE):
+
+    # butterfly (g(k) >= 0) and calendar (total variance non-decreasing in tau) checks for every slice in one pass;
+    # volSurfaceSVI is a get_volSurfaceSVI dict or a list of SVI-JW slices; calendar violations are keyed "<maturity>/<next maturity>"
+    slices = volSurfaceSVI["SVI-JW"] if isinstance(volSurfaceSVI, dict) and "SVI-JW" in volSurfaceSVI.keys() else dict(enumerate(volSurfaceSVI))
+    items = sorted(slices.items(), key=lambda kv: float(kv[1]["tau"]))
+    maturities = [m for m, p in items]
+    paramsSVI = SVIJW_to_SVI([p for m, p in items])
+    k = np.asarray(logMoneyness, dtype=float)
+
+    w = calc_SVITotalVariance(k, paramsSVI)
+    g = calc_SVIButterflyG(k, paramsSVI)
+    spread = np.diff(w, axis=0)
+
+    butterfly = {m: _violationRegions(k, g[i] < -tolerance, g[i]) for i, m in enumerate(maturities)}
+    calendar = {"{}/{}".format(maturities[i], maturities[i + 1]): _violationRegions(k, spread[i] < -tolerance, spread[i]) for i in range(len(maturities) - 1)}
+    butterfly = {m: r for m, r in butterfly.items() if len(r) > 0}
+    calendar = {m: r for m, r in calendar.items() if len(r) > 0}
+
+    return {"arbFree": len(butterfly) == 0 and len(calendar) == 0,
+            "butterflyArbFree": len(butterfly) == 0, "calendarArbFree": len(calendar) == 0,
+            "butterfly": butterfly, "calendar": calendar,
+            "minG": float(np.min(g)), "minCalendarSpread": float(np.min(spread)) if len(spread) > 0 else 0.0}
+
+# implied risk-neutral density
+DENSITY_CACHE_SIZE = 256
+densityCache = OrderedDict()
+_trapz = np.trapezoid if hasattr(np, "trapezoid") else np.trapz
+
+def surface_hash(volSurfaceSVI):
+
+    slices = thaw_surface(volSurfaceSVI["SVI-JW"] if "SVI-JW" in volSurfaceSVI.keys() else volSurfaceSVI)
+    return hashlib.sha1(json.dumps(slices, sort_keys=True, default=str).encode()).hexdigest()
+
+def calc_SVIDensityArrays(volSurface, tau, logMoneyness):
+
+    # Breeden-Litzenberger in closed form on log-forward-moneyness k: p(k) = g(k) phi(d2) / sqrt(w), CDF(k) = N(-d2) + phi(d2) w' / (2 sqrt(w))
+    w, dw, d2w = volSurface.variance_derivatives(logMoneyness, tau)
+    k = np.broadcast_to(np.asarray(logMoneyness, dtype=float), w.shape)
+    w = np.maximum(w, 1e-16)
+    sqrtW = np.sqrt(w)
+    d2 = -k / sqrtW - 0.5 * sqrtW
+    g = (1 - k * dw / (2 * w)) ** 2 - dw ** 2 / 4 * (1 / w + 0.25) + d2w / 2
+
+    return g * norm_pdf(d2) / sqrtW, norm_cdf(-d2) + norm_pdf(d2) * dw / (2 * sqrtW)
+
+def calc_impliedDistributionSVI(volSurfaceSVI, maturities=None, interval=0.02, step=0.002, return_upper=4):
+
+    # density / CDF of the gross return S_T / S on a shared grid for all maturities, plus interval bin probabilities and moments;
+    # same grid arguments as calc_impliedDistribution, results cached by surface hash and anchor (spotRef, valueDate)
+    if isinstance(volSurfaceSVI, VolSurfaceSVI):
+        surface, anchor = volSurfaceSVI.surface, (volSurfaceSVI.spotRef, str(volSurfaceSVI.valueDate))
+    else:
+        surface = volSurfaceSVI
+        anchor = (float(_getParam(surface, ["anchor"])), str(to_date(_getParam(surface, ["anchorDate", "lastUpdate"]))))
+    key = (surface_hash(surface), anchor, None if maturities is None else tuple(str(m) for m in np.atleast_1d(maturities)), interval, step, return_upper)
+    if key in densityCache.keys():
+        densityCache.move_to_end(key)
+        return densityCache[key]
+
+    volSurface = volSurfaceSVI if isinstance(volSurfaceSVI, VolSurfaceSVI) else VolSurfaceSVI(volSurfaceSVI)
+
+    maturities = list(volSurface.maturities) if maturities is None else list(np.atleast_1d(maturities))
+    tau = np.array([float(volSurface.paramsSVI["tau"][volSurface.maturities.index(m)]) if m in volSurface.maturities else volSurface.to_tau([m])[0]
+                    for m in maturities])
+    tau = np.maximum(tau, 1e-8)
+    forward = volSurface.forward(tau)
+
+    grossReturn = np.arange(step, 1 + return_upper + step / 2, step)
+    k = np.log(grossReturn[None, :] / forward[:, None])
+    densityK, cdf = calc_SVIDensityArrays(volSurface, tau, k)
+    density = densityK / grossReturn[None, :]
+
+    edges = np.arange(0.0, 1 + return_upper + interval / 2, interval)
+    binCdf = np.stack([np.interp(edges, grossReturn, c, left=0.0, right=1.0) for c in cdf])
+
+    mass = _trapz(density, grossReturn, axis=1)
+    mean = _trapz(density * grossReturn, grossReturn, axis=1) / mass
+    centered = grossReturn[None, :] - mean[:, None]
+    variance = _trapz(density * centered ** 2, grossReturn, axis=1) / mass
+    moments = {"mass": mass, "mean": mean, "variance": variance,
+               "skewness": _trapz(density * centered ** 3, grossReturn, axis=1) / mass / variance ** 1.5,
+               "kurtosis": _trapz(density * centered ** 4, grossReturn, axis=1) / mass / variance ** 2}
+
+    result = {"maturities": tuple(maturities), "tau": tau, "forward": forward, "grossReturn": grossReturn,
+              "density": density, "cdf": cdf, "binEdges": edges - 1, "binProbability": np.diff(binCdf, axis=1),
+              "moments": moments, "minDensity": float(np.min(density))}
+    for v in [tau, forward, grossReturn, density, cdf, result["binEdges"], result["binProbability"]] + list(moments.values()):
+        v.setflags(write=False)
+
+    densityCache[key] = result
+    while len(densityCache) > DENSITY_CACHE_SIZE:
+        densityCache.popitem(last=False)
+
+    return result
+
+# spot x vol scenario ladder on a portfolio, vols read from local SVI surfaces
+LADDER_MEASURES = ["NPV", "forward", "delta", "gamma", "vega", "theta", "rho"]
+LADDER_DIMS = ("spot", "vol", "skew", "time", "option")
+LADDER_CHUNK_SIZE = 2000
+
+def _ladderMarket(tau, rate, repo, divTimes, divAmounts):
+
+    # per-option discount factor, forward growth and dividend PV at one time shift, shared by every spot / vol scenario
+    return {"df": np.exp(-rate * tau), "growth": np.exp((rate - repo) * tau), "pvDiv": pv_dividends(tau, rate, divTimes, divAmounts)}
+
+def _ladderVols(cols, surfaces, surfaceIndex, spots, tau, stickiness):
+
+    # surface vols (nSpot, nOpt) and log-forward-moneyness; sticky strike reads the smile at the unshifted spot
+    vol = np.broadcast_to(cols["vol"], spots.shape).copy()
+    k = np.zeros(spots.shape)
+    refSpot = spots if stickiness == "moneyness" else np.broadcast_to(cols["spot"], spots.shape)
+    tauVol = np.maximum(tau, 1e-8)
+
+    for j, surface in enumerate(surfaces):
+        rows = np.nonzero(surfaceIndex == j)[0]
+        if len(rows) == 0:
+            continue
+        kRows = np.log(cols["strike"][rows][None, :] / (refSpot[:, rows] * surface.forward(tauVol[rows])[None, :]))
+        w = surface.total_variance(kRows.T, tauVol[rows])
+        vol[:, rows] = np.sqrt(np.maximum(w, 0.0) / tauVol[rows][:, None]).T
+        k[:, rows] = kRows
+
+    return vol, k
+
+def _ladderChunk(cols, surfaces, surfaceIndex, spotShifts, volShifts, skewShifts, timeShifts, calcWhat, exerciseType, stickiness, preset, curves=None):
+
+    nOpt = len(cols["strike"])
+    shape = (len(spotShifts), len(volShifts), len(skewShifts), len(timeShifts), nOpt)
+    result = {m: np.zeros(shape) for m in calcWhat}
+    spots = cols["spot"][None, :] * (1 + spotShifts[:, None])
+
+    for t, days in enumerate(timeShifts):
+        dt = days / 365.0
+        tau = np.maximum(cols["tau"] - dt, 0.0)
+        divTimes = cols["divTimes"] - dt
+        vol, k = _ladderVols(cols, surfaces, surfaceIndex, spots, tau, stickiness)
+        # (nVol, nSkew, nSpot, nOpt): parallel shift plus skew tilt per unit log-forward-moneyness
+        vols = np.maximum(vol[None, None, :, :] + volShifts[:, None, None, None] + skewShifts[None, :, None, None] * k[None, None, :, :], 1e-4)
+
+        if exerciseType == "American":
+            # expired options (tau = 0) get their intrinsic value from calc_AmericanFDArrays
+            for i, ds in enumerate(spotShifts):
+                for v in range(len(volShifts)):
+                    for s in range(len(skewShifts)):
+                        scenario = mergeDict(cols, {"spot": spots[i], "tau": tau, "vol": vols[v, s, i], "divTimes": divTimes})
+                        values = calc_AmericanColumns(scenario, calcWhat, preset, curves)
+                        for m in calcWhat:
+                            result[m][i, v, s, t] = values[m]
+            continue
+
+        market = _ladderMarket(tau, cols["rate"], cols["repo"], divTimes, cols["divAmounts"])
+        forward = (spots - market["pvDiv"][None, :]) * market["growth"][None, :]
+        values = calc_BlackArrays(forward, cols["strike"], tau, market["df"], market["growth"], vols, cols["isCall"], calcWhat + ["NPV"])
+
+        # theta / rho reprice on their own bumped discount factors and dividend PVs, same vols
+        bumped = {"theta": (np.maximum(tau - THETA_SCALE, 0.0), cols["rate"], divTimes - THETA_SCALE), "rho": (tau, cols["rate"] + RHO_SCALE, divTimes)}
+        for m, (tauBump, rateBump, divTimesBump) in bumped.items():
+            if m in calcWhat:
+                marketBump = _ladderMarket(tauBump, rateBump, cols["repo"], divTimesBump, cols["divAmounts"])
+                forwardBump = (spots - marketBump["pvDiv"][None, :]) * marketBump["growth"][None, :]
+                values[m] = calc_BlackArrays(forwardBump, cols["strike"], tauBump, marketBump["df"], marketBump["growth"], vols, cols["isCall"])["NPV"] - values["NPV"]
+
+        # expired options: intrinsic with zero gamma / vega / theta / rho instead of the tau = 0 Black limits
+        expired = tau <= 0
+        if np.any(expired):
+            intrinsic = calc_expiredArrays(spots, cols["strike"][None, :], cols["isCall"][None, :], calcWhat)
+            values = {m: np.where(expired, intrinsic[m][None, None, :, :], values[m]) if m in calcWhat else values[m] for m in values.keys()}
+
+        for m in calcWhat:
+            # (nVol, nSkew, nSpot, nOpt) -> (nSpot, nVol, nSkew, nOpt)
+            result[m][:, :, :, t] = np.moveaxis(values[m], 2, 0)
+
+    return result
+
+def _ladderChunkArgs(args):
+
+    return _ladderChunk(*args)
+
+def calc_scenarioLadder(paramsList, volSurfaces=None, spotShifts=[0.0], volShifts=[0.0], skewShifts=[0.0], timeShifts=[0], calcWhat=["NPV"],
+                        exerciseType="European", stickiness="strike", preset="fast", maxWorkers=None, executor="process", chunkSize=LADDER_CHUNK_SIZE):
+
+    # portfolio NPV / Greeks under every combination of relative spot shift, parallel vol shift, skew shift (vol per unit log-forward-moneyness)
+    # and time decay in calendar days; returns one array per measure of shape (nSpot, nVol, nSkew, nTime, nOpt) plus the quantity-weighted
+    # portfolio ladder. volSurfaces: VolSurfaceSVI / SVI-JW dict, or {undlName: ...}; options without a surface keep their own "vol"
+    for m in calcWhat:
+        if m not in (AMERICAN_MEASURES if exerciseType == "American" else LADDER_MEASURES):
+            raise ValueError("unsupported ladder measure " + m)
+
+    cols = params_to_columns(paramsList)
+    flat = [flatten_params(p) for p in paramsList]
+    quantity = np.array([float(_getParam(p, ["quantity"], 1.0)) for p in flat])
+
+    if volSurfaces is None:
+        volSurfaces = {}
+    elif isinstance(volSurfaces, VolSurfaceSVI) or "SVI-JW" in volSurfaces.keys():
+        volSurfaces = {None: volSurfaces}
+    surfaces, names = [], []
+    for name, surface in volSurfaces.items():
+        surfaces.append(surface if isinstance(surface, VolSurfaceSVI) else VolSurfaceSVI(surface))
+        names.append(name)
+    surfaceIndex = np.array([names.index(p.get("undlName")) if p.get("undlName") in names else names.index(None) if None in names else -1
+                             for p in flat], dtype=int)
+    if np.any(np.isnan(cols["vol"][surfaceIndex < 0])):
+        raise ValueError("no vol surface or vol for " + str(sorted(set(str(p.get("undlName")) for p, j in zip(flat, surfaceIndex) if j < 0))))
+
+    scenarios = [np.atleast_1d(np.asarray(x, dtype=float)) for x in [spotShifts, volShifts, skewShifts, timeShifts]]
+    nOpt = len(paramsList)
+    bounds = [(i, min(i + chunkSize, nOpt)) for i in range(0, nOpt, chunkSize)]
+    curves = params_to_curves(paramsList) if exerciseType == "American" else None
+    tasks = [({k: v[i:j] for k, v in cols.items()}, surfaces, surfaceIndex[i:j], *scenarios, calcWhat, exerciseType, stickiness, preset,
+              None if curves is None else {k: v[i:j] for k, v in curves.items()}) for i, j in bounds]
+
+    maxWorkers = os.cpu_count() if maxWorkers is None else maxWorkers
+    if len(tasks) <= 1 or maxWorkers <= 1:
+        chunks = [_ladderChunk(*task) for task in tasks]
+    else:
+        Executor = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with Executor(max_workers=min(maxWorkers, len(tasks))) as pool:
+            chunks = list(pool.map(_ladderChunkArgs, tasks))
+
+    result = {m: np.concatenate([c[m] for c in chunks], axis=-1) for m in calcWhat}
+    result["portfolio"] = {m: np.tensordot(result[m], quantity, axes=([-1], [0])) for m in calcWhat if m != "forward"}
+    result["quantity"] = quantity
+    result["scenarios"] = dict(zip(LADDER_DIMS[:4], scenarios))
+    result["dims"] = LADDER_DIMS
+
+    return result
+
+# vanilla pricer quote strings "underlying Maturity Strike optionType [spotRef]", e.g. "NVDA.OQ 3M 90% P"
+QUOTE_COLUMNS = ["quote", "undlName", "tenor", "maturity", "strikeInput", "strikeType", "optionType", "spotRef", "error"]
+TENOR_PATTERN = re.compile(r"^(\d+)([DWMY])$", re.IGNORECASE)
+DATE_PATTERN = re.compile(r"^(\d{4})-?(\d{2})-?(\d{2})$")
+STRIKE_PATTERN = re.compile(r"^(\d+(?:\.\d*)?|\.\d+)(%?)$")
+OPTION_TYPES = {"C": "Call", "CALL": "Call", "P": "Put", "PUT": "Put"}
+
+def _parseQuote(quote):
+
+    tokens = str(quote).replace(",", " ").split()
+    if len(tokens) not in (4, 5):
+        raise ValueError("expected 'underlying Maturity Strike optionType [spotRef]'")
+    undlName, maturity, strike, optionType = tokens[:4]
+
+    row = {"undlName": undlName, "tenor": None, "maturity": None}
+    tenor, isoDate = TENOR_PATTERN.match(maturity), DATE_PATTERN.match(maturity)
+    if tenor is not None:
+        row["tenor"] = tenor.group(1) + tenor.group(2).upper()
+    elif isoDate is not None:
+        row["maturity"] = "-".join(isoDate.groups())
+        to_date(row["maturity"])
+    else:
+        raise ValueError("invalid maturity " + maturity)
+
+    match = STRIKE_PATTERN.match(strike)
+    if strike.upper() == "ATM":
+        row["strikeInput"], row["strikeType"] = 100.0, "percent"
+    elif match is not None:
+        row["strikeInput"], row["strikeType"] = float(match.group(1)), "percent" if match.group(2) == "%" else "absolute"
+    else:
+        raise ValueError("invalid strike " + strike)
+
+    if optionType.upper() not in OPTION_TYPES.keys():
+        raise ValueError("invalid optionType " + optionType)
+    row["optionType"] = OPTION_TYPES[optionType.upper()]
+    row["spotRef"] = float(tokens[4]) if len(tokens) == 5 else np.nan
+
+    return row
+
+def parse_quoteStrings(quotes):
+
+    # one row per line, unparseable lines keep their text in "error"; blank lines are dropped
+    rows = []
+    for quote in quotes:
+        if len(str(quote).strip()) == 0:
+            continue
+        try:
+            row = _parseQuote(quote)
+            row["error"] = None
+        except Exception as e:
+            row = {"undlName": str(quote).split()[0], "error": str(e)}
+        row["quote"] = str(quote).strip()
+        rows.append(row)
+
+    return pd.DataFrame(rows, columns=QUOTE_COLUMNS)
+
+def add_tenors(dates, tenors):
+
+    # calendar date + tenor ("2W", "3M", "1Y"), month ends clamped; vectorized over unique tenors
+    dates, tenors = np.broadcast_arrays(np.atleast_1d(to_datetime64(dates)), np.atleast_1d(np.asarray(tenors, dtype=object)))
+    result = np.full(dates.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+
+    for tenor in set(tenors.tolist()):
+        rows = tenors == tenor
+        n, unit = int(tenor[:-1]), tenor[-1].upper()
+        if unit in ("D", "W"):
+            result[rows] = dates[rows] + n * (7 if unit == "W" else 1)
+        else:
+            start = dates[rows].astype("datetime64[M]")
+            month = start + n * (12 if unit == "Y" else 1)
+            monthEnd = (month + 1).astype("datetime64[D]") - 1
+            result[rows] = np.minimum(month.astype("datetime64[D]") + (dates[rows] - start.astype("datetime64[D]")), monthEnd)
+
+    return result
+
+def resolve_quoteTable(quoteTable, valueDates, spots, calendars, businessCalendars, expiryCalendars=None):
+
+    # tenor -> maturity rolled forward to a business day of the underlying's calendar, percent strikes -> absolute on spotRef;
+    # valueDates / calendars per calendar and underlying, spots per underlying, businessCalendars {calendar: BusinessCalendar};
+    # with expiryCalendars {undlName: ExpiryCalendar} tenors snap to the nearest listed expiry instead
+    table = quoteTable.copy()
+    ok = table["error"].isna()
+    table["calendar"] = table["undlName"].map(calendars)
+    table["valueDate"] = table["calendar"].map(valueDates)
+    table["spotRef"] = table["spotRef"].where(table["spotRef"].notna(), table["undlName"].map(spots)).astype(float)
+
+    missing = ok & table["valueDate"].isna()
+    table.loc[missing, "error"] = "no value date for " + table.loc[missing, "undlName"].astype(str)
+    missing = table["error"].isna() & table["spotRef"].isna()
+    table.loc[missing, "error"] = "no spot for " + table.loc[missing, "undlName"].astype(str)
+    ok = table["error"].isna()
+
+    maturity = np.full(len(table), np.datetime64("NaT"), dtype="datetime64[D]")
+    explicit = ok & table["maturity"].notna()
+    maturity[explicit.values] = to_datetime64(table.loc[explicit, "maturity"].values)
+    for (calendar, valueDate), group in table[ok & table["tenor"].notna()].groupby(["calendar", "valueDate"]):
+        rows = table.index.get_indexer(group.index)
+        businessCalendar = businessCalendars.get(calendar) or BusinessCalendar([], name=calendar)
+        maturity[rows] = businessCalendar.next_businessDay(add_tenors(valueDate, group["tenor"].values), 0)
+    if expiryCalendars is not None:
+        unlisted = ok & table["tenor"].notna() & ~table["undlName"].isin(list(expiryCalendars.keys()))
+        table.loc[unlisted, "error"] = "no expiry calendar for " + table.loc[unlisted, "undlName"].astype(str)
+        ok = table["error"].isna()
+        for undlName, group in table[ok & table["tenor"].notna() & table["undlName"].isin(list(expiryCalendars.keys()))].groupby("undlName"):
+            rows = table.index.get_indexer(group.index)
+            maturity[rows] = expiryCalendars[undlName].nearest(group["valueDate"].iloc[0], targetDates=maturity[rows])
+
+    table["maturity"] = pd.Series(maturity.astype(str), index=table.index).where(ok, None)
+    percent = table["strikeType"] == "percent"
+    table["strike"] = np.where(percent, table["strikeInput"] / 100 * table["spotRef"], table["strikeInput"])
+    table["strikePct"] = table["strike"] / table["spotRef"]
+    expired = ok & (table["maturity"].fillna("") < table["valueDate"].fillna("").astype(str))
+    table.loc[expired, "error"] = "maturity before value date"
+
+    return table[["quote", "undlName", "calendar", "valueDate", "tenor", "maturity", "strike", "strikePct", "optionType", "spotRef", "error"]]
+
+# listed expiry schedules compiled from an explicit local rule and a BusinessCalendar. The getListedMaturityRule payload format is not
+# known, so rules are not derived from it: every field below is required and nothing else is accepted.
+# expiryDay "3FRI" / "LASTTHU"; monthly / quarterly / yearly / weekly = number of listed expiries of each kind;
+# quarterMonths / yearlyMonths = months 1-12 of the quarterly / yearly series; roll = "preceding" / "following" over holidays
+LISTED_RULE_FIELDS = ["expiryDay", "monthly", "quarterly", "quarterMonths", "yearly", "yearlyMonths", "weekly", "roll"]
+LISTED_YEARS = 10
+LISTED_CACHE_SIZE = 256
+WEEKDAYS = {"MON": 0, "TUE": 1, "WED": 2, "THU": 3, "FRI": 4, "SAT": 5, "SUN": 6}
+
+def listed_rule(rule):
+
+    # validated copy of an explicit rule plus the parsed weekday / nth; raises ValueError on missing, unknown or bad fields
+    if not isinstance(rule, dict):
+        raise ValueError("listed rule must be a dict")
+    unknown = sorted(k for k in rule.keys() if k not in LISTED_RULE_FIELDS)
+    missing = [k for k in LISTED_RULE_FIELDS if rule.get(k) is None]
+    if len(unknown) > 0:
+        raise ValueError("unknown listed rule fields " + ", ".join(unknown))
+    if len(missing) > 0:
+        raise ValueError("listed rule without " + ", ".join(missing))
+    rule = dict(rule)
+
+    match = re.match(r"^([1-4]|LAST)([A-Z]{3})$", str(rule["expiryDay"]).upper())
+    if match is None or match.group(2) not in WEEKDAYS.keys():
+        raise ValueError("bad listed rule expiryDay " + str(rule["expiryDay"]))
+    rule["nth"] = -1 if match.group(1) == "LAST" else int(match.group(1))
+    rule["weekday"] = WEEKDAYS[match.group(2)]
+
+    for k in ["monthly", "quarterly", "yearly", "weekly"]:
+        if isinstance(rule[k], bool) or not isinstance(rule[k], (int, np.integer)) or rule[k] < 0:
+            raise ValueError("bad listed rule count {} = {}".format(k, rule[k]))
+        rule[k] = int(rule[k])
+    for k in ["quarterMonths", "yearlyMonths"]:
+        if not isinstance(rule[k], (list, tuple)) or not all(isinstance(m, (int, np.integer)) and 1 <= m <= 12 for m in rule[k]):
+            raise ValueError("bad listed rule months {} = {}".format(k, rule[k]))
+        rule[k] = [int(m) for m in rule[k]]
+    if rule["roll"] not in ["preceding", "following"]:
+        raise ValueError("bad listed rule roll " + str(rule["roll"]))
+
+    return rule
+
+def nth_weekdays(months, weekday, nth):
+
+    # nth (1-based, -1 = last) weekday of each datetime64[M] month
+    weekmask = [i == weekday for i in range(7)]
+    months = np.asarray(months, dtype="datetime64[M]")
+    if nth < 0:
+        return np.busday_offset((months + 1).astype("datetime64[D]") - 1, nth + 1, roll="backward", weekmask=weekmask)
+
+    return np.busday_offset(months.astype("datetime64[D]"), nth - 1, roll="forward", weekmask=weekmask)
+
+class ExpiryCalendar:
+
+    # immutable expiry table of one calendar_undlType: the rule's expiry of every month and week over the next `years`,
+    # holiday rolled; the listed set for a value date is a few searchsorted slices of these arrays, cached per value date
+    def __init__(self, rule, businessCalendar=None, startDate=None, years=LISTED_YEARS, name=None):
+
+        rule = listed_rule(rule)
+        businessCalendar = BusinessCalendar([]) if businessCalendar is None else businessCalendar
+        start = to_datetime64(date.today() if startDate is None else startDate).astype("datetime64[M]") - 1
+        months = np.arange(start, start + 12 * years + 1, dtype="datetime64[M]")
+        monthNumber = months.astype(int) % 12 + 1
+        roll = "forward" if rule["roll"] == "following" else "backward"
+
+        monthly = np.busday_offset(nth_weekdays(months, rule["weekday"], rule["nth"]), 0, roll=roll, busdaycal=businessCalendar.busdaycal)
+        firstWeek = nth_weekdays(months[:1], rule["weekday"], 1)[0]
+        weekly = np.busday_offset(np.arange(firstWeek, months[-1].astype("datetime64[D]"), 7, dtype="datetime64[D]"), 0, roll=roll,
+                                  busdaycal=businessCalendar.busdaycal)
+        tables = {"monthly": monthly, "quarterly": monthly[np.isin(monthNumber, rule["quarterMonths"])],
+                  "yearly": monthly[np.isin(monthNumber, rule["yearlyMonths"])], "weekly": np.setdiff1d(weekly, monthly)}
+        for v in tables.values():
+            v.setflags(write=False)
+
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "rule", rule)
+        object.__setattr__(self, "businessCalendar", businessCalendar)
+        object.__setattr__(self, "years", years)
+        object.__setattr__(self, "tables", tables)
+        object.__setattr__(self, "_listedCache", OrderedDict())
+        object.__setattr__(self, "_nearestCache", {})
+
+    def __setattr__(self, name, value):
+
+        raise AttributeError("ExpiryCalendar is immutable")
+
+    def __reduce__(self):
+
+        return (ExpiryCalendar, (self.rule, self.businessCalendar, self.tables["monthly"][1], self.years, self.name))
+
+    def listed(self, valueDate):
+
+        # sorted listed expiries on or after valueDate
+        valueDate = to_datetime64(valueDate)
+        key = valueDate.item()
+        if key in self._listedCache.keys():
+            return self._listedCache[key]
+        if valueDate < self.tables["monthly"][0]:
+            raise ValueError("{} expiry table starts after {}".format(self.name, valueDate))
+
+        parts = []
+        for table in ["monthly", "quarterly", "yearly", "weekly"]:
+            i = np.searchsorted(self.tables[table], valueDate)
+            part = self.tables[table][i:i + self.rule[table]]
+            if len(part) < self.rule[table]:
+                raise ValueError("{} expiry table ends before {}".format(self.name, valueDate))
+            parts.append(part)
+        listed = np.unique(np.concatenate(parts))
+        listed.setflags(write=False)
+
+        self._listedCache[key] = listed
+        while len(self._listedCache) > LISTED_CACHE_SIZE:
+            self._listedCache.popitem(last=False)
+
+        return listed
+
+    def is_listed(self, valueDate, dates):
+
+        return np.isin(to_datetime64(dates), self.listed(valueDate))
+
+    def nearest(self, valueDate, tenors=None, targetDates=None, mode="nearest"):
+
+        # listed expiry per tenor ("3M", "1Y" or numeric months) or per target date; mode "nearest" (ties to the later expiry),
+        # "after" (first on or after the target) or "before" (last on or before the target, first listed if none)
+        scalar = targetDates is None and np.ndim(tenors) == 0
+        key = (str(valueDate), tenors, mode) if scalar else None
+        if scalar and key in self._nearestCache.keys():
+            return self._nearestCache[key]
+
+        listed = self.listed(valueDate)
+        if targetDates is None:
+            tenors = np.atleast_1d(tenors)
+            if np.issubdtype(tenors.dtype, np.number):
+                tenors = np.array(["{}M".format(int(round(m))) for m in tenors], dtype=object)
+            targetDates = add_tenors(valueDate, tenors)
+        target = np.atleast_1d(to_datetime64(targetDates))
+
+        i = np.searchsorted(listed, target)
+        after = listed[np.minimum(i, len(listed) - 1)]
+        before = listed[np.maximum(np.where(after == target, i, i - 1), 0)]
+        if mode == "after":
+            result = after
+        elif mode == "before":
+            result = before
+        else:
+            result = np.where((target - before) < (after - target), before, after)
+
+        if scalar:
+            result.setflags(write=False)
+            self._nearestCache[key] = result
+            while len(self._nearestCache) > LISTED_CACHE_SIZE:
+                self._nearestCache.pop(next(iter(self._nearestCache)))
+
+        return result
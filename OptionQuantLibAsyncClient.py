@@ -0,0 +1,619 @@
+import asyncio
+import json, time
+from datetime import datetime
+import OptionQuantLibInstrumentation as oqi
+import OptionQuantLibClientAPI as api
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+with open("config.json", "r") as f:
+    config = json.load(f)
+
+api_url = config["api_url"]
+
+# per-endpoint timeouts in seconds, everything else uses DEFAULT_TIMEOUT
+DEFAULT_TIMEOUT = 30
+ENDPOINT_TIMEOUTS = {"getOptionChainVol": 60*20,
+                     "getOptionChainRepo": 60*5,
+                     "fitVolSurfaceSVI": 300}
+
+# helper functions
+def mergeDict(d1, d2):
+
+    return {k:v for k,v in list(d1.items())+list(d2.items())}
+
+def parse_result(text):
+
+    # {"result": ...} style responses of the reference data endpoints
+    try:
+        result = json.loads(text)
+        if "error" in result.keys():
+            return None
+        else:
+            return result["result"]
+    except:
+        return None
+
+def parse_error(text):
+
+    # responses whose error is returned as the raw response text
+    result = json.loads(text)
+    if "error" in result.keys():
+        return {"error": text}
+    else:
+        return result
+
+def parse_safe(text):
+
+    try:
+        return json.loads(text)
+    except:
+        return {"error": text}
+
+class AsyncOptionQuantLibClient:
+
+    # awaitable mirror of OptionQuantLibClientAPI, one pooled aiohttp session per client; retries, circuit breaker and
+    # payload codecs follow the sync client (TRANSPORT_DEFAULTS / config "transport" / transport, api.payloadConfig)
+    def __init__(self, apiUrl=None, maxConcurrency=32, connectionLimit=64, timeouts=None, transport=None):
+
+        self.apiUrl = api_url if apiUrl is None else apiUrl
+        self.maxConcurrency = maxConcurrency
+        self.connectionLimit = connectionLimit
+        self.timeouts = mergeDict(ENDPOINT_TIMEOUTS, {} if timeouts is None else timeouts)
+        # the sync ResilientSession supplies the retry policy (idempotency, backoff, Retry-After) and per-host breakers
+        self.policy = api.ResilientSession(mergeDict(config.get("transport", {}), {} if transport is None else transport))
+        self.transport = self.policy.transport
+        self.payloadCodec = None
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+
+        await self.close()
+
+    async def open(self):
+
+        if aiohttp is None:
+            raise ImportError("AsyncOptionQuantLibClient needs aiohttp, pip install aiohttp")
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.connectionLimit, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, headers={"Accept-Encoding": self.transport["acceptEncoding"]})
+            self._semaphore = asyncio.Semaphore(self.maxConcurrency)
+
+    async def close(self):
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.policy.close()
+
+    async def _request(self, method, endpoint, body=None, data=False, payload=None, raw=False):
+
+        # payload: (bytes, headers) from api.encode_payload; raw=True returns (status, content type, bytes) instead of the text
+        await self.open()
+        timeout = aiohttp.ClientTimeout(total=self.timeouts.get(endpoint, DEFAULT_TIMEOUT))
+        if payload is None:
+            payload = None if body is None else json.dumps(body)
+            kwargs = {} if body is None else ({"data": payload} if data else {"data": payload, "headers": {"Content-Type": "application/json"}})
+        else:
+            payload, headers = payload
+            kwargs = {"data": payload, "headers": headers}
+        url = self.apiUrl + "api/v1/" + endpoint
+        breaker = self.policy.breaker(url)
+        idempotent = self.policy.is_idempotent(method, url)
+        sent = 0 if payload is None else len(payload)
+
+        async with self._semaphore:
+            for attempt in range(self.transport["maxRetries"] + 1):
+                if not breaker.allow():
+                    raise api.CircuitOpenError("circuit open for " + url)
+                start = time.time()
+                t0 = time.perf_counter()
+                try:
+                    async with self._session.request(method, url, timeout=timeout, **kwargs) as response:
+                        content = await response.read()
+                        status, contentType = response.status, response.headers.get("Content-Type", "")
+                        charset = response.charset or "utf-8"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    oqi.instrumentation.record_request(url, method, start, time.perf_counter() - t0, sent, error=type(e).__name__ + ": " + str(e))
+                    breaker.record(False)
+                    # a refused connect never reached the server, anything else is only retried when idempotent
+                    notSent = isinstance(e, aiohttp.ClientConnectorError)
+                    if attempt >= self.transport["maxRetries"] or not (idempotent or notSent):
+                        raise
+                    oqi.instrumentation.record_retry(url)
+                    await asyncio.sleep(self.policy.backoff(attempt))
+                    continue
+
+                oqi.instrumentation.record_request(url, method, start, time.perf_counter() - t0, sent, len(content), status)
+                breaker.record(status < 500)
+                retryable = status in self.transport["retryStatus"] and (idempotent or status == 429)
+                if not retryable or attempt >= self.transport["maxRetries"]:
+                    break
+                oqi.instrumentation.record_retry(url)
+                await asyncio.sleep(self.policy.backoff(attempt, response))
+
+        if raw:
+            return status, contentType, content
+        return content.decode(charset, errors="replace")
+
+    async def _post(self, endpoint, body=None, data=False):
+
+        return await self._request("POST", endpoint, body, data)
+
+    async def _get(self, endpoint):
+
+        return await self._request("GET", endpoint)
+
+    async def negotiate_payloadCodec(self, force=False):
+
+        # same negotiation as api.negotiate_payloadCodec, kept on this client
+        if api.payloadConfig["codec"] is not None:
+            return api.payloadConfig["codec"], api.payloadConfig["compression"]
+        negotiated = self.payloadCodec
+        if negotiated is not None and not force and (negotiated["retryAt"] is None or time.monotonic() < negotiated["retryAt"]):
+            return negotiated["codec"], negotiated["compression"]
+
+        try:
+            status, contentType, content = await self._request("GET", "getPayloadCodecs", raw=True)
+            if status in (404, 405):
+                server = {}
+            elif status >= 400:
+                raise RuntimeError("getPayloadCodecs {}".format(status))
+            else:
+                server = json.loads(content)
+            codecs, compressions = server.get("codecs", []), server.get("compression", [])
+            retryAt = None
+        except Exception:
+            codecs, compressions = [], []
+            retryAt = time.monotonic() + api.payloadConfig["negotiateRetry"]
+
+        self.payloadCodec = {"codec": next((c for c in api.payloadConfig["preference"] if c in codecs and api.PAYLOAD_CODECS[c]["available"]), "repr"),
+                             "compression": next((c for c in api.payloadConfig["compressionPreference"]
+                                                  if c in compressions and api.PAYLOAD_COMPRESSION[c]["available"]), None),
+                             "retryAt": retryAt}
+
+        return self.payloadCodec["codec"], self.payloadCodec["compression"]
+
+    async def _postPayload(self, endpoint, body, payloadFields, tableField=None):
+
+        # POST with large fields in the negotiated codec, JSON or msgpack response as in api.load_response
+        codec, compression = await self.negotiate_payloadCodec()
+        status, contentType, content = await self._request("POST", endpoint, payload=api.encode_payload(body, payloadFields, codec, compression, tableField),
+                                                           raw=True)
+        try:
+            if contentType.startswith("application/msgpack") and api.msgpack is not None:
+                return api.msgpack.unpackb(content)
+            return api.json_loads(content)
+        except Exception:
+            return {"error": content.decode("utf-8", errors="replace")}
+
+    async def gather(self, method, argsList):
+
+        # run one endpoint over many argument tuples concurrently, bounded by the semaphore
+        fn = getattr(self, method)
+        return await asyncio.gather(*[fn(*args) if isinstance(args, tuple) else fn(args) for args in argsList])
+
+    # reference data
+    async def fetch_underlyingDatabase(self):
+
+        try:
+            return json.loads(await self._post("fetchUnderlyingDatabase"))
+        except:
+            return {}
+
+    async def get_RIC(self, undlName):
+
+        return parse_result(await self._post("getRIC", {"undlName": undlName}))
+
+    async def get_BBG(self, undlName):
+
+        return parse_result(await self._post("getBBG", {"undlName": undlName}))
+
+    async def get_OBB(self, undlName):
+
+        return parse_result(await self._post("getOBB", {"undlName": undlName}))
+
+    async def get_symbol(self, undlName):
+
+        return parse_result(await self._post("getSymbol", {"undlName": undlName}))
+
+    async def get_systemName(self, undlName):
+
+        return parse_result(await self._post("getSystemName", {"undlName": undlName}))
+
+    async def get_undlType(self, undlName):
+
+        return parse_result(await self._post("getUndlType", {"undlName": undlName}))
+
+    async def get_calendar(self, undlName):
+
+        return parse_result(await self._post("getCalendar", {"undlName": undlName}, data=True))
+
+    async def get_CCY(self, undlName):
+
+        return parse_result(await self._post("getCCY", {"undlName": undlName}, data=True))
+
+    async def get_DVDCCY(self, undlName):
+
+        return parse_result(await self._post("getDVDCCY", {"undlName": undlName}, data=True))
+
+    async def get_listedExerciseType(self, undlName):
+
+        return parse_result(await self._post("getListedExerciseType", {"undlName": undlName}, data=True))
+
+    async def get_exchange(self, undlName):
+
+        return parse_result(await self._post("getExchange", {"undlName": undlName}, data=True))
+
+    # market data
+    async def get_yieldCurve(self, ccy, dateRef=None):
+
+        body = {"ccy": "None" if ccy is None else ccy, "date": "None" if dateRef is None else dateRef}
+        return json.loads(await self._post("getYieldCurve", body))
+
+    async def get_dividend(self, undlName, dateRef=None):
+
+        body = {"undlName": undlName, "date": "None" if dateRef is None else dateRef}
+        return json.loads(await self._post("getDividend", body))
+
+    async def get_repo(self, undlName, dateRef=None):
+
+        body = {"undlName": undlName, "date": "None" if dateRef is None else dateRef}
+        return json.loads(await self._post("getRepo", body))
+
+    async def get_repoRate(self, undlName, maturity, repoCurve=None, dateRef=None):
+
+        body = {"undlName": undlName,
+                "maturity": maturity,
+                "repo": str(repoCurve) if repoCurve is not None else "None",
+                "date": "None" if dateRef is None else dateRef}
+        try:
+            return json.loads(await self._post("getRepoRate", body))["rate"]
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def get_volSurfaceSVI(self, undlName, dateRef=None):
+
+        body = {"undlName": undlName, "date": "None" if dateRef is None else dateRef}
+        result = json.loads(await self._post("getVolSurfaceSVI", body))
+        return None if "error" in result.keys() else result
+
+    async def get_spot(self, undlName, delay=0):
+
+        return parse_error(await self._post("getSpot", {"undlName": undlName, "n": delay}, data=True))
+
+    async def get_spotHist(self, undlName, historicalDate="None"):
+
+        return parse_error(await self._post("getSpotHistorical", {"undlName": undlName, "date": historicalDate}, data=True))
+
+    async def get_FX(self, undlName, delay=0):
+
+        return parse_error(await self._post("getFX", {"undlName": undlName, "n": delay}, data=True))
+
+    async def get_exchangeDate(self, calendar, returnType="date"):
+
+        result = parse_result(await self._post("getExchangeDate", {"calendar": calendar}))
+        if result is not None and returnType == "date":
+            return result.split("T")[0]
+        return result
+
+    async def get_exchangeTimeZone(self, calendar):
+
+        try:
+            result = json.loads(await self._post("getExchangeTimeZone", {"calendar": "None" if calendar is None else calendar}))
+            return None if "error" in result.keys() else result
+        except:
+            return None
+
+    async def get_holidayCalendar(self, calendar):
+
+        text = await self._get("getHolidayCalendar")
+        result = json.loads(text)
+        if "error" in result.keys():
+            return {"error": text}
+        if calendar is None:
+            return result
+        return result[calendar] if calendar in result.keys() else None
+
+    # option chain
+    async def get_VSFBatch(self):
+
+        return json.loads(await self._get("getVSFBatch"))
+
+    async def get_optionChainDataCrypto(self, undlName):
+
+        return json.loads(await self._post("getOptionChainDataCrypto", {"undlName": undlName}))
+
+    async def save_cryptoFutureData(self, undlName):
+
+        return json.loads(await self._post("saveCryptoFutureData", {"undlName": undlName}))
+
+    async def get_cryptoFutureData(self, undlName):
+
+        return json.loads(await self._post("getCryptoFutureData", {"undlName": undlName}))
+
+    async def get_optionChainVolLazy(self, undlName):
+
+        text = await self._post("getOptionChainVol_lazy", {"undlName": undlName})
+        try:
+            result = json.loads(text)
+            if result["lastVol"] == "None":
+                result["lastVol"] = None
+        except:
+            result = {"error": text}
+        return result
+
+    async def get_optionChainATMVolLazy(self, undlName):
+
+        text = await self._post("getOptionChainATMVol_lazy", {"undlName": undlName})
+        try:
+            result = json.loads(text)
+            if result["lastVol"] == "None":
+                result["lastVol"] = None
+            if result["data"] == "None":
+                result["data"] = None
+        except:
+            result = {"error": text}
+        return result
+
+    async def calc_impliedDistribution(self, undlName, maturity, valueDate, volSurfaceSVI="None", interval=0.02, step=0.002, return_upper=4):
+
+        body = {"undlName": undlName, "maturity": maturity, "valueDate": valueDate, "volSurfaceSVI": str(volSurfaceSVI), "interval": interval, "step": step, "return_upper": return_upper}
+        return parse_safe(await self._post("calcImpliedDistribution", body))
+
+    async def check_impliedDistribution(self, volSurfaceSVI):
+
+        return parse_safe(await self._post("checkImpliedDistribution", {"volSurfaceSVI": str(volSurfaceSVI)}))
+
+    async def get_optionChainVol(self, optionChainData):
+
+        if optionChainData is None:
+            return {"error": None}
+        return await self._postPayload("getOptionChainVol", {"data": optionChainData}, ["data"], tableField="data")
+
+    async def get_optionChainRepo(self, optionChainData):
+
+        if optionChainData is None:
+            return {"error": None}
+        return parse_safe(await self._post("getOptionChainRepo", {"data": str(optionChainData)}))
+
+    async def forecast_stockDiv(self, undlName, factor=1, forecastYear=8):
+
+        return parse_safe(await self._post("forecastStockDiv", {"undlName": undlName, "factor": factor, "forecastYear": forecastYear}))
+
+    async def fit_divGrowthFactor(self, undlName, impliedDiv):
+
+        return parse_safe(await self._post("fitDivGrowthFactor", {"undlName": undlName, "impliedDiv": str(impliedDiv)}))
+
+    # calendar
+    async def get_netBusinessDays(self, fromDate, toDate, calendar):
+
+        return parse_safe(await self._post("netBusinessDays", {"fromDate": fromDate, "toDate": toDate, "calendar": calendar}))
+
+    async def get_nextBusinessDay(self, refDate, dayShift, calendar):
+
+        return parse_safe(await self._post("nextBusinessDay", {"refDate": refDate, "dayShift": dayShift, "calendar": calendar}))
+
+    async def is_holiday(self, refDate, calendar):
+
+        return parse_safe(await self._post("isHoliday", {"refDate": refDate, "calendar": calendar}))
+
+    async def discount_cashFlow(self, cashFlow, refDate, payDate, yieldCurve):
+
+        body = {"cashFlow": cashFlow, "refDate": refDate, "payDate": payDate, "yieldCurve": str(yieldCurve)}
+        return json.loads(await self._post("discountCashFlow", body))
+
+    # vol surface
+    async def _calc_SVIJW(self, endpoint, moneyness, paramsSVI):
+
+        myStrikes = [moneyness] if (type(moneyness) == float or type(moneyness) == int) else moneyness
+        text = await self._post(endpoint, mergeDict({"moneyness": list(myStrikes)}, paramsSVI))
+        result = json.loads(text)
+        if "error" in result.keys():
+            return {"error": text}
+        return {float(k): v for k,v in result.items()}
+
+    async def calc_SVIJW_SpotMoney(self, moneyness, paramsSVI):
+
+        return await self._calc_SVIJW("SVIJW_SpotMoney", moneyness, paramsSVI)
+
+    async def calc_SVIJW_FwdMoney(self, moneyness, paramsSVI):
+
+        return await self._calc_SVIJW("SVIJW_FwdMoney", moneyness, paramsSVI)
+
+    async def to_SVI(self, paramsSVIJW):
+
+        body = {k: paramsSVIJW[k] for k in ["vol", "skew", "pWing", "cWing", "minVol", "tau", "forward"]}
+        return json.loads(await self._post("toSVI", body))
+
+    async def to_SVIJW(self, paramsSVIJW):
+
+        body = {k: paramsSVIJW[k] for k in ["a", "b", "rho", "m", "sigma", "tau", "forward"]}
+        return json.loads(await self._post("toSVIJW", body))
+
+    async def get_vol(self, undlName, maturity, strike, volSurfaceSVI=None, historicalDate=None):
+
+        body = {"undlName": undlName,
+                "maturity": maturity,
+                "strike": strike,
+                "volSurfaceSVI": "None" if volSurfaceSVI is None else str(volSurfaceSVI),
+                "historicalDate": "None" if historicalDate is None else historicalDate}
+        return json.loads(await self._post("getVol", body))
+
+    async def get_pctDeltaVol(self, undlName, maturity, pctDelta, spotRef=None, historicalDate=None):
+
+        body = {"undlName": undlName,
+                "maturity": maturity,
+                "pctDelta": pctDelta,
+                "spotRef": "None" if spotRef is None else str(round(spotRef, 4)),
+                "historicalDate": "None" if historicalDate is None else historicalDate}
+        try:
+            return json.loads(await self._post("getPctDeltaVol", body))
+        except:
+            return {"vol": 0}
+
+    async def get_volSmile(self, undlName, maturity, strikes, volSurfaceSVI=None, historicalDate=None):
+
+        if type(strikes) == float or type(strikes) == int:
+            strikes = [strikes]
+        body = {"undlName": undlName,
+                "maturity": maturity,
+                "strikes": list(strikes),
+                "volSurfaceSVI": "None" if volSurfaceSVI is None else str(volSurfaceSVI),
+                "historicalDate": "None" if historicalDate is None else historicalDate}
+        return json.loads(await self._post("getVolSmile", body))
+
+    async def get_volGrid(self, undlName, maturities, strikes, volSurfaceSVI=None, marketData=None, historicalDate=None):
+
+        if type(strikes) == float or type(strikes) == int:
+            strikes = [strikes]
+        if type(maturities) == str:
+            maturities = [maturities]
+        body = {"undlName": undlName,
+                "maturities": list(maturities),
+                "strikes": list(strikes),
+                "volSurfaceSVI": "None" if volSurfaceSVI is None else volSurfaceSVI,
+                "marketData": "None" if marketData is None else marketData,
+                "historicalDate": "None" if historicalDate is None else historicalDate}
+        return await self._postPayload("getVolGrid", body, ["volSurfaceSVI", "marketData"])
+
+    async def check_volSurfaceArb(self, volSurfaceSVI, marketDataDict, valueDate):
+
+        body = {"volSurfaceSVI": volSurfaceSVI, "marketData": marketDataDict, "valueDate": valueDate}
+        return await self._postPayload("checkVolSurfaceArb", body, ["volSurfaceSVI", "marketData"])
+
+    # pricing, params are copied rather than modified
+    async def calc_European(self, params, calcWhat=["NPV"]):
+
+        return json.loads(await self._post("European", mergeDict(params, {"calcWhat": calcWhat})))
+
+    async def calc_EuropeanImpliedVol(self, params):
+
+        return json.loads(await self._post("EuropeanImpliedVol", dict(params)))
+
+    async def calc_American(self, params, calcWhat=["NPV"]):
+
+        return json.loads(await self._post("American", mergeDict(params, {"calcWhat": calcWhat})))
+
+    async def calc_AmericanImpliedVol(self, params):
+
+        return json.loads(await self._post("AmericanImpliedVol", dict(params)))
+
+    async def fit_volSurfaceSVI(self, volData, repoFitted, volModel, username):
+
+        body = {"volModel": volModel, "volData": volData, "repoData": repoFitted, "username": username}
+        return await self._postPayload("fitVolSurfaceSVI", body, ["volData", "repoData"])
+
+    async def get_listedMaturityRule(self):
+
+        try:
+            return json.loads(await self._get("getListedMaturityRule"))
+        except Exception as e:
+            return {"error": str(e)}
+
+    # uploads
+    async def upload_volSurfaceSVI(self, volSurfaceSVI):
+
+        return await self._postPayload("uploadVolSurfaceSVI", {"volSurfaceSVIStr": volSurfaceSVI}, ["volSurfaceSVIStr"])
+
+    async def upload_dividend(self, divPanel):
+
+        div = {"undlName": divPanel["undlName"],
+               "lastUpdate": divPanel["lastUpdate"],
+               "lastUpdateTime": datetime.strftime(datetime.now(), "%Y-%m-%dT%H:%M:%S"),
+               "Schedule": divPanel["Schedule"]}
+        return json.loads(await self._post("uploadDividend", {"divStr": str(div)}))
+
+    async def upload_repo(self, repoPanel):
+
+        repo = {"undlName": repoPanel["undlName"],
+                "lastUpdate": repoPanel["lastUpdate"],
+                "lastUpdateTime": datetime.strftime(datetime.now(), "%Y-%m-%dT%H:%M:%S"),
+                "Schedule": repoPanel["Schedule"]}
+        return json.loads(await self._post("uploadRepo", {"repoStr": str(repo)}))
+
+    async def upload_data(self, data: dict, dataType: str):
+
+        return json.loads(await self._post("uploadData", {"jsonStr": str(data), "dataType": dataType}))
+
+    async def upload_yieldCurve(self, yieldCurvePanel):
+
+        return json.loads(await self._post("uploadYieldCurve", {"yieldCurveStr": str(yieldCurvePanel)}))
+
+    # forwards and maturities
+    async def calc_forward(self, spotRef, maturity, marketDataParams, valueDate):
+
+        body = {"spotRef": spotRef, "maturity": maturity,
+                "yieldCurve": str(marketDataParams["yieldCurve"]),
+                "divCurve": str(marketDataParams["divCurve"]),
+                "repoCurve": str(marketDataParams["repoCurve"]),
+                "calendar": marketDataParams["calendar"],
+                "valueDate": valueDate}
+        return json.loads(await self._post("calcForward", body))
+
+    async def calc_forwards(self, spotRef, maturities, marketDataParams, valueDate):
+
+        body = {"spotRef": spotRef, "maturities": maturities,
+                "yieldCurve": str(marketDataParams["yieldCurve"]),
+                "divCurve": str(marketDataParams["divCurve"]),
+                "repoCurve": str(marketDataParams["repoCurve"]),
+                "calendar": marketDataParams["calendar"],
+                "valueDate": valueDate}
+        return json.loads(await self._post("calcForwards", body))
+
+    async def get_listedMaturity(self, months, calendar_undlType):
+
+        return json.loads(await self._post("getListedMaturity", {"months": months, "calendar_undlType": calendar_undlType}))
+
+    async def upload_undlNameInfo(self, infoDcit):
+
+        return json.loads(await self._post("uploadUndlNameInfo", infoDcit))
+
+    async def delete_undlNameInfo(self, undlName):
+
+        return json.loads(await self._post("deleteUndlNameInfo", {"undlName": undlName}))
+
+    # vol surface fit batch
+    async def get_VSFBatchConfig(self):
+
+        try:
+            return json.loads(await self._get("getVSFBatchConfig"))
+        except Exception as e:
+            return {"error": e}
+
+    async def upload_VSFBatchConfig(self, VSFBatchConfig: dict):
+
+        return json.loads(await self._post("uploadVSFBatchConfig", {"string": str(VSFBatchConfig)}))
+
+    async def upload_VSFBatchLog(self, batchName: str, startTime: str, finishTime: str, log: dict):
+
+        body = {"batchName": batchName, "startTime": startTime, "finishTime": finishTime, "log": str(log)}
+        return json.loads(await self._post("uploadVSFBatchLog", body))
+
+    async def get_VSFBatchLog(self):
+
+        return json.loads(await self._get("getVSFBatchLog"))
+
+async def load_marketData(undlNames, client=None):
+
+    # spot, SVI surface, dividend and repo for a universe, fanned out concurrently
+    ownClient = client is None
+    client = AsyncOptionQuantLibClient() if ownClient else client
+
+    try:
+        results = await asyncio.gather(*[asyncio.gather(client.get_spot(u), client.get_volSurfaceSVI(u), client.get_dividend(u), client.get_repo(u))
+                                         for u in undlNames])
+    finally:
+        if ownClient:
+            await client.close()
+
+    return {u: {"spot": r[0], "volSurfaceSVI": r[1], "divCurve": r[2], "repoCurve": r[3]} for u, r in zip(undlNames, results)}
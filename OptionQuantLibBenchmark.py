@@ -0,0 +1,239 @@
+import numpy as np
+import time, copy, sys
+from concurrent.futures import ThreadPoolExecutor
+import OptionQuantLibClientAPI as api
+import OptionQuantLibAnalytics as oqa
+import OptionQuantLibInstrumentation as oqi
+
+# helper functions
+def timed(fn, *args, **kwargs):
+
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+
+    return result, time.perf_counter() - t0
+
+def report(name, n, seconds):
+
+    print("{:<40s} n={:<8d} {:>10.4f}s {:>14.1f} /s".format(name, n, seconds, n / seconds if seconds > 0 else float("inf")))
+
+# European pricer: remote api/v1/European vs local batch engine
+def bench_European(params, calcWhat=["NPV", "delta", "gamma", "vega", "theta"], nRemote=20, nLocal=200000):
+
+    remoteResults = []
+    t0 = time.perf_counter()
+    for i in range(nRemote):
+        remoteResults.append(api.calc_European(copy.deepcopy(params), calcWhat))
+    report("calc_European (remote)", nRemote, time.perf_counter() - t0)
+
+    cols, seconds = timed(oqa.params_to_columns, [params])
+    tiled = {k: np.repeat(v, nLocal, axis=0) for k, v in cols.items()}
+    local, seconds = timed(oqa.calc_EuropeanArrays, calcWhat=calcWhat, **tiled)
+    report("calc_EuropeanArrays (local)", nLocal, seconds)
+
+    diff = {k: abs(float(remoteResults[0][k]) - float(local[k][0])) for k in calcWhat if k in remoteResults[0].keys()}
+    print("remote vs local abs diff:", diff)
+
+    return diff
+
+# American pricer: remote api/v1/American per strike vs local shared-grid chain
+def bench_American(params, strikes, calcWhat=["NPV", "delta", "gamma"], presets=["fast", "standard", "accurate"]):
+
+    paramsList = [oqa.mergeDict(params, {"strike": k}) for k in strikes]
+
+    remoteResults = []
+    t0 = time.perf_counter()
+    for p in paramsList:
+        remoteResults.append(api.calc_American(copy.deepcopy(p), calcWhat))
+    report("calc_American (remote)", len(paramsList), time.perf_counter() - t0)
+
+    diffs = {}
+    for preset in presets:
+        local, seconds = timed(oqa.calc_AmericanBatch, paramsList, calcWhat, preset)
+        report("calc_AmericanBatch ({})".format(preset), len(paramsList), seconds)
+        diffs[preset] = {k: max(abs(float(r[k]) - float(local[k][i])) for i, r in enumerate(remoteResults) if k in r.keys()) for k in calcWhat}
+        print("remote vs local max abs diff:", diffs[preset])
+
+    return diffs
+
+# payload codecs: encode/decode time and wire size on a synthetic option chain
+def sample_optionChain(nQuotes=5000, undlName="NVDA.OQ", spotRef=100.0):
+
+    rng = np.random.default_rng(0)
+    maturities = ["2026-{:02d}-19".format(m) for m in range(1, 13)] + ["2027-{:02d}-19".format(m) for m in [3, 6, 9, 12]]
+    data = []
+    for i in range(nQuotes):
+        strike = round(float(spotRef * rng.uniform(0.3, 2.0)), 1)
+        mid = round(float(rng.uniform(0.05, 40.0)), 4)
+        data.append({"maturity": maturities[i % len(maturities)], "strike": strike, "optionType": "C" if i % 2 == 0 else "P",
+                     "bid": round(mid * 0.98, 4), "ask": round(mid * 1.02, 4), "mid": mid,
+                     "volume": int(rng.integers(0, 5000)), "openInterest": int(rng.integers(0, 50000))})
+
+    return {"undlName": undlName, "spotRef": spotRef, "valueDate": "2026-01-02", "data": data}
+
+def bench_codecs(nQuotes=5000, repeat=5):
+
+    chain = sample_optionChain(nQuotes)
+    body = {"data": chain}
+    results = {}
+
+    for codec, spec in api.PAYLOAD_CODECS.items():
+        if not spec["available"]:
+            print("{:<20s} not installed".format(codec))
+            continue
+        for compression in [None] + [c for c, cs in api.PAYLOAD_COMPRESSION.items() if cs["available"]]:
+            api.payloadConfig["minCompressSize"] = 0
+            t0 = time.perf_counter()
+            for i in range(repeat):
+                data, headers = api.encode_payload(body, ["data"], codec, compression, tableField="data")
+            encodeTime = (time.perf_counter() - t0) / repeat
+            t0 = time.perf_counter()
+            for i in range(repeat):
+                api.decode_payload(data, headers)
+            decodeTime = (time.perf_counter() - t0) / repeat
+
+            name = codec + ("" if compression is None else "+" + compression)
+            results[name] = {"encode": encodeTime, "decode": decodeTime, "bytes": len(data)}
+            print("{:<20s} encode {:8.2f}ms  decode {:8.2f}ms  {:>10d} bytes".format(name, encodeTime * 1e3, decodeTime * 1e3, len(data)))
+
+    return results
+
+# offline suite against the local mock server: throughput and client-side p50 / p99 per workload
+def report_workload(name, n, seconds):
+
+    stats = oqi.get_endpointStats()
+    samples = sum(s["count"] for s in stats.values())
+    p50 = max([s["p50"] for s in stats.values() if s["p50"] is not None], default=0.0)
+    p99 = max([s["p99"] for s in stats.values() if s["p99"] is not None], default=0.0)
+    print("{:<32s} n={:<7d} {:>9.3f}s {:>11.1f} /s  requests={:<6d} p50 {:7.1f}ms  p99 {:7.1f}ms".format(
+        name, n, seconds, n / seconds if seconds > 0 else float("inf"), samples, p50 * 1e3, p99 * 1e3))
+    oqi.instrumentation.stats.reset()
+
+    return {"n": n, "seconds": seconds, "requests": samples, "p50": p50, "p99": p99}
+
+def run_offlineSuite(nNames=50, nPositions=5000, latency=None, maxWorkers=16):
+
+    import OptionQuantLibMockServer as mock
+
+    results = {}
+    with mock.MockServer(latency=latency) as server:
+        apiUrl = api.api_url
+        api.api_url = server.url
+        api.payloadConfig["codec"] = None
+        api.referenceCache.invalidate()
+        oqi.instrumentation.stats.reset()
+        try:
+            names = ["MOCK{:03d}.OQ".format(i) for i in range(nNames)]
+            print("mock analytic endpoints run the local library: remote timings are round trip cost, not a check of local results")
+
+            result, seconds = timed(lambda: [api.get_CCY(u) for u in names])
+            results["referencePull"] = report_workload("reference lookups (remote)", nNames, seconds)
+            api.referenceCache.invalidate()
+            result, seconds = timed(api.seed_referenceCache)
+            results["referenceSeed"] = report_workload("reference seed (one request)", mock.MOCK_UNIVERSE, seconds)
+            results["referenceSeedMatch"] = all(api.get_BBG(u) == mock._reference("BBG")({"undlName": u})["result"] for u in names)
+            print("{:<32s} {}".format("reference seed == getters", results["referenceSeedMatch"]))
+            api.referenceCache.invalidate()
+
+            snapshots, seconds = timed(api.get_marketDataSnapshot, names, None, maxWorkers)
+            results["universeLoad"] = report_workload("universe load (snapshot)", nNames, seconds)
+
+            with ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+                result, seconds = timed(lambda: list(pool.map(api.get_spot, names)))
+            results["spotPull"] = report_workload("spot poll (pull)", nNames, seconds)
+            with api.subscribe_spot(names, ["spot"]) as subscription:
+                subscription.wait()
+                oqi.instrumentation.stats.reset()
+                result, seconds = timed(lambda: [api.get_spotLive(u, maxAge=5.0) for i in range(100) for u in names])
+                results["spotLive"] = report_workload("spot reads (live cache)", 100 * nNames, seconds)
+
+            tenors = [1, 2, 3, 6, 9, 12, 18, 24]
+            remote, seconds = timed(lambda: [api.get_listedMaturity(m, "XNYS_Stock") for m in tenors])
+            results["listedRemote"] = report_workload("listed maturity (remote)", len(tenors), seconds)
+            api.register_expiryCalendar("XNYS_Stock", mock.LISTED_RULES["XNYS_Stock"], mock.CALENDAR)
+            oqi.instrumentation.stats.reset()
+            result, seconds = timed(lambda: [api.get_listedMaturityLocal(m, "XNYS_Stock", mock.VALUE_DATE) for i in range(1000) for m in tenors])
+            results["listedLocal"] = report_workload("listed maturity (local)", 1000 * len(tenors), seconds)
+            listed = list(api.get_listedMaturitiesLocal("XNYS_Stock", mock.VALUE_DATE)["maturities"])
+            results["listedMatch"] = listed == mock.LISTED_EXPIRIES["XNYS_Stock"] and [r["maturity"] for r in remote] == [r["maturity"] for r in result[:len(tenors)]]
+            print("{:<32s} {}".format("listed maturity local == remote", results["listedMatch"]))
+
+            chain = mock.mock_optionChain(names[0])
+            result, seconds = timed(api.get_optionChainVol, chain)
+            results["chainIV"] = report_workload("chain IV (remote)", len(chain["data"]), seconds)
+            result, seconds = timed(api.get_optionChainVolLocal, chain)
+            results["chainIVLocal"] = report_workload("chain IV (local)", len(chain["data"]), seconds)
+
+            result, seconds = timed(api.fit_volSurfaceSVI, chain, mock.mock_repoCurve(names[0]), "SVI-JW", "bench")
+            results["surfaceFit"] = report_workload("surface fit (remote)", 1, seconds)
+            quotes = api.get_optionChainVolLocal(chain)
+            result, seconds = timed(api.fit_volSurfaceSVIIncremental, names[0], quotes, None, 0.0, False, snapshots[names[0]].volSurfaceSVI)
+            results["surfaceFitLocal"] = report_workload("surface refit (local)", 1, seconds)
+
+            rng = np.random.default_rng(0)
+            blotter = ["{} {} {}% {}".format(names[rng.integers(nNames)], ["1W", "1M", "3M", "6M", "1Y", "2Y"][rng.integers(6)], rng.integers(60, 140), "CP"[rng.integers(2)])
+                       for i in range(nPositions)]
+            table, seconds = timed(api.resolve_quoteStrings, blotter)
+            results["blotterResolve"] = report_workload("blotter resolve", nPositions, seconds)
+            result, seconds = timed(api.quoteTable_to_params, table, snapshots)
+            results["blotterParams"] = report_workload("blotter to params (local)", nPositions, seconds)
+
+            snapshot = snapshots[names[0]]
+            marketData = {"yieldCurve": dict(snapshot.yieldCurve), "divCurve": dict(snapshot.divCurve), "repoCurve": dict(snapshot.repoCurve)}
+            book = [oqa.mergeDict(marketData, {"spotRef": snapshot.spot, "strike": snapshot.spot * rng.uniform(0.7, 1.3), "valueDate": mock.VALUE_DATE,
+                                               "maturity": mock.listed_maturities()[rng.integers(12)], "optionType": "Call" if rng.random() < 0.5 else "Put", "vol": 0.3})
+                    for i in range(nPositions)]
+            greeks = ["NPV", "delta", "gamma", "vega", "theta"]
+            with ThreadPoolExecutor(max_workers=maxWorkers) as pool:
+                result, seconds = timed(lambda: list(pool.map(lambda p: api.calc_European(copy.deepcopy(p), greeks), book[:200])))
+            results["bookRemote"] = report_workload("book reprice (remote)", 200, seconds)
+            result, seconds = timed(api.calc_EuropeanBatch, book, greeks)
+            results["bookRemoteBatch"] = report_workload("book reprice (remote batch)", nPositions, seconds)
+            result, seconds = timed(oqa.calc_EuropeanBatch, book, greeks)
+            results["bookLocal"] = report_workload("book reprice (local)", nPositions, seconds)
+
+            cols = oqa.params_to_columns(book)
+            spotShifts, volShifts = np.linspace(0.8, 1.2, 21), np.linspace(-0.1, 0.1, 11)
+            t0 = time.perf_counter()
+            for ds in spotShifts:
+                for dv in volShifts:
+                    oqa.calc_EuropeanArrays(**oqa.mergeDict(cols, {"spot": cols["spot"] * ds, "vol": cols["vol"] + dv}), calcWhat=greeks)
+            results["greeksGrid"] = report_workload("greeks grid 21x11 (local)", nPositions * len(spotShifts) * len(volShifts), time.perf_counter() - t0)
+            volSurface = oqa.VolSurfaceSVI(dict(snapshot.volSurfaceSVI))
+            result, seconds = timed(oqa.calc_scenarioLadder, book, volSurface, spotShifts - 1, volShifts, [0.0], [0], greeks, maxWorkers=maxWorkers)
+            results["scenarioLadder"] = report_workload("scenario ladder 21x11 (local)", nPositions * len(spotShifts) * len(volShifts), seconds)
+        finally:
+            api.api_url = apiUrl
+            api.payloadConfig["codec"] = None
+
+    return results
+
+if __name__ == "__main__":
+
+    bench_codecs()
+
+    if "--offline" in sys.argv:
+        run_offlineSuite()
+        sys.exit(0)
+
+    undlName = sys.argv[1] if len(sys.argv) > 1 else "NVDA.OQ"
+    valueDate = api.get_exchangeDate(api.get_calendar(undlName))
+    spotRef = api.get_spot(undlName)[undlName]
+
+    params = {"undlName": undlName,
+              "spotRef": spotRef,
+              "strike": spotRef,
+              "valueDate": valueDate,
+              "maturity": oqa.to_date(valueDate).replace(year=oqa.to_date(valueDate).year + 1).strftime("%Y-%m-%d"),
+              "optionType": "Call",
+              "vol": 0.3,
+              "yieldCurve": api.get_yieldCurve(api.get_CCY(undlName)),
+              "divCurve": api.get_dividend(undlName),
+              "repoCurve": api.get_repo(undlName)}
+
+    bench_European(params)
+    bench_American(params, [spotRef * m for m in np.arange(0.5, 1.55, 0.05)])
+
+    for endpoint, s in oqi.get_endpointStats(10).items():
+        print("{:<30s} n={:<6d} total {:8.3f}s  p50 {:8.4f}s  p99 {:8.4f}s  parse {:8.4f}s  {:>10d} bytes in".format(
+            endpoint, s["count"], s["totalTime"], s["p50"], s["p99"], s["parseTime"], s["bytesReceived"]))
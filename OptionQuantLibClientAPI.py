@@ -1,22 +1,813 @@
 import requests
+import requests.adapters
 import numpy as np
 import pandas as pd
-import os, json, time, getpass
+import os, json, time, getpass, threading, functools, inspect, atexit, random, contextvars, hashlib
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
 from ast import literal_eval
+import OptionQuantLibAnalytics as oqa
+import OptionQuantLibInstrumentation as oqi
+import gzip, io
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 with open("config.json", "r") as f:
     config = json.load(f)
 
 api_url = config["api_url"]
 
-sess = requests.Session()
-
 # helper functions
 def mergeDict(d1, d2):
 
     return {k:v for k,v in list(d1.items())+list(d2.items())}
 
+# requests session recording latency, payload sizes and errors of every api/v1 call into oqi.instrumentation
+class InstrumentedSession(requests.Session):
+
+    def request(self, method, url, *args, **kwargs):
+
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except Exception as e:
+            oqi.instrumentation.record_request(url, method, start, time.perf_counter() - t0, error=type(e).__name__ + ": " + str(e))
+            raise
+
+        body = response.request.body
+        if kwargs.get("stream"):
+            bytesReceived = int(response.headers.get("Content-Length", 0))
+        else:
+            bytesReceived = len(response.content)
+        oqi.instrumentation.record_request(url, method, start, time.perf_counter() - t0, 0 if body is None else len(body),
+                                           bytesReceived, response.status_code)
+        return response
+
+# transport: per-host pools, idempotency-aware retries with jittered backoff, keep-alive / compression and a circuit breaker
+TRANSPORT_DEFAULTS = {"poolConnections": 16, "poolMaxsize": 64, "poolBlock": True, "hostPoolMaxsize": {},
+                      "maxRetries": 3, "backoffFactor": 0.25, "backoffMax": 10.0, "retryStatus": [429, 502, 503, 504],
+                      "nonIdempotentPrefixes": ["upload", "delete", "update", "insert", "remove", "save"],
+                      "acceptEncoding": "gzip, deflate", "keepAlive": True,
+                      "breakerThreshold": 5, "breakerCooldown": 30.0}
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+
+    pass
+
+class EndpointUnavailable(Exception):
+
+    # 404 / 405 on an optional endpoint (batch, stream), callers fall back to the older api
+    pass
+
+class CircuitBreaker:
+
+    # closed -> open after `threshold` consecutive failures, half open (one trial request) after `cooldown` seconds
+    def __init__(self, threshold=5, cooldown=30.0):
+
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.openedAt = None
+        self.trialInFlight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+
+        if self.openedAt is None:
+            return "closed"
+        return "halfOpen" if time.time() - self.openedAt >= self.cooldown else "open"
+
+    def allow(self):
+
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "halfOpen" and not self.trialInFlight:
+                self.trialInFlight = True
+                return True
+            return False
+
+    def record(self, success):
+
+        with self._lock:
+            self.trialInFlight = False
+            if success:
+                self.failures = 0
+                self.openedAt = None
+            else:
+                self.failures += 1
+                if self.failures >= self.threshold or self.openedAt is not None:
+                    self.openedAt = time.time()
+
+class ResilientSession(InstrumentedSession):
+
+    def __init__(self, transport=None):
+
+        super().__init__()
+        self.transport = mergeDict(TRANSPORT_DEFAULTS, {} if transport is None else transport)
+        self.breakers = {}
+        self._breakerLock = threading.Lock()
+        # negotiated payload codec per base url, see negotiate_payloadCodec
+        self.payloadCodecs = {}
+
+        t = self.transport
+        self.headers["Accept-Encoding"] = t["acceptEncoding"]
+        self.headers["Connection"] = "keep-alive" if t["keepAlive"] else "close"
+        adapter = requests.adapters.HTTPAdapter(pool_connections=t["poolConnections"], pool_maxsize=t["poolMaxsize"], pool_block=t["poolBlock"])
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        for host, maxsize in t["hostPoolMaxsize"].items():
+            self.mount(host, requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=maxsize, pool_block=t["poolBlock"]))
+
+    def breaker(self, url):
+
+        host = "/".join(url.split("/")[:3])
+        with self._breakerLock:
+            if host not in self.breakers.keys():
+                self.breakers[host] = CircuitBreaker(self.transport["breakerThreshold"], self.transport["breakerCooldown"])
+            return self.breakers[host]
+
+    def is_idempotent(self, method, url):
+
+        endpoint = oqi.endpoint_name(url)
+        return method.upper() in ("GET", "HEAD", "OPTIONS") or not any(endpoint.startswith(p) for p in self.transport["nonIdempotentPrefixes"])
+
+    def backoff(self, attempt, response=None):
+
+        retryAfter = None if response is None else response.headers.get("Retry-After")
+        if retryAfter is not None and retryAfter.replace(".", "", 1).isdigit():
+            return min(float(retryAfter), self.transport["backoffMax"])
+        return random.uniform(0, min(self.transport["backoffMax"], self.transport["backoffFactor"] * 2 ** attempt))
+
+    def request(self, method, url, *args, **kwargs):
+
+        breaker = self.breaker(url)
+        idempotent = self.is_idempotent(method, url)
+
+        for attempt in range(self.transport["maxRetries"] + 1):
+            if not breaker.allow():
+                raise CircuitOpenError("circuit open for " + url)
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.exceptions.RequestException as e:
+                breaker.record(False)
+                # a refused / timed out connect never reached the server, anything else is only retried when idempotent
+                notSent = isinstance(e, requests.exceptions.ConnectTimeout) or "NewConnectionError" in repr(e)
+                if attempt >= self.transport["maxRetries"] or not (idempotent or notSent):
+                    raise
+                oqi.instrumentation.record_retry(url)
+                time.sleep(self.backoff(attempt))
+                continue
+
+            breaker.record(response.status_code < 500)
+            retryable = response.status_code in self.transport["retryStatus"] and (idempotent or response.status_code == 429)
+            if not retryable or attempt >= self.transport["maxRetries"]:
+                return response
+            oqi.instrumentation.record_retry(url)
+            time.sleep(self.backoff(attempt, response))
+
+        return response
+
+# module functions use `sess` / `api_url`; inside OptionQuantLibClient calls both resolve to the active client
+activeClient = contextvars.ContextVar("activeClient", default=None)
+
+class SessionProxy:
+
+    def __init__(self, session):
+
+        self.default = session
+
+    def _resolve(self, url):
+
+        client = activeClient.get()
+        if client is None:
+            return self.default, url
+        if url.startswith(api_url) and client.apiUrl != api_url:
+            url = client.apiUrl + url[len(api_url):]
+        return client.session, url
+
+    def request(self, method, url, *args, **kwargs):
+
+        session, url = self._resolve(url)
+        return session.request(method, url, *args, **kwargs)
+
+    def get(self, url, **kwargs):
+
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    def __getattr__(self, name):
+
+        client = activeClient.get()
+        return getattr(self.default if client is None else client.session, name)
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+
+    # worker threads run in the submitting context so an active client carries over
+    def submit(self, fn, *args, **kwargs):
+
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+sess = SessionProxy(ResilientSession(config.get("transport")))
+
+def configure_transport(**transport):
+
+    # rebuild the default session, e.g. configure_transport(maxRetries=5, poolMaxsize=128)
+    old = sess.default
+    sess.default = ResilientSession(mergeDict(old.transport, transport))
+    sess.default.payloadCodecs = old.payloadCodecs
+    old.close()
+
+    return sess.default.transport
+
+def parse_response(response):
+
+    # json.loads(response.text), timed per endpoint
+    t0 = time.perf_counter()
+    try:
+        return json.loads(response.text)
+    finally:
+        oqi.instrumentation.record_parse(response.url, time.perf_counter() - t0)
+
+# payload codecs
+def _jsonDefault(obj):
+
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="list")
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError("not JSON serializable: " + type(obj).__name__)
+
+def json_dumps(obj):
+
+    if orjson is not None:
+        return orjson.dumps(obj, default=_jsonDefault, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_jsonDefault).encode()
+
+def json_loads(data):
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _toColumns(obj):
+
+    # option chain quotes as columns for Arrow; list of records, dict of lists or DataFrame
+    frame = obj if isinstance(obj, pd.DataFrame) else pd.DataFrame(obj["data"] if isinstance(obj, dict) and "data" in obj.keys() else obj)
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+def arrow_dumps(body, tableField):
+
+    # table field as an Arrow IPC stream, every other field as JSON in the schema metadata
+    table = _toColumns(body[tableField])
+    meta = {k: v for k, v in body.items() if k != tableField}
+    if isinstance(body[tableField], dict):
+        meta[tableField] = {k: v for k, v in body[tableField].items() if k != "data"}
+    table = table.replace_schema_metadata({b"body": json_dumps(meta), b"tableField": tableField.encode()})
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def arrow_loads(data):
+
+    table = pa.ipc.open_stream(io.BytesIO(data)).read_all()
+    body = json_loads(table.schema.metadata[b"body"])
+    tableField = table.schema.metadata[b"tableField"].decode()
+    records = table.to_pandas().to_dict(orient="records")
+    if isinstance(body.get(tableField), dict):
+        body[tableField]["data"] = records
+    else:
+        body[tableField] = records
+    return body
+
+PAYLOAD_CODECS = {"repr": {"contentType": "application/json", "available": True},
+                  "json": {"contentType": "application/json", "available": True},
+                  "msgpack": {"contentType": "application/msgpack", "available": msgpack is not None},
+                  "arrow": {"contentType": "application/vnd.apache.arrow.stream", "available": pa is not None}}
+
+PAYLOAD_COMPRESSION = {"gzip": {"compress": lambda b: gzip.compress(b, compresslevel=5), "decompress": gzip.decompress, "available": True},
+                       "zstd": {"compress": lambda b: zstandard.ZstdCompressor(level=3).compress(b),
+                                "decompress": lambda b: zstandard.ZstdDecompressor().decompress(b), "available": zstandard is not None}}
+
+# codec / compression: None negotiates with the server on first use, anything else is used as is; "repr" is the original
+# str() / literal_eval format. The negotiated codec is kept on the session per base url, so every OptionQuantLibClient talks
+# to its own server in that server's format. A server without getPayloadCodecs (404 / 405) settles on repr, a failed
+# negotiation uses repr and is retried after negotiateRetry seconds
+payloadConfig = {"codec": None, "compression": None, "minCompressSize": 64*1024, "negotiateRetry": 60.0,
+                 "preference": ["arrow", "msgpack", "json"], "compressionPreference": ["zstd", "gzip"]}
+
+def negotiate_payloadCodec(force=False):
+
+    # ask the server which codecs it accepts, falling back to the repr format when it does not answer
+    if payloadConfig["codec"] is not None:
+        return payloadConfig["codec"], payloadConfig["compression"]
+
+    session, req = sess._resolve(api_url + "api/v1/getPayloadCodecs")
+    baseUrl = req[:-len("api/v1/getPayloadCodecs")]
+    negotiated = session.payloadCodecs.get(baseUrl)
+    if negotiated is not None and not force and (negotiated["retryAt"] is None or time.monotonic() < negotiated["retryAt"]):
+        return negotiated["codec"], negotiated["compression"]
+
+    try:
+        response = session.get(req, timeout=10)
+        if response.status_code in (404, 405):
+            server = {}
+        else:
+            response.raise_for_status()
+            server = parse_response(response)
+        codecs, compressions = server.get("codecs", []), server.get("compression", [])
+        retryAt = None
+    except Exception:
+        codecs, compressions = [], []
+        retryAt = time.monotonic() + payloadConfig["negotiateRetry"]
+
+    negotiated = {"codec": next((c for c in payloadConfig["preference"] if c in codecs and PAYLOAD_CODECS[c]["available"]), "repr"),
+                  "compression": next((c for c in payloadConfig["compressionPreference"] if c in compressions and PAYLOAD_COMPRESSION[c]["available"]), None),
+                  "retryAt": retryAt}
+    session.payloadCodecs[baseUrl] = negotiated
+
+    return negotiated["codec"], negotiated["compression"]
+
+def encode_payload(body, payloadFields, codec, compression=None, tableField=None):
+
+    # returns (data, headers); the repr codec keeps today's {"field": str(obj)} JSON body
+    if codec == "repr":
+        data = json_dumps({k: str(v) if k in payloadFields else v for k, v in body.items()})
+    elif codec == "json":
+        data = json_dumps(body)
+    elif codec == "msgpack":
+        data = msgpack.packb(body, default=_jsonDefault)
+    elif codec == "arrow" and tableField is not None:
+        data = arrow_dumps(body, tableField)
+    else:
+        codec = "json"
+        data = json_dumps(body)
+
+    headers = {"Content-Type": PAYLOAD_CODECS[codec]["contentType"], "X-Payload-Codec": codec}
+    if compression is not None and len(data) >= payloadConfig["minCompressSize"]:
+        data = PAYLOAD_COMPRESSION[compression]["compress"](data)
+        headers["Content-Encoding"] = compression
+
+    return data, headers
+
+def decode_payload(data, headers):
+
+    encoding = headers.get("Content-Encoding")
+    if encoding in PAYLOAD_COMPRESSION.keys():
+        data = PAYLOAD_COMPRESSION[encoding]["decompress"](data)
+
+    codec = headers.get("X-Payload-Codec", "json")
+    if codec == "msgpack":
+        return msgpack.unpackb(data, strict_map_key=False)
+    if codec == "arrow":
+        return arrow_loads(data)
+    if codec == "repr":
+        body = json_loads(data)
+        return {k: literal_eval(v) if isinstance(v, str) and v[:1] in "[{(" else v for k, v in body.items()}
+    return json_loads(data)
+
+def post_payload(req, body, payloadFields, timeout, tableField=None):
+
+    # POST with large fields encoded by the negotiated codec
+    codec, compression = negotiate_payloadCodec()
+
+    if codec == "repr" and compression is None:
+        return sess.post(req, json={k: str(v) if k in payloadFields else v for k, v in body.items()}, timeout=timeout)
+
+    data, headers = encode_payload(body, payloadFields, codec, compression, tableField)
+    return sess.post(req, data=data, headers=headers, timeout=timeout)
+
+def load_response(response):
+
+    # JSON or msgpack response body
+    t0 = time.perf_counter()
+    try:
+        if response.headers.get("Content-Type", "").startswith("application/msgpack") and msgpack is not None:
+            return msgpack.unpackb(response.content)
+        return json_loads(response.content)
+    finally:
+        oqi.instrumentation.record_parse(response.url, time.perf_counter() - t0)
+
+# reference data cache
+class TTLCache:
+
+    def __init__(self, maxSize=50000, ttl=24*3600):
+
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    def get(self, key):
+
+        with self._lock:
+            if key in self._data:
+                value, expiry = self._data[key]
+                if expiry is None or expiry > time.monotonic():
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return True, value
+                del self._data[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return False, None
+
+    def set(self, key, value, ttl=None):
+
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, None if ttl is None else time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxSize:
+                self._data.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def invalidate(self, match=None):
+
+        # match: None clears everything, otherwise a predicate on the key
+        with self._lock:
+            keys = list(self._data.keys()) if match is None else [k for k in self._data.keys() if match(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def stats(self):
+
+        with self._lock:
+            result = dict(self._stats)
+            result["size"] = len(self._data)
+            lookups = result["hits"] + result["misses"]
+            result["hitRate"] = result["hits"] / lookups if lookups > 0 else 0.0
+            return result
+
+referenceCache = TTLCache()
+
+# reference field -> candidate column names in fetch_underlyingDatabase output
+REFERENCE_FIELDS = ["RIC", "BBG", "OBB", "symbol", "systemName", "undlType", "calendar", "CCY", "DVDCCY", "listedExerciseType", "exchange"]
+
+def reference_cache(field):
+
+    # cache get_<field>(undlName) lookups; failed lookups (None) are not cached
+    def decorator(fn):
+
+        @functools.wraps(fn)
+        def wrapper(undlName):
+
+            found, value = referenceCache.get((field, undlName))
+            if found:
+                return value
+
+            value = fn(undlName)
+            if value is not None:
+                referenceCache.set((field, undlName), value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+def configure_referenceCache(maxSize=None, ttl=None):
+
+    if maxSize is not None:
+        referenceCache.maxSize = maxSize
+    if ttl is not None:
+        referenceCache.ttl = ttl
+
+def invalidate_referenceCache(undlName=None, field=None):
+
+    if undlName is None and field is None:
+        return referenceCache.invalidate()
+
+    return referenceCache.invalidate(lambda k: (field is None or k[0] == field) and (undlName is None or k[1] == undlName))
+
+def get_referenceCacheStats():
+
+    return referenceCache.stats()
+
+def seed_referenceCache(database=None, columns=None, keyColumn="undlName"):
+
+    # one fetch_underlyingDatabase() call seeds the reference fields of every underlying. columns = {field: database column}, default every
+    # REFERENCE_FIELDS field under its own name; values are cached under the keyColumn value only, the name get_<field>(undlName) is called with
+    database = fetch_underlyingDatabase() if database is None else database
+    if database is None or len(database) == 0:
+        return 0
+
+    frame = database if isinstance(database, pd.DataFrame) else pd.DataFrame(database)
+    columns = {field: field for field in REFERENCE_FIELDS} if columns is None else columns
+    unknown = [field for field in columns.keys() if field not in REFERENCE_FIELDS]
+    missing = [c for c in [keyColumn] + list(columns.values()) if c not in frame.columns]
+    if len(unknown) > 0:
+        raise ValueError("unknown reference fields " + ", ".join(unknown))
+    if len(missing) > 0:
+        raise ValueError("underlying database without columns " + ", ".join(missing))
+    duplicated = frame[keyColumn][frame[keyColumn].duplicated()]
+    if len(duplicated) > 0:
+        raise ValueError("duplicate {} in underlying database: {}".format(keyColumn, ", ".join(str(u) for u in duplicated.unique()[:10])))
+
+    n = 0
+    for row in frame.to_dict(orient="records"):
+        undlName = row[keyColumn]
+        if undlName is None or undlName != undlName:
+            continue
+        for field, column in columns.items():
+            if row[column] is None or row[column] != row[column]:
+                continue
+            referenceCache.set((field, undlName), row[column])
+            n += 1
+
+    return n
+
+# historical market data store
+class HistoricalStore:
+
+    # root/dataType/undlName=<key>/date=<date>/part[-<query hash>].parquet (.pickle without pyarrow). The table part of a value
+    # (curve points, dividend / repo schedule, SVI slices, vol grid, chain rows) is stored as typed columns, scalar fields as
+    # JSON in the file metadata; values that do not round trip that way are kept whole in the metadata.
+    # Decoded values are held in memory as an LRU of maxValues entries, pending writes are flushed before they are dropped
+    def __init__(self, root, autoFlush=500, maxValues=2000):
+
+        self.root = os.path.expanduser(root)
+        self.fmt = "parquet" if pa is not None else "pickle"
+        self.autoFlush = autoFlush
+        self.maxValues = maxValues
+        self._values = OrderedDict()
+        self._dirty = set()
+        self._lock = threading.RLock()
+
+    def _safe(self, name):
+
+        return "".join(c if c.isalnum() or c in "._-" else "_" for c in str(name))
+
+    def _keyDir(self, dataType, key):
+
+        return os.path.join(self.root, dataType, "undlName=" + self._safe(key))
+
+    def _path(self, dataType, key, dateRef, query):
+
+        part = "part" if query == "" else "part-" + hashlib.sha1(query.encode()).hexdigest()[:16]
+        return os.path.join(self._keyDir(dataType, key), "date=" + self._safe(dateRef), part + "." + self.fmt)
+
+    def _read(self, path):
+
+        if self.fmt == "parquet":
+            table = pq.read_table(path)
+            return json_loads(table.schema.metadata[b"eqvol"]), table.to_pandas()
+        frame = pd.read_pickle(path)
+        return frame.attrs["eqvol"], frame
+
+    def _write(self, path, header, frame):
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmpPath = path + ".tmp"
+        if self.fmt == "parquet":
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            pq.write_table(table.replace_schema_metadata(mergeDict(table.schema.metadata or {}, {b"eqvol": json_dumps(header)})), tmpPath)
+        else:
+            frame.attrs["eqvol"] = header
+            frame.to_pickle(tmpPath)
+        os.replace(tmpPath, path)
+
+    def get(self, dataType, key, dateRef, query=""):
+
+        entry = (dataType, key, str(dateRef), query)
+        with self._lock:
+            if entry not in self._values:
+                path = self._path(*entry)
+                if not os.path.exists(path):
+                    return False, None
+                header, frame = self._read(path)
+                self._values[entry] = json_dumps(from_storeColumns(header, frame))
+            self._values.move_to_end(entry)
+            payload = self._values[entry]
+            self._trim()
+        return True, json_loads(payload)
+
+    def put(self, dataType, key, dateRef, value, query=""):
+
+        with self._lock:
+            entry = (dataType, key, str(dateRef), query)
+            self._values[entry] = json_dumps(value)
+            self._values.move_to_end(entry)
+            self._dirty.add(entry)
+            if len(self._dirty) >= self.autoFlush:
+                self.flush()
+            self._trim()
+
+    def _trim(self):
+
+        while len(self._values) > self.maxValues:
+            if next(iter(self._values)) in self._dirty:
+                self.flush()
+            self._values.popitem(last=False)
+
+    def dates(self, dataType, key):
+
+        with self._lock:
+            pending = set(d for t, k, d, q in self._dirty if t == dataType and k == key)
+            keyDir = self._keyDir(dataType, key)
+            stored = set(d[len("date="):] for d in os.listdir(keyDir) if d.startswith("date=")) if os.path.isdir(keyDir) else set()
+            return sorted(pending | stored)
+
+    def flush(self):
+
+        with self._lock:
+            for entry in self._dirty:
+                value = json_loads(self._values[entry])
+                header, frame = to_storeColumns(value)
+                try:
+                    self._write(self._path(*entry), mergeDict(header, {"query": entry[3]}), frame)
+                except (TypeError, ValueError, ArithmeticError) if pa is None else (TypeError, ValueError, ArithmeticError, pa.ArrowException):
+                    # columns pyarrow cannot type (mixed values) keep the whole value in the metadata
+                    self._write(self._path(*entry), {"kind": None, "payload": value, "query": entry[3]}, pd.DataFrame())
+            self._dirty = set()
+
+def _storeRows(rows):
+
+    # (kind, frame) for {key: {field: x}} (SVI slices, vol grid, schedules), {key: x} (curve points) or [{field: x}] (chain rows)
+    if isinstance(rows, list) and len(rows) > 0 and all(isinstance(r, dict) for r in rows):
+        return "records", pd.DataFrame(rows)
+    if isinstance(rows, dict) and len(rows) > 0 and all(isinstance(r, dict) for r in rows.values()):
+        frame = pd.DataFrame.from_dict(rows, orient="index")
+        frame.insert(0, "key", [str(k) for k in rows.keys()])
+        return "index", frame.reset_index(drop=True)
+    if isinstance(rows, dict) and len(rows) > 0 and not any(isinstance(r, (dict, list)) for r in rows.values()):
+        return "points", pd.DataFrame({"key": [str(k) for k in rows.keys()], "value": list(rows.values())})
+    return None, None
+
+def to_storeColumns(value):
+
+    # (header, frame) for HistoricalStore: the largest table-like field (chain "data", dividend "Schedule", "SVI-JW" ...) as typed
+    # columns, everything else in the header; a value that is itself a table ({maturity: {strike: vol}}) is stored whole
+    tableFields = [k for k, v in value.items() if isinstance(v, (dict, list))] if isinstance(value, dict) else []
+    if 0 < len(tableFields) < len(value):
+        tableField = max(tableFields, key=lambda k: len(value[k]))
+        header = {"fields": {k: v for k, v in value.items() if k != tableField}, "tableField": tableField}
+        kind, frame = _storeRows(value[tableField])
+    else:
+        header = {"fields": None, "tableField": None}
+        kind, frame = _storeRows(value)
+    header["kind"] = kind
+
+    if kind is None or from_storeColumns(header, frame) != value:
+        return {"kind": None, "payload": value}, pd.DataFrame()
+    return header, frame
+
+def from_storeColumns(header, frame):
+
+    kind = header["kind"]
+    if kind is None:
+        return header["payload"]
+    if kind == "records":
+        rows = [{k: v for k, v in r.items() if not _isMissing(v)} for r in frame.to_dict(orient="records")]
+    elif kind == "index":
+        rows = {r.pop("key"): {k: v for k, v in r.items() if not _isMissing(v)} for r in frame.to_dict(orient="records")}
+    else:
+        rows = dict(zip(frame["key"].tolist(), frame["value"].tolist()))
+
+    if header["tableField"] is None:
+        return rows
+    return mergeDict(header["fields"], {header["tableField"]: rows})
+
+def _isMissing(v):
+
+    return v is None or (isinstance(v, float) and v != v)
+
+historicalStore = None
+
+def enable_historicalStore(root="~/.eqvol_history", autoFlush=500, maxValues=2000):
+
+    global historicalStore
+    historicalStore = HistoricalStore(root, autoFlush, maxValues)
+    atexit.register(historicalStore.flush)
+    return historicalStore
+
+# exchange date per calendar, re-read every storeCutoffInterval seconds
+exchangeDateCache = {}
+storeCutoffInterval = 300
+
+def store_cutoff(undlName=None):
+
+    # first date that is not persisted: the exchange date of the underlying's calendar (today's and later data may still change);
+    # currency-keyed data has no calendar and stops a day before the local date. None (store nothing) when the date is unknown
+    if undlName is None:
+        return str(date.today() - timedelta(days=1))
+    calendar = coalesced(get_calendar, undlName)
+    if calendar is None:
+        return None
+    cached = exchangeDateCache.get(calendar)
+    if cached is None or time.time() - cached[1] > storeCutoffInterval:
+        cached = (coalesced(get_exchangeDate, calendar), time.time())
+        if cached[0] is not None:
+            exchangeDateCache[calendar] = cached
+
+    return cached[0]
+
+def store_query(queryArgs, arguments):
+
+    return repr([arguments[k] for k in queryArgs]) if len(queryArgs) > 0 else ""
+
+def historical_store(dataType, keyArg, dateArg, queryArgs=[], localOnlyArgs=[]):
+
+    # read-through for calls with a historical date; live calls and calls with custom market data skip the store,
+    # values dated on or after the exchange date (store_cutoff) are returned but not stored
+    def decorator(fn):
+
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            a = bound.arguments
+            dateRef = a[dateArg]
+
+            if historicalStore is None or dateRef is None or dateRef == "None" or any(a[k] is not None and a[k] != "None" for k in localOnlyArgs):
+                return fn(*args, **kwargs)
+
+            query = store_query(queryArgs, a)
+            found, value = historicalStore.get(dataType, a[keyArg], dateRef, query)
+            if found:
+                return value
+
+            value = fn(*args, **kwargs)
+            if value is not None and not (isinstance(value, dict) and "error" in value.keys()):
+                cutoff = store_cutoff(a[keyArg] if keyArg == "undlName" else None)
+                if cutoff is not None and oqa.to_date(dateRef) < oqa.to_date(cutoff):
+                    historicalStore.put(dataType, a[keyArg], dateRef, value, query)
+            return value
+
+        wrapper.storeArgs = (dataType, keyArg, dateArg, queryArgs)
+        return wrapper
+
+    return decorator
+
+if "historicalStorePath" in config.keys():
+    enable_historicalStore(config["historicalStorePath"])
+
+def prefetch_history(undlNames, dataType, startDate, endDate, calendar=None, maxWorkers=8, **query):
+
+    # warm the store for business days in [startDate, endDate]; dates already stored are skipped.
+    # vol / volGrid need their query arguments: maturity=, strike= / maturities=, strikes=
+    if historicalStore is None:
+        return {"error": "historical store not enabled"}
+
+    fns = {"yieldCurve": get_yieldCurve, "dividend": get_dividend, "repo": get_repo, "volSurfaceSVI": get_volSurfaceSVI, "spotHist": get_spotHist,
+           "vol": get_vol, "volGrid": get_volGrid}
+    if dataType not in fns.keys():
+        return {"error": "unknown dataType " + str(dataType)}
+    fn = fns[dataType]
+    dateArg, queryArgs = fn.storeArgs[2], fn.storeArgs[3]
+    if sorted(query.keys()) != sorted(queryArgs):
+        return {"error": "{} prefetch needs query arguments {}".format(dataType, ", ".join(queryArgs) if len(queryArgs) > 0 else "none")}
+    businessCalendar = None if calendar is None else get_businessCalendar(calendar)
+    if businessCalendar is None:
+        dates = [d.strftime("%Y-%m-%d") for d in pd.bdate_range(startDate, endDate)]
+    else:
+        dates = list(businessCalendar.business_days(startDate, endDate).astype(str))
+
+    undlNames = [undlNames] if isinstance(undlNames, str) else undlNames
+    jobs = [(u, d) for u in undlNames for d in dates if historicalStore.get(dataType, u, d, store_query(queryArgs, query))[0] is False]
+
+    with ContextThreadPoolExecutor(max_workers=maxWorkers) as pool:
+        list(pool.map(lambda job: fn(job[0], **mergeDict(query, {dateArg: job[1]})), jobs))
+    historicalStore.flush()
+
+    return {"requested": len(undlNames) * len(dates), "fetched": len(jobs)}
+
 def fetch_underlyingDatabase():
 
     req = api_url + "api/v1/fetchUnderlyingDatabase"
@@ -25,13 +816,14 @@ def fetch_underlyingDatabase():
 
     try:
 
-        result = json.loads(response.text)
+        result = parse_response(response)
         return result
     
     except:
     
         return {}
 
+@reference_cache("RIC")
 def get_RIC(undlName):
     
     req = api_url + "api/v1/getRIC"
@@ -39,7 +831,7 @@ def get_RIC(undlName):
     
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -48,6 +840,7 @@ def get_RIC(undlName):
     except:
         return None
 
+@reference_cache("BBG")
 def get_BBG(undlName):
     
     req = api_url + "api/v1/getBBG"
@@ -55,7 +848,7 @@ def get_BBG(undlName):
     
     response = sess.post(req, json=body, timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -64,6 +857,7 @@ def get_BBG(undlName):
     except:
         return None
 
+@reference_cache("OBB")
 def get_OBB(undlName):
     
     req = api_url + "api/v1/getOBB"
@@ -71,7 +865,7 @@ def get_OBB(undlName):
     
     response = sess.post(req, json=body, timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -80,6 +874,7 @@ def get_OBB(undlName):
     except:
         return None
 
+@reference_cache("symbol")
 def get_symbol(undlName):
     
     req = api_url + "api/v1/getSymbol"
@@ -87,7 +882,7 @@ def get_symbol(undlName):
     
     response = sess.post(req, json=body, timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -96,6 +891,7 @@ def get_symbol(undlName):
     except:
         return None
 
+@reference_cache("systemName")
 def get_systemName(undlName):
     
     req = api_url + "api/v1/getSystemName"
@@ -103,7 +899,7 @@ def get_systemName(undlName):
     
     response = sess.post(req, json=body, timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -112,6 +908,7 @@ def get_systemName(undlName):
     except:
         return None
 
+@reference_cache("undlType")
 def get_undlType(undlName):
     
     req = api_url + "api/v1/getUndlType"
@@ -119,7 +916,7 @@ def get_undlType(undlName):
     
     response = sess.post(req, json=body, timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -128,6 +925,7 @@ def get_undlType(undlName):
     except:
         return None
 
+@historical_store("yieldCurve", "ccy", "dateRef")
 def get_yieldCurve(ccy, dateRef=None):
     
     req = api_url + "api/v1/getYieldCurve"
@@ -135,8 +933,9 @@ def get_yieldCurve(ccy, dateRef=None):
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
+@historical_store("dividend", "undlName", "dateRef")
 def get_dividend(undlName, dateRef=None):
     
     req = api_url + "api/v1/getDividend"
@@ -144,8 +943,9 @@ def get_dividend(undlName, dateRef=None):
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
+@historical_store("repo", "undlName", "dateRef")
 def get_repo(undlName, dateRef=None):
     
     req = api_url + "api/v1/getRepo"
@@ -153,7 +953,7 @@ def get_repo(undlName, dateRef=None):
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def get_repoRate(undlName, maturity, repoCurve=None, dateRef=None):
     
@@ -166,12 +966,13 @@ def get_repoRate(undlName, maturity, repoCurve=None, dateRef=None):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
         return result["rate"]
 
     except Exception as e:
         return {"error": str(e)}
 
+@historical_store("volSurfaceSVI", "undlName", "dateRef")
 def get_volSurfaceSVI(undlName, dateRef=None):
 
     req = api_url + "api/v1/getVolSurfaceSVI"
@@ -179,13 +980,14 @@ def get_volSurfaceSVI(undlName, dateRef=None):
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     if "error" in result.keys():
         return None
     else:
         return result
 
+@reference_cache("calendar")
 def get_calendar(undlName):
     
     req = api_url + "api/v1/getCalendar"
@@ -193,7 +995,7 @@ def get_calendar(undlName):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -202,6 +1004,7 @@ def get_calendar(undlName):
     except:
         return None
 
+@reference_cache("CCY")
 def get_CCY(undlName):
     
     req = api_url + "api/v1/getCCY"
@@ -209,7 +1012,7 @@ def get_CCY(undlName):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -218,6 +1021,7 @@ def get_CCY(undlName):
     except:
         return None
 
+@reference_cache("DVDCCY")
 def get_DVDCCY(undlName):
     
     req = api_url + "api/v1/getDVDCCY"
@@ -225,7 +1029,7 @@ def get_DVDCCY(undlName):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -234,6 +1038,7 @@ def get_DVDCCY(undlName):
     except:
         return None
 
+@reference_cache("listedExerciseType")
 def get_listedExerciseType(undlName):
     
     req = api_url + "api/v1/getListedExerciseType"
@@ -241,7 +1046,7 @@ def get_listedExerciseType(undlName):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -250,6 +1055,7 @@ def get_listedExerciseType(undlName):
     except:
         return None
 
+@reference_cache("exchange")
 def get_exchange(undlName):
     
     req = api_url + "api/v1/getExchange"
@@ -257,7 +1063,7 @@ def get_exchange(undlName):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -273,12 +1079,13 @@ def get_spot(undlName, delay=0):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
     if "error" in result.keys():
         return {"error": response.text}
     else:
         return result
     
+@historical_store("spotHist", "undlName", "historicalDate")
 def get_spotHist(undlName, historicalDate="None"):
     
     req = api_url + "api/v1/getSpotHistorical"
@@ -286,7 +1093,7 @@ def get_spotHist(undlName, historicalDate="None"):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
     if "error" in result.keys():
         return {"error": response.text}
     else:
@@ -299,7 +1106,7 @@ def get_FX(undlName, delay=0):
     
     response = sess.post(req, data=json.dumps(body), timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
     if "error" in result.keys():
         return {"error": response.text}
     else:
@@ -312,7 +1119,7 @@ def get_exchangeDate(calendar, returnType="date"):
     
     response = sess.post(req, json=body, timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -335,7 +1142,7 @@ def get_exchangeTimeZone(calendar):
     
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
     try:
         if "error" in result.keys():
             return None
@@ -350,7 +1157,7 @@ def get_holidayCalendar(calendar):
     
     response = sess.get(req, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
     if "error" in result.keys():
         return {"error": response.text}
     else:
@@ -367,7 +1174,7 @@ def get_VSFBatch():
 
     response = sess.get(req, timeout=30)
 
-    return json.loads(response.text)
+    return parse_response(response)
 
 def get_optionChainDataCrypto(undlName):
 
@@ -376,7 +1183,7 @@ def get_optionChainDataCrypto(undlName):
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
@@ -387,7 +1194,7 @@ def save_cryptoFutureData(undlName):
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
@@ -398,7 +1205,7 @@ def get_cryptoFutureData(undlName):
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
@@ -410,7 +1217,7 @@ def get_optionChainVolLazy(undlName):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
         if result["lastVol"] == "None":
             result["lastVol"] = None
     except:
@@ -426,7 +1233,7 @@ def get_optionChainATMVolLazy(undlName):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
         if result["lastVol"] == "None":
             result["lastVol"] = None
         
@@ -446,12 +1253,23 @@ def calc_impliedDistribution(undlName, maturity, valueDate, volSurfaceSVI="None"
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
     return result
 
+def calc_impliedDistributionLocal(undlName, maturities=None, volSurfaceSVI=None, interval=0.02, step=0.002, return_upper=4):
+
+    # in-process calc_impliedDistribution for all (or the given) maturities at once, cached by surface hash
+    volSurfaceSVI = get_volSurfaceSVI(undlName) if volSurfaceSVI is None else volSurfaceSVI
+    if volSurfaceSVI is None or "error" in volSurfaceSVI.keys():
+        return {"error": "no vol surface for " + str(undlName)}
+    if "SVI-JW" not in volSurfaceSVI.keys():
+        return {"error": "local implied distribution needs an SVI-JW surface"}
+
+    return oqa.calc_impliedDistributionSVI(volSurfaceSVI, maturities, interval, step, return_upper)
+
 def check_impliedDistribution(volSurfaceSVI):
 
     req = api_url + "api/v1/checkImpliedDistribution"
@@ -460,7 +1278,7 @@ def check_impliedDistribution(volSurfaceSVI):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
@@ -472,18 +1290,108 @@ def get_optionChainVol(optionChainData):
         return {"error": None}
 
     req = api_url + "api/v1/getOptionChainVol"
-    body = {"data": str(optionChainData)}
+    body = {"data": optionChainData}
 
-    response = sess.post(req, json=body, timeout=60*20)
+    response = post_payload(req, body, ["data"], timeout=60*20, tableField="data")
 
     try:
-        result = json.loads(response.text)
+        result = load_response(response)
     except:
         print(response.text)
         result = {"error": response.text}
 
     return result
 
+def get_optionChainVolLocal(optionChainData, exerciseType="European", **kwargs):
+
+    # solve the whole chain in-process, returns the quotes with impliedVol / converged / iterations columns
+    if optionChainData is None:
+        return {"error": None}
+
+    try:
+        return oqa.solve_chainImpliedVol(optionChainData, exerciseType=exerciseType, **kwargs)
+    except Exception as e:
+        return {"error": str(e)}
+
+def slice_optionChain(optionChainData, maxQuotes=2000, maturityKey="maturity"):
+
+    # generator of maturity-sliced sub-chains, consecutive expiries are packed together up to maxQuotes; chain fields other than "data" are kept
+    isDict = isinstance(optionChainData, dict) and "data" in optionChainData.keys()
+    quotes = optionChainData["data"] if isDict else optionChainData
+    header = {k: v for k, v in optionChainData.items() if k != "data"} if isDict else None
+
+    byMaturity = {}
+    for q in quotes:
+        byMaturity.setdefault(q[maturityKey], []).append(q)
+
+    chunk, maturities = [], []
+    for m in sorted(byMaturity.keys(), key=lambda m: oqa.to_date(m)):
+        if len(chunk) > 0 and len(chunk) + len(byMaturity[m]) > maxQuotes:
+            yield maturities, (mergeDict(header, {"data": chunk}) if isDict else chunk)
+            chunk, maturities = [], []
+        chunk = chunk + byMaturity.pop(m)
+        maturities.append(m)
+    if len(chunk) > 0:
+        yield maturities, (mergeDict(header, {"data": chunk}) if isDict else chunk)
+
+def iter_optionChainVol(optionChainData, maxQuotes=2000, maxInFlight=4, stream=False):
+
+    # yields {"maturities": [...], "result": ...} front expiry first while later slices are still being solved;
+    # stream=True reads NDJSON / server-sent events from getOptionChainVolStream and falls back to chunked requests
+    if optionChainData is None:
+        yield {"maturities": [], "result": {"error": None}}
+        return
+
+    if stream:
+        try:
+            for result in _streamOptionChainVol(optionChainData):
+                yield result
+            return
+        except EndpointUnavailable:
+            pass
+
+    chunks = slice_optionChain(optionChainData, maxQuotes)
+    with ContextThreadPoolExecutor(max_workers=maxInFlight) as pool:
+        inFlight = []
+        for maturities, chunk in chunks:
+            inFlight.append((maturities, pool.submit(get_optionChainVol, chunk)))
+            if len(inFlight) >= maxInFlight:
+                maturities, future = inFlight.pop(0)
+                yield {"maturities": maturities, "result": future.result()}
+        for maturities, future in inFlight:
+            yield {"maturities": maturities, "result": future.result()}
+
+def _streamOptionChainVol(optionChainData):
+
+    req = api_url + "api/v1/getOptionChainVolStream"
+    body = {"data": optionChainData}
+    data, headers = encode_payload(body, ["data"], "json")
+    headers["Accept"] = "application/x-ndjson, text/event-stream"
+
+    with sess.post(req, data=data, headers=headers, timeout=60*20, stream=True) as response:
+        if response.status_code in (404, 405):
+            raise EndpointUnavailable("getOptionChainVolStream not available")
+        if not response.ok:
+            yield {"maturities": [], "result": {"error": "getOptionChainVolStream {}: {}".format(response.status_code, response.text)}}
+            return
+        for line in response.iter_lines():
+            # NDJSON lines, or SSE "data: {...}" records separated by blank lines
+            if not line or line.startswith(b":") or line.startswith(b"event:"):
+                continue
+            if line.startswith(b"data:"):
+                line = line[5:].strip()
+            record = json_loads(line)
+            if isinstance(record, dict) and "maturities" in record.keys():
+                yield record
+            else:
+                yield {"maturities": record.get("maturity", []) if isinstance(record, dict) else [], "result": record}
+
+def iter_optionChainVolLocal(optionChainData, maxQuotes=2000, exerciseType="European", **kwargs):
+
+    # in-process counterpart of iter_optionChainVol, each result is the solved DataFrame of the slice
+    for maturities, chunk in slice_optionChain(optionChainData, maxQuotes):
+        yield {"maturities": maturities, "result": get_optionChainVolLocal(chunk, exerciseType, **kwargs)}
+
 def get_optionChainRepo(optionChainData):
 
     if optionChainData is None:
@@ -495,7 +1403,7 @@ def get_optionChainRepo(optionChainData):
     response = sess.post(req, json=body, timeout=60*5)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
@@ -511,7 +1419,7 @@ def forecast_stockDiv(undlName, factor=1, forecastYear=8):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
@@ -526,7 +1434,7 @@ def fit_divGrowthFactor(undlName, impliedDiv):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
@@ -540,7 +1448,7 @@ def get_netBusinessDays(fromDate, toDate, calendar):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
@@ -554,7 +1462,7 @@ def get_nextBusinessDay(refDate, dayShift, calendar):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
@@ -568,12 +1476,150 @@ def is_holiday(refDate, calendar):
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"error": response.text}
 
     return result
 
+# local business-day calendars compiled from getHolidayCalendar, rebuilt only when a holiday table changes
+businessCalendars = {}
+businessCalendarConfig = {"refreshInterval": 3600, "lastRefresh": 0.0}
+businessCalendarLock = threading.Lock()
+
+def refresh_businessCalendars(force=False):
+
+    with businessCalendarLock:
+        if not force and time.time() - businessCalendarConfig["lastRefresh"] < businessCalendarConfig["refreshInterval"]:
+            return businessCalendars
+
+        holidayTable = get_holidayCalendar(None)
+        if "error" in holidayTable.keys():
+            return businessCalendars
+
+        for calendar, holidays in holidayTable.items():
+            if not isinstance(holidays, list):
+                continue
+            key = hash(tuple(sorted(str(h).split("T")[0] for h in holidays)))
+            if calendar not in businessCalendars.keys() or businessCalendars[calendar][0] != key:
+                businessCalendars[calendar] = (key, oqa.BusinessCalendar(holidays, name=calendar))
+        businessCalendarConfig["lastRefresh"] = time.time()
+
+    return businessCalendars
+
+def get_businessCalendar(calendar):
+
+    refresh_businessCalendars()
+    if calendar not in businessCalendars.keys():
+        return None
+
+    return businessCalendars[calendar][1]
+
+def get_netBusinessDaysLocal(fromDate, toDate, calendar):
+
+    # scalar dates return {"days": n} like get_netBusinessDays, arrays return {"days": array}
+    businessCalendar = get_businessCalendar(calendar)
+    if businessCalendar is None:
+        return {"error": "unknown calendar " + str(calendar)}
+    days = businessCalendar.net_businessDays(fromDate, toDate)
+
+    return {"days": int(days) if np.ndim(days) == 0 else days}
+
+def get_nextBusinessDayLocal(refDate, dayShift, calendar):
+
+    businessCalendar = get_businessCalendar(calendar)
+    if businessCalendar is None:
+        return {"error": "unknown calendar " + str(calendar)}
+    dates = businessCalendar.next_businessDay(refDate, dayShift)
+
+    return {"date": str(dates) if np.ndim(dates) == 0 else dates.astype(str)}
+
+def is_holidayLocal(refDate, calendar):
+
+    businessCalendar = get_businessCalendar(calendar)
+    if businessCalendar is None:
+        return {"error": "unknown calendar " + str(calendar)}
+    holiday = businessCalendar.is_holiday(refDate)
+
+    return {"isHoliday": bool(holiday) if np.ndim(holiday) == 0 else holiday}
+
+# listed expiry tables compiled from explicitly registered rules (oqa.listed_rule fields) and the holiday calendars, rebuilt when
+# the holidays change; the getListedMaturityRule payload is not parsed, unregistered names stay with the remote get_listedMaturity
+expiryCalendars = {}
+expiryCalendarRules = {}
+expiryCalendarErrors = {}
+expiryCalendarConfig = {"years": oqa.LISTED_YEARS, "historyYears": 2}
+expiryCalendarLock = threading.Lock()
+
+def listed_key(calendar, undlType):
+
+    return "{}_{}".format(calendar, undlType)
+
+def register_expiryCalendar(calendar_undlType, rule, calendar):
+
+    # rule validated up front, raises ValueError on missing / unknown fields; calendar is the holiday calendar the rule rolls on
+    oqa.listed_rule(rule)
+    with expiryCalendarLock:
+        expiryCalendarRules[calendar_undlType] = ({k: list(v) if isinstance(v, (list, tuple)) else v for k, v in rule.items()}, calendar)
+        expiryCalendars.pop(calendar_undlType, None)
+        expiryCalendarErrors.pop(calendar_undlType, None)
+
+    return get_expiryCalendar(calendar_undlType)
+
+def unregister_expiryCalendar(calendar_undlType):
+
+    with expiryCalendarLock:
+        expiryCalendarRules.pop(calendar_undlType, None)
+        expiryCalendars.pop(calendar_undlType, None)
+        expiryCalendarErrors.pop(calendar_undlType, None)
+
+def refresh_expiryCalendars(force=False):
+
+    refresh_businessCalendars(force)
+    with expiryCalendarLock:
+        for calendar_undlType, (rule, calendar) in expiryCalendarRules.items():
+            businessCalendar = get_businessCalendar(calendar)
+            if businessCalendar is None:
+                expiryCalendars.pop(calendar_undlType, None)
+                expiryCalendarErrors[calendar_undlType] = "unknown calendar " + str(calendar)
+                continue
+            # tables start historyYears back so dateRef pricing resolves too
+            startDate = date.today().replace(day=1) - timedelta(days=int(365.25 * expiryCalendarConfig["historyYears"]))
+            years = expiryCalendarConfig["years"] + expiryCalendarConfig["historyYears"]
+            key = hash((businessCalendar.holidays.tobytes(), startDate, years))
+            if calendar_undlType not in expiryCalendars.keys() or expiryCalendars[calendar_undlType][0] != key:
+                expiryCalendars[calendar_undlType] = (key, oqa.ExpiryCalendar(rule, businessCalendar, startDate, years, name=calendar_undlType))
+                expiryCalendarErrors.pop(calendar_undlType, None)
+
+    return expiryCalendars
+
+def get_expiryCalendar(calendar_undlType):
+
+    refresh_expiryCalendars()
+    if calendar_undlType not in expiryCalendars.keys():
+        return None
+
+    return expiryCalendars[calendar_undlType][1]
+
+def get_listedMaturitiesLocal(calendar_undlType, valueDate=None):
+
+    # all listed expiries on or after valueDate (default today)
+    expiryCalendar = get_expiryCalendar(calendar_undlType)
+    if expiryCalendar is None:
+        return {"error": expiryCalendarErrors.get(calendar_undlType, "no expiry calendar registered for " + str(calendar_undlType))}
+
+    return {"maturities": expiryCalendar.listed(date.today() if valueDate is None else valueDate).astype(str)}
+
+def get_listedMaturityLocal(months, calendar_undlType, valueDate=None, mode="nearest"):
+
+    # in-process get_listedMaturity: listed expiry nearest to valueDate + months; months (or tenors "3M", "1Y") scalar or array
+    expiryCalendar = get_expiryCalendar(calendar_undlType)
+    if expiryCalendar is None:
+        return {"error": expiryCalendarErrors.get(calendar_undlType, "no expiry calendar registered for " + str(calendar_undlType))}
+    maturities = expiryCalendar.nearest(date.today() if valueDate is None else valueDate, months, mode=mode)
+
+    return {"maturity": str(maturities[0]) if np.ndim(months) == 0 else maturities.astype(str)}
+
 def discount_cashFlow(cashFlow, refDate, payDate, yieldCurve):
 
     req = api_url + "api/v1/discountCashFlow"
@@ -581,7 +1627,7 @@ def discount_cashFlow(cashFlow, refDate, payDate, yieldCurve):
 
     response = sess.post(req, json=body, timeout=30)
 
-    return json.loads(response.text)
+    return parse_response(response)
 
 def calc_SVIJW_SpotMoney(moneyness, paramsSVI):
 
@@ -591,7 +1637,7 @@ def calc_SVIJW_SpotMoney(moneyness, paramsSVI):
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     if "error" in result.keys():
         return {"error": response.text}
@@ -606,13 +1652,30 @@ def calc_SVIJW_FwdMoney(moneyness, paramsSVI):
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     if "error" in result.keys():
         return {"error": response.text}
     else:
         return {float(k): v for k,v in result.items()}
 
+def check_SVIJWLocal(moneyness, paramsSVI, moneynessType="fwd", tolerance=oqa.SVI_TOLERANCE):
+
+    # compare local SVI-JW evaluation against api/v1/SVIJW_*Money for one smile
+    if moneynessType == "spot":
+        remote = calc_SVIJW_SpotMoney(moneyness, paramsSVI)
+    else:
+        remote = calc_SVIJW_FwdMoney(moneyness, paramsSVI)
+
+    if "error" in remote.keys():
+        return remote
+
+    strikes = list(remote.keys())
+    local = oqa.calc_SVIJWVol(strikes, paramsSVI, moneynessType)[0]
+    maxDiff = float(np.max(np.abs(local - np.array([remote[k] for k in strikes], dtype=float))))
+
+    return {"maxDiff": maxDiff, "tolerance": tolerance, "pass": maxDiff <= tolerance}
+
 def to_SVI(paramsSVIJW):
 
     req = api_url + "api/v1/toSVI"
@@ -627,7 +1690,7 @@ def to_SVI(paramsSVIJW):
     
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
@@ -645,10 +1708,11 @@ def to_SVIJW(paramsSVIJW):
     
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
+@historical_store("vol", "undlName", "historicalDate", ["maturity", "strike"], ["volSurfaceSVI"])
 def get_vol(undlName, maturity, strike, volSurfaceSVI=None, historicalDate=None):
 
     req = api_url + "api/v1/getVol"
@@ -661,7 +1725,7 @@ def get_vol(undlName, maturity, strike, volSurfaceSVI=None, historicalDate=None)
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
@@ -678,7 +1742,7 @@ def get_pctDeltaVol(undlName, maturity, pctDelta, spotRef=None, historicalDate=N
     response = sess.post(req, json=body, timeout=30)
 
     try:
-        result = json.loads(response.text)
+        result = parse_response(response)
     except:
         result = {"vol": 0}
 
@@ -698,10 +1762,11 @@ def get_volSmile(undlName, maturity, strikes, volSurfaceSVI=None, historicalDate
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
+@historical_store("volGrid", "undlName", "historicalDate", ["maturities", "strikes"], ["volSurfaceSVI", "marketData"])
 def get_volGrid(undlName, maturities, strikes, volSurfaceSVI=None, marketData=None, historicalDate=None):
 
     req = api_url + "api/v1/getVolGrid"
@@ -714,87 +1779,284 @@ def get_volGrid(undlName, maturities, strikes, volSurfaceSVI=None, marketData=No
     body = {"undlName": undlName, 
             "maturities": list(maturities), 
             "strikes": list(strikes),
-            "volSurfaceSVI": "None" if volSurfaceSVI is None else str(volSurfaceSVI),
-            "marketData": "None" if marketData is None else str(marketData),
+            "volSurfaceSVI": "None" if volSurfaceSVI is None else volSurfaceSVI,
+            "marketData": "None" if marketData is None else marketData,
             "historicalDate": "None" if historicalDate is None else historicalDate}
 
-    response = sess.post(req, json=body, timeout=30)
+    response = post_payload(req, body, ["volSurfaceSVI", "marketData"], timeout=30)
 
-    result = json.loads(response.text)
+    result = load_response(response)
 
     return result
 
+def get_volSurfaceLocal(undlName, dateRef=None, spotRef=None):
+
+    # one getVolSurfaceSVI round trip, then vol / smile / grid / pctDelta are evaluated in-process
+    volSurfaceSVI = get_volSurfaceSVI(undlName, dateRef)
+    if volSurfaceSVI is None or "error" in volSurfaceSVI.keys():
+        return {"error": "no vol surface for " + str(undlName)}
+
+    return oqa.VolSurfaceSVI(volSurfaceSVI, spotRef)
+
+def get_volGridLocal(volSurface, maturities, strikes, spotRef=None):
+
+    # same layout as get_volGrid: {maturity: {strike: vol}}
+    if type(strikes) == float or type(strikes) == int:
+        strikes = [strikes]
+    if type(maturities) == str:
+        maturities = [maturities]
+
+    vols = volSurface.vol_grid(strikes, maturities, spotRef)
+
+    return {str(m): {str(k): float(v) for k, v in zip(strikes, row)} for m, row in zip(maturities, vols)}
+
 def check_volSurfaceArb(volSurfaceSVI, marketDataDict, valueDate):
 
     req = api_url + "api/v1/checkVolSurfaceArb"
 
-    body = {"volSurfaceSVI": str(volSurfaceSVI), "marketData": str(marketDataDict), "valueDate": valueDate}
+    body = {"volSurfaceSVI": volSurfaceSVI, "marketData": marketDataDict, "valueDate": valueDate}
 
-    response = sess.post(req, json=body, timeout=30)
+    response = post_payload(req, body, ["volSurfaceSVI", "marketData"], timeout=30)
 
-    result = json.loads(response.text)
+    result = load_response(response)
 
     return result
 
+def check_volSurfaceArbLocal(volSurfaceSVI, logMoneyness=oqa.ARB_GRID, tolerance=oqa.SVI_TOLERANCE):
+
+    # butterfly / calendar arbitrage of an SVI-JW surface in-process, with the violating log-moneyness regions
+    if not isinstance(volSurfaceSVI, dict):
+        return {"error": "no vol surface"}
+    if "error" in volSurfaceSVI.keys():
+        return {"error": volSurfaceSVI["error"]}
+    if "SVI-JW" not in volSurfaceSVI.keys():
+        return {"error": "local arbitrage check needs an SVI-JW surface"}
+
+    return oqa.check_SVIArb(volSurfaceSVI, logMoneyness, tolerance)
+
 def calc_European(params, calcWhat=["NPV"]):
     
     req = api_url + "api/v1/European"
-    body = params
-    body["calcWhat"] = calcWhat
+    body = mergeDict(params, {"calcWhat": calcWhat})
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
+
+def calc_EuropeanLocal(params, calcWhat=["NPV"]):
+
+    # in-process replacement for calc_European, see OptionQuantLibAnalytics.calc_EuropeanArrays for column input
+    return oqa.calc_EuropeanLocal(params, calcWhat)
 
 def calc_EuropeanImpliedVol(params):
     
     req = api_url + "api/v1/EuropeanImpliedVol"
-    body = params
+    body = dict(params)
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def calc_American(params, calcWhat=["NPV"]):
     
     req = api_url + "api/v1/American"
-    body = params
-    body["calcWhat"] = calcWhat
+    body = mergeDict(params, {"calcWhat": calcWhat})
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
+
+def calc_AmericanLocal(params, calcWhat=["NPV"], preset="standard"):
+
+    # in-process replacement for calc_American, preset in oqa.AMERICAN_PRESETS
+    return oqa.calc_AmericanLocal(params, calcWhat, preset)
 
 def calc_AmericanImpliedVol(params):
     
     req = api_url + "api/v1/AmericanImpliedVol"
-    body = params
+    body = dict(params)
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
+
+# batch pricing: columnar contracts, market data blocks shared by reference per underlying
+BATCH_SHARED_FIELDS = ["undlName", "valueDate", "yieldCurve", "divCurve", "repoCurve", "volSurfaceSVI", "calendar", "CCY"]
+BATCH_CHUNK_SIZE = 2000
+
+def pack_batch(paramsList, sharedFields=BATCH_SHARED_FIELDS):
+
+    # {"marketData": {key: block}, "columns": {field: [...], "marketDataKey": [...]}}; blocks are hashed once per distinct set of objects
+    marketData, keys, keyById = {}, [], {}
+    fields = []
+    for p in paramsList:
+        for f in p.keys():
+            if f not in sharedFields and f not in fields:
+                fields.append(f)
+
+    for p in paramsList:
+        ids = tuple(id(p.get(f)) for f in sharedFields)
+        if ids not in keyById.keys():
+            block = {f: p[f] for f in sharedFields if f in p.keys()}
+            key = hashlib.sha1(json_dumps(block)).hexdigest()[:16]
+            marketData[key] = block
+            keyById[ids] = key
+        keys.append(keyById[ids])
+
+    columns = {f: [_jsonDefault(p[f]) if isinstance(p.get(f), (np.generic, date, datetime)) else p.get(f) for p in paramsList] for f in fields}
+    columns["marketDataKey"] = keys
+
+    return {"marketData": marketData, "columns": columns}
+
+def _postBatch(endpoint, batch, extra, timeout):
+
+    req = api_url + "api/v1/" + endpoint
+    body = mergeDict(extra, batch)
+
+    response = post_payload(req, body, ["marketData", "columns"], timeout)
+    if response.status_code in (404, 405):
+        raise EndpointUnavailable(endpoint + " not available")
+    if not response.ok:
+        return {"error": "{} {}: {}".format(endpoint, response.status_code, response.text)}
+
+    try:
+        result = load_response(response)
+    except:
+        return {"error": response.text}
+
+    if isinstance(result, dict) and "results" in result.keys():
+        result = result["results"]
+
+    return result
+
+def _batchCall(endpoint, singleFn, paramsList, extra, chunkSize=BATCH_CHUNK_SIZE, maxWorkers=4, timeout=60*5):
+
+    # chunks are posted concurrently, results concatenated into numpy columns in input order; if the batch endpoint
+    # is missing the contracts go through the single-contract endpoint instead. Inputs are never modified.
+    paramsList = list(paramsList)
+    n = len(paramsList)
+    if n == 0:
+        return {"error": None}
+
+    chunks = [paramsList[i:i+chunkSize] for i in range(0, n, chunkSize)]
+
+    def run(chunk):
+        try:
+            return _postBatch(endpoint, pack_batch(chunk), extra, timeout)
+        except EndpointUnavailable:
+            rows = [singleFn(p) for p in chunk]
+            fields = []
+            for r in rows:
+                if isinstance(r, dict):
+                    fields = fields + [k for k in r.keys() if k not in fields and k != "error"]
+            return {f: [r.get(f, np.nan) if isinstance(r, dict) else np.nan for r in rows] for f in fields}
+        except Exception as e:
+            return {"error": str(e)}
+
+    with ContextThreadPoolExecutor(max_workers=max(1, min(maxWorkers, len(chunks)))) as pool:
+        results = list(pool.map(run, chunks))
+
+    fields = []
+    for r in results:
+        if isinstance(r, dict):
+            fields = fields + [k for k in r.keys() if k not in fields and k != "error"]
+
+    columns = {f: [] for f in fields}
+    errors = []
+    for i, (chunk, r) in enumerate(zip(chunks, results)):
+        if not isinstance(r, dict) or "error" in r.keys():
+            errors.append({"chunk": i, "start": i * chunkSize, "size": len(chunk), "error": r.get("error") if isinstance(r, dict) else r})
+        for f in fields:
+            values = r.get(f) if isinstance(r, dict) else None
+            if values is None or np.ndim(values) == 0 or len(values) != len(chunk):
+                values = [np.nan] * len(chunk)
+            columns[f].append(values)
+
+    result = {f: np.concatenate([np.asarray(v) for v in columns[f]]) for f in fields}
+    if len(errors) > 0:
+        result["errors"] = errors
+
+    return result
+
+def calc_EuropeanBatch(paramsList, calcWhat=["NPV"], chunkSize=BATCH_CHUNK_SIZE, maxWorkers=4):
+
+    # columnar api/v1/EuropeanBatch, returns {greek: np.array} in the order of paramsList
+    return _batchCall("EuropeanBatch", lambda p: calc_European(p, calcWhat), paramsList, {"calcWhat": calcWhat}, chunkSize, maxWorkers)
+
+def calc_AmericanBatch(paramsList, calcWhat=["NPV"], chunkSize=BATCH_CHUNK_SIZE, maxWorkers=4):
+
+    return _batchCall("AmericanBatch", lambda p: calc_American(p, calcWhat), paramsList, {"calcWhat": calcWhat}, chunkSize, maxWorkers)
+
+def calc_EuropeanImpliedVolBatch(paramsList, chunkSize=BATCH_CHUNK_SIZE, maxWorkers=4):
+
+    # each contract carries its option price in "price"
+    return _batchCall("EuropeanImpliedVolBatch", calc_EuropeanImpliedVol, paramsList, {}, chunkSize, maxWorkers)
+
+def calc_AmericanImpliedVolBatch(paramsList, chunkSize=BATCH_CHUNK_SIZE, maxWorkers=4):
+
+    return _batchCall("AmericanImpliedVolBatch", calc_AmericanImpliedVol, paramsList, {}, chunkSize, maxWorkers)
+
+def calc_scenarioLadderLocal(paramsList, spotShifts=[0.0], volShifts=[0.0], skewShifts=[0.0], timeShifts=[0], calcWhat=["NPV"],
+                             exerciseType="European", volSurfaces=None, dateRef=None, **kwargs):
+
+    # spot x vol x skew x time ladder of the portfolio, one get_volSurfaceSVI per underlying then everything in-process;
+    # see OptionQuantLibAnalytics.calc_scenarioLadder for the result layout
+    if volSurfaces is None:
+        volSurfaces = {}
+        for undlName in sorted(set(oqa.flatten_params(p).get("undlName") for p in paramsList if oqa.flatten_params(p).get("undlName") is not None)):
+            volSurface = get_volSurfaceLocal(undlName, dateRef)
+            if isinstance(volSurface, dict):
+                return volSurface
+            volSurfaces[undlName] = volSurface
+
+    try:
+        return oqa.calc_scenarioLadder(paramsList, volSurfaces, spotShifts, volShifts, skewShifts, timeShifts, calcWhat, exerciseType, **kwargs)
+    except Exception as e:
+        return {"error": str(e)}
 
 def fit_volSurfaceSVI(volData, repoFitted, volModel, username):
 
     req = api_url + "api/v1/fitVolSurfaceSVI"
-    body = {"volModel": volModel, "volData": str(volData), "repoData": str(repoFitted), "username": username}
+    body = {"volModel": volModel, "volData": volData, "repoData": repoFitted, "username": username}
 
-    response = sess.post(req, json=body, timeout=300)
+    response = post_payload(req, body, ["volData", "repoData"], timeout=300)
 
     try:
-        result = json.loads(response.text)
+        result = load_response(response)
     except:
         result = {"error": response.text}
 
     return result
-    
+
+def fit_volSurfaceSVIIncremental(undlName, quotes, spotRef=None, threshold=0.005, upload=False, volSurfaceSVI=None):
+
+    # warm start from the current surface and refit in-process only the expiries whose quotes moved by more than
+    # threshold (vol RMS); quotes are maturity / strike / impliedVol records, e.g. get_optionChainVolLocal output
+    volSurfaceSVI = get_volSurfaceSVI(undlName) if volSurfaceSVI is None else volSurfaceSVI
+    if volSurfaceSVI is None or "error" in volSurfaceSVI.keys():
+        return {"error": "no vol surface for " + str(undlName)}
+    if "SVI-JW" not in volSurfaceSVI.keys():
+        return {"error": "incremental refit needs an SVI-JW surface"}
+
+    result = oqa.refit_volSurfaceSVI(volSurfaceSVI, quotes, spotRef, threshold)
+    # nothing moved: the input surface comes back as is, not re-stamped or uploaded
+    if not any(r["refit"] for r in result["report"].values()):
+        result["volSurfaceSVI"] = volSurfaceSVI
+        return result
+
+    result["volSurfaceSVI"]["lastUpdateTime"] = datetime.strftime(datetime.now(), "%Y-%m-%dT%H:%M:%S")
+    if upload and result["calendarArbFree"]:
+        result["uploadResult"] = upload_volSurfaceSVI(result["volSurfaceSVI"])
+
+    return result
+
 def get_listedMaturityRule():
 
     req = api_url + "api/v1/getListedMaturityRule"
     
     try:
         response = sess.get(req, timeout=30)
-        result = json.loads(response.text)
+        result = parse_response(response)
         return result
     except Exception as e:
         return {"error": str(e)}
@@ -802,11 +2064,11 @@ def get_listedMaturityRule():
 def upload_volSurfaceSVI(volSurfaceSVI):
     
     req = api_url + "api/v1/uploadVolSurfaceSVI"
-    body = {"volSurfaceSVIStr": str(volSurfaceSVI)}
+    body = {"volSurfaceSVIStr": volSurfaceSVI}
     
-    response = sess.post(req, json=body, timeout=30)
+    response = post_payload(req, body, ["volSurfaceSVIStr"], timeout=30)
     
-    return json.loads(response.text)
+    return load_response(response)
 
 def upload_dividend(divPanel):
     
@@ -821,7 +2083,7 @@ def upload_dividend(divPanel):
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def upload_repo(repoPanel):
     
@@ -836,7 +2098,7 @@ def upload_repo(repoPanel):
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def upload_data(data: dict, dataType: str):
     
@@ -847,7 +2109,7 @@ def upload_data(data: dict, dataType: str):
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def upload_yieldCurve(yieldCurvePanel):
     
@@ -856,7 +2118,7 @@ def upload_yieldCurve(yieldCurvePanel):
     
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def calc_forward(spotRef, maturity, marketDataParams, valueDate):
     
@@ -870,7 +2132,7 @@ def calc_forward(spotRef, maturity, marketDataParams, valueDate):
 
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def calc_forwards(spotRef, maturities, marketDataParams, valueDate):
     
@@ -885,7 +2147,46 @@ def calc_forwards(spotRef, maturities, marketDataParams, valueDate):
 
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
+
+def get_forwardCurveLocal(undlName, valueDate=None, spotRef=None):
+
+    # one round of market data fetches, then forwards / discount factors for any maturities are in-process
+    calendar = get_calendar(undlName)
+    valueDate = get_exchangeDate(calendar) if valueDate is None else valueDate
+    if spotRef is None:
+        spot = get_spot(undlName)
+        if not isinstance(spot, dict) or spot.get(undlName) is None:
+            return {"error": "no spot for " + str(undlName) + ("" if not isinstance(spot, dict) else ": " + str(spot.get("error")))}
+        spotRef = spot[undlName]
+
+    marketData = {"yield curve": get_yieldCurve(get_CCY(undlName)), "dividend": get_dividend(undlName), "repo": get_repo(undlName)}
+    for name, data in marketData.items():
+        if not isinstance(data, dict) or "error" in data.keys():
+            return {"error": "no " + name + " for " + str(undlName) + ("" if not isinstance(data, dict) else ": " + str(data.get("error")))}
+
+    return oqa.ForwardCurve(spotRef, valueDate, marketData["yield curve"], marketData["dividend"], marketData["repo"])
+
+def calc_forwardsLocal(spotRef, maturities, marketDataParams, valueDate):
+
+    # in-process calc_forwards, returns {maturity: forward}
+    if type(maturities) == str:
+        maturities = [maturities]
+    forwardCurve = oqa.ForwardCurve(spotRef, valueDate, marketDataParams["yieldCurve"], marketDataParams["divCurve"], marketDataParams["repoCurve"])
+
+    return {str(m): float(f) for m, f in zip(maturities, forwardCurve.forward(maturities))}
+
+def calc_forwardLocal(spotRef, maturity, marketDataParams, valueDate):
+
+    return {"forward": calc_forwardsLocal(spotRef, [maturity], marketDataParams, valueDate)[str(maturity)]}
+
+def discount_cashFlowLocal(cashFlow, refDate, payDate, yieldCurve):
+
+    # cashFlow / payDate may be arrays, discounted back to refDate in one call
+    yieldCurve = yieldCurve if isinstance(yieldCurve, oqa.YieldCurve) else oqa.YieldCurve(yieldCurve)
+    pv = yieldCurve.discount_cashFlow(cashFlow, oqa.year_fractions(refDate, payDate))
+
+    return float(pv[0]) if np.ndim(cashFlow) == 0 and np.ndim(payDate) == 0 else pv
 
 def get_listedMaturity(months, calendar_undlType):
 
@@ -894,7 +2195,7 @@ def get_listedMaturity(months, calendar_undlType):
 
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def upload_undlNameInfo(infoDcit):
 
@@ -903,7 +2204,7 @@ def upload_undlNameInfo(infoDcit):
 
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def delete_undlNameInfo(undlName):
 
@@ -912,7 +2213,7 @@ def delete_undlNameInfo(undlName):
 
     response = sess.post(req, json=body, timeout=30)
     
-    return json.loads(response.text)
+    return parse_response(response)
 
 def get_VSFBatchConfig():
 
@@ -921,7 +2222,7 @@ def get_VSFBatchConfig():
     response = sess.get(req, timeout=30)
     
     try:
-        return json.loads(response.text)
+        return parse_response(response)
     except Exception as e:
         return {"error": e}
     
@@ -932,7 +2233,7 @@ def upload_VSFBatchConfig(VSFBatchConfig: dict):
 
     response = sess.post(req, json=body, timeout=30)
     
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
@@ -943,7 +2244,7 @@ def upload_VSFBatchLog(batchName: str, startTime: str, finishTime: str, log: dic
 
     response = sess.post(req, json=body, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
 
     return result
 
@@ -953,6 +2254,566 @@ def get_VSFBatchLog():
     
     response = sess.get(req, timeout=30)
 
-    result = json.loads(response.text)
+    result = parse_response(response)
+
+    return result
+# market data snapshot
+class FrozenDict(dict):
+
+    # read-only dict, safe to share across threads and picklable
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("FrozenDict is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __hash__(self):
+        return hash(tuple(sorted((k, repr(v)) for k, v in self.items())))
+
+def freeze(obj):
+
+    if isinstance(obj, dict):
+        return FrozenDict({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+MarketDataSnapshot = namedtuple("MarketDataSnapshot", ["undlName", "asOf", "dateRef", "spot", "FX", "CCY", "calendar", "exchangeDate",
+                                                       "yieldCurve", "divCurve", "repoCurve", "volSurfaceSVI"])
+
+class RequestCoalescer:
+
+    # identical calls in flight at the same time share one request
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self._inFlight = {}
+
+    def call(self, key, fn, *args):
+
+        with self._lock:
+            future = self._inFlight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inFlight[key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inFlight[key]
+
+        return future.result()
+
+requestCoalescer = RequestCoalescer()
+
+def coalesced(fn, *args):
+
+    return requestCoalescer.call((id(activeClient.get()), fn.__name__) + tuple(args), fn, *args)
+
+def get_marketDataSnapshot(undlNames, dateRef=None, maxWorkers=16):
+
+    # one immutable snapshot per underlying; curves are fetched once per currency, exchange dates once per calendar.
+    # dateRef applies to spot and curves; FX and exchangeDate are always the live values (there is no historical getFX / getExchangeDate)
+    single = isinstance(undlNames, str)
+    undlNames = [undlNames] if single else list(dict.fromkeys(undlNames))
+    asOf = datetime.now()
+
+    with ContextThreadPoolExecutor(max_workers=maxWorkers) as pool:
+
+        ccys = dict(zip(undlNames, pool.map(lambda u: coalesced(get_CCY, u), undlNames)))
+        calendars = dict(zip(undlNames, pool.map(lambda u: coalesced(get_calendar, u), undlNames)))
+
+        ccyGroups, calendarGroups = {}, {}
+        for u in undlNames:
+            ccyGroups.setdefault(ccys[u], []).append(u)
+            calendarGroups.setdefault(calendars[u], []).append(u)
+
+        yieldCurves = {ccy: pool.submit(coalesced, get_yieldCurve, ccy, dateRef) for ccy in ccyGroups.keys()}
+        fxs = {ccy: pool.submit(coalesced, get_FX, names[0]) for ccy, names in ccyGroups.items()}
+        exchangeDates = {cal: pool.submit(coalesced, get_exchangeDate, cal) for cal in calendarGroups.keys() if cal is not None}
+
+        if dateRef is None:
+            spots = {u: pool.submit(coalesced, get_spot, u) for u in undlNames}
+        else:
+            spots = {u: pool.submit(coalesced, get_spotHist, u, dateRef) for u in undlNames}
+        divs = {u: pool.submit(coalesced, get_dividend, u, dateRef) for u in undlNames}
+        repos = {u: pool.submit(coalesced, get_repo, u, dateRef) for u in undlNames}
+        surfaces = {u: pool.submit(coalesced, get_volSurfaceSVI, u, dateRef) for u in undlNames}
+
+        # FX is a per-currency rate, read from the first name's reply and stored as a value like spot
+        fxs = {ccy: (f.result(), ccyGroups[ccy][0]) for ccy, f in fxs.items()}
+        fxs = {ccy: fx.get(u) if isinstance(fx, dict) and "error" not in fx.keys() else None for ccy, (fx, u) in fxs.items()}
+
+        snapshots = {}
+        for u in undlNames:
+            spot = spots[u].result()
+            snapshots[u] = MarketDataSnapshot(undlName=u,
+                                              asOf=asOf,
+                                              dateRef=dateRef,
+                                              spot=spot.get(u) if isinstance(spot, dict) and "error" not in spot.keys() else None,
+                                              FX=fxs[ccys[u]],
+                                              CCY=ccys[u],
+                                              calendar=calendars[u],
+                                              exchangeDate=exchangeDates[calendars[u]].result() if calendars[u] in exchangeDates.keys() else None,
+                                              yieldCurve=freeze(yieldCurves[ccys[u]].result()),
+                                              divCurve=freeze(divs[u].result()),
+                                              repoCurve=freeze(repos[u].result()),
+                                              volSurfaceSVI=freeze(surfaces[u].result()))
+
+    return snapshots[undlNames[0]] if single else snapshots
+
+# live spot / FX: latest-value tick cache fed by a streaming subscription, or by coalesced polling when streaming is unavailable
+LIVE_FIELDS = {"spot": get_spot, "FX": get_FX}
+Tick = namedtuple("Tick", ["undlName", "field", "value", "timestamp", "received", "source"])
+
+class TickCache:
+
+    # latest tick per (field, undlName); writers swap whole immutable Tick tuples, so readers never take a lock
+    def __init__(self):
+
+        self._ticks = {}
+
+    def update(self, undlName, field, value, timestamp=None, source="poll"):
+
+        received = time.time()
+        tick = Tick(undlName, field, float(value), received if timestamp is None else float(timestamp), received, source)
+        self._ticks[(field, undlName)] = tick
+
+        return tick
+
+    def tick(self, undlName, field="spot"):
+
+        return self._ticks.get((field, undlName))
+
+    def get(self, undlName, field="spot", maxAge=None):
+
+        # None when missing or received more than maxAge seconds ago
+        tick = self._ticks.get((field, undlName))
+        if tick is None or (maxAge is not None and time.time() - tick.received > maxAge):
+            return None
+        return tick.value
+
+    def snapshot(self, field="spot"):
+
+        return {u: t.value for (f, u), t in dict(self._ticks).items() if f == field}
+
+    def invalidate(self, undlName=None):
+
+        if undlName is None:
+            self._ticks = {}
+        else:
+            self._ticks = {k: t for k, t in dict(self._ticks).items() if k[1] != undlName}
+
+tickCache = TickCache()
+
+class SpotSubscription:
+
+    # keeps a TickCache current for a set of underlyings from the api/v1/streamSpot server-sent events (or NDJSON);
+    # when the stream is missing or drops, polls coalesced get_spot / get_FX every pollInterval and retries the stream after streamRetry seconds
+    def __init__(self, undlNames, fields=["spot", "FX"], stream=True, pollInterval=1.0, streamRetry=60.0, readTimeout=30.0,
+                 maxWorkers=16, cache=None, onTick=None):
+
+        self.undlNames = list(dict.fromkeys([undlNames] if isinstance(undlNames, str) else undlNames))
+        self.fields = [f for f in fields if f in LIVE_FIELDS.keys()]
+        self.stream = stream
+        self.pollInterval = pollInterval
+        self.streamRetry = streamRetry
+        self.readTimeout = readTimeout
+        self.maxWorkers = maxWorkers
+        self.cache = tickCache if cache is None else cache
+        self.onTick = onTick
+        self.mode = None
+        self.ticks = 0
+        self.errors = []
+        self._stop = threading.Event()
+        self._changed = threading.Event()
+        self._response = None
+        self._thread = None
+
+    def start(self):
+
+        # the worker thread runs in the caller's context, so an active OptionQuantLibClient carries over
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._run,), daemon=True, name="SpotSubscription")
+        self._thread.start()
+
+        return self
+
+    def stop(self, timeout=5.0):
+
+        self._stop.set()
+        self._closeStream(self._response)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.mode = None
+
+    def subscribe(self, undlNames):
+
+        undlNames = [undlNames] if isinstance(undlNames, str) else undlNames
+        # close the stream that was open when the names changed, the worker reconnects with the new set
+        response = self._response
+        self.undlNames = list(dict.fromkeys(self.undlNames + list(undlNames)))
+        self._changed.set()
+        self._closeStream(response)
+
+    def unsubscribe(self, undlNames):
+
+        undlNames = [undlNames] if isinstance(undlNames, str) else undlNames
+        response = self._response
+        self.undlNames = [u for u in self.undlNames if u not in undlNames]
+        self._changed.set()
+        self._closeStream(response)
+
+    def wait(self, timeout=10.0):
+
+        # block until every subscribed underlying has a tick for every field
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if all(self.cache.tick(u, f) is not None for u in self.undlNames for f in self.fields):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def _closeStream(self, response):
+
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def _apply(self, record, source):
+
+        undlName = record.get("undlName")
+        for f in self.fields:
+            if f in record.keys() and record[f] is not None:
+                tick = self.cache.update(undlName, f, record[f], record.get("timestamp"), source)
+                self.ticks += 1
+                if self.onTick is not None:
+                    self.onTick(tick)
+
+    def _run(self):
+
+        streamFailed = None
+        with ContextThreadPoolExecutor(max_workers=self.maxWorkers) as pool:
+            while not self._stop.is_set():
+                if self.stream and (streamFailed is None or time.time() - streamFailed > self.streamRetry):
+                    try:
+                        self._runStream()
+                    except Exception as e:
+                        if not self._stop.is_set() and not self._changed.is_set():
+                            self.errors.append({"time": time.time(), "error": type(e).__name__ + ": " + str(e)})
+                            streamFailed = time.time()
+                    if self._changed.is_set() or self._stop.is_set():
+                        continue
+                self.mode = "poll"
+                self._changed.clear()
+                self._poll(pool)
+                self._stop.wait(self.pollInterval)
+
+    def _runStream(self):
+
+        self._changed.clear()
+        req = api_url + "api/v1/streamSpot"
+        params = {"undlNames": ",".join(self.undlNames), "fields": ",".join(self.fields)}
+        response = sess.get(req, params=params, headers={"Accept": "text/event-stream, application/x-ndjson"},
+                            timeout=(10, self.readTimeout), stream=True)
+        if response.status_code in (404, 405):
+            response.close()
+            raise EndpointUnavailable("streamSpot not available")
+        response.raise_for_status()
+
+        self._response = response
+        self.mode = "stream"
+        try:
+            for line in response.iter_lines():
+                if self._stop.is_set() or self._changed.is_set():
+                    break
+                # NDJSON lines, or SSE "data: {...}" records separated by blank lines
+                if not line or line.startswith(b":") or line.startswith(b"event:") or line.startswith(b"id:"):
+                    continue
+                if line.startswith(b"data:"):
+                    line = line[5:].strip()
+                self._apply(json_loads(line), "stream")
+        finally:
+            self._response = None
+            response.close()
+
+        if not self._stop.is_set() and not self._changed.is_set():
+            raise ConnectionError("streamSpot closed by server")
+
+    def _poll(self, pool):
+
+        futures = [(u, f, pool.submit(coalesced, LIVE_FIELDS[f], u)) for u in self.undlNames for f in self.fields]
+        for u, f, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"error": str(e)}
+            if isinstance(result, dict) and "error" not in result.keys() and result.get(u) is not None:
+                self._apply({"undlName": u, f: result[u]}, "poll")
+
+    def __enter__(self):
+
+        return self.start()
+
+    def __exit__(self, *exc):
+
+        self.stop()
+
+def subscribe_spot(undlNames, fields=["spot", "FX"], stream=True, pollInterval=1.0, **kwargs):
+
+    # started SpotSubscription writing into the shared tickCache; read with get_spotLive / get_FXLive, stop() when done
+    return SpotSubscription(undlNames, fields, stream, pollInterval, **kwargs).start()
+
+def get_spotLive(undlName, maxAge=None, field="spot"):
+
+    # same shape as get_spot, served from the tick cache; missing or stale names fall back to a coalesced get_spot / get_FX poll
+    # that also refreshes the cache. Names whose poll fails as well are reported under "error" as {undlName: error}
+    undlNames = [undlName] if isinstance(undlName, str) else list(undlName)
+    result = {}
+    errors = {}
+    for u in undlNames:
+        value = tickCache.get(u, field, maxAge)
+        if value is None:
+            try:
+                pulled = coalesced(LIVE_FIELDS[field], u)
+            except Exception as e:
+                pulled = {"error": type(e).__name__ + ": " + str(e)}
+            if not isinstance(pulled, dict) or "error" in pulled.keys() or pulled.get(u) is None:
+                errors[u] = pulled.get("error") if isinstance(pulled, dict) else pulled
+                continue
+            value = tickCache.update(u, field, pulled[u], source="pull").value
+        result[u] = value
+    if len(errors) > 0:
+        result["error"] = errors
+
+    return result
+
+def get_FXLive(undlName, maxAge=None):
+
+    return get_spotLive(undlName, maxAge, "FX")
+
+# vanilla pricer quote strings
+def resolve_quoteStrings(quotes, dateRef=None, maxWorkers=16, listed=False):
+
+    # "NVDA.OQ 3M 90% P" lines (list or one multi-line string) -> columnar contract table; calendar / spot once per underlying,
+    # exchange date once per calendar, holidays from the shared business calendars, tenors and strikes resolved in-process;
+    # listed=True snaps tenors to the nearest listed expiry of the underlying's registered calendar_undlType (register_expiryCalendar),
+    # tenor rows of names without one get an error
+    if isinstance(quotes, str):
+        quotes = quotes.splitlines()
+    table = oqa.parse_quoteStrings(quotes)
+    ok = table["error"].isna()
+    undlNames = list(dict.fromkeys(table.loc[ok, "undlName"]))
+    needSpot = set(table.loc[ok & table["spotRef"].isna(), "undlName"])
+
+    with ContextThreadPoolExecutor(max_workers=maxWorkers) as pool:
+        holidays = pool.submit(refresh_expiryCalendars if listed else refresh_businessCalendars)
+        calendars = dict(zip(undlNames, pool.map(lambda u: coalesced(get_calendar, u), undlNames)))
+        undlTypes = dict(zip(undlNames, pool.map(lambda u: coalesced(get_undlType, u), undlNames))) if listed else {}
+        if dateRef is None:
+            spots = {u: pool.submit(coalesced, get_spot, u) for u in undlNames if u in needSpot}
+            exchangeDates = {c: pool.submit(coalesced, get_exchangeDate, c) for c in set(calendars.values()) if c is not None}
+            valueDates = {c: f.result() for c, f in exchangeDates.items()}
+        else:
+            spots = {u: pool.submit(coalesced, get_spotHist, u, dateRef) for u in undlNames if u in needSpot}
+            valueDates = {c: str(oqa.to_date(dateRef)) for c in set(calendars.values()) if c is not None}
+        spots = {u: f.result() for u, f in spots.items()}
+        spots = {u: spot.get(u) for u, spot in spots.items() if isinstance(spot, dict) and "error" not in spot.keys()}
+        holidays.result()
+
+    businessCalendarMap = {c: get_businessCalendar(c) for c in valueDates.keys()}
+    expiryCalendarMap = {u: get_expiryCalendar(listed_key(calendars[u], t)) for u, t in undlTypes.items()}
+
+    return oqa.resolve_quoteTable(table, valueDates, spots, calendars, {c: b for c, b in businessCalendarMap.items() if b is not None},
+                                  {u: e for u, e in expiryCalendarMap.items() if e is not None} if listed else None)
+
+def quoteTable_to_params(quoteTable, snapshots=None, dateRef=None, maxWorkers=16):
+
+    # resolved rows -> params list for calc_EuropeanBatch / calc_scenarioLadder, curves shared by reference per underlying
+    # and vol read from the local SVI surface; rows with an error are skipped
+    table = quoteTable[quoteTable["error"].isna()]
+    if snapshots is None:
+        snapshots = get_marketDataSnapshot(list(dict.fromkeys(table["undlName"])), dateRef, maxWorkers)
+
+    params = []
+    for undlName, group in table.groupby("undlName", sort=False):
+        snapshot = snapshots[undlName]
+        marketData = {"undlName": undlName, "yieldCurve": snapshot.yieldCurve, "divCurve": snapshot.divCurve, "repoCurve": snapshot.repoCurve}
+        vols = np.full(len(group), np.nan)
+        if isinstance(snapshot.volSurfaceSVI, dict) and "SVI-JW" in snapshot.volSurfaceSVI.keys():
+            volSurface = oqa.VolSurfaceSVI(snapshot.volSurfaceSVI, valueDate=group["valueDate"].iloc[0])
+            vols = volSurface.vol_pairs(group["strike"].values, group["maturity"].values, group["spotRef"].values)
+        fields = ["quote", "spotRef", "strike", "valueDate", "maturity", "optionType"]
+        for i, values, vol in zip(group.index, zip(*[group[f].tolist() for f in fields]), vols.tolist()):
+            params.append(mergeDict(marketData, mergeDict(dict(zip(fields, values)), {"vol": vol, "row": i})))
+
+    return sorted(params, key=lambda p: p["row"])
+
+# VSF batch runner
+VSF_STAGES = ["chain", "impliedVol", "repo", "fit", "arbCheck", "upload"]
+
+def arb_violated(arbCheck):
+
+    # True when any arbFree / butterflyArbFree / calendarArbFree flag of a check_volSurfaceArb result is false; a result that is not a dict,
+    # carries an "error" or has no flags at all counts as violated
+    if not isinstance(arbCheck, dict) or "error" in arbCheck.keys():
+        return True
+    flags = [v for k, v in arbCheck.items() if k.lower().endswith("arbfree")]
+
+    return len(flags) == 0 or not all(flags)
+
+def run_VSFPipeline(undlName, chainLoader, volModel="SVI-JW", username=None, upload=True, uploadOnArb=False):
+
+    # chain -> implied vol -> repo -> SVI fit -> arb check -> upload for one underlying, timing every stage;
+    # a surface with arbitrage violations is not uploaded (name marked failed) unless uploadOnArb
+    log = {"undlName": undlName, "status": "ok", "timing": {}}
+    t0 = time.perf_counter()
+
+    def stage(name, fn, *args):
+        t = time.perf_counter()
+        result = fn(*args)
+        log["timing"][name] = round(time.perf_counter() - t, 4)
+        if result is None or (isinstance(result, dict) and "error" in result.keys()):
+            raise RuntimeError("{} failed: {}".format(name, None if result is None else result["error"]))
+        return result
+
+    try:
+        optionChainData = stage("chain", chainLoader, undlName)
+        volData = stage("impliedVol", get_optionChainVol, optionChainData)
+        repoFitted = stage("repo", get_optionChainRepo, optionChainData)
+        volSurfaceSVI = stage("fit", fit_volSurfaceSVI, volData, repoFitted, volModel, getpass.getuser() if username is None else username)
+        marketData = {"spotRef": optionChainData.get("spotRef") if isinstance(optionChainData, dict) else None,
+                      "yieldCurve": get_yieldCurve(get_CCY(undlName)), "divCurve": get_dividend(undlName), "repoCurve": repoFitted}
+        valueDate = optionChainData.get("valueDate") if isinstance(optionChainData, dict) else None
+        log["arbCheck"] = stage("arbCheck", check_volSurfaceArb, volSurfaceSVI, marketData, valueDate)
+        if upload and not uploadOnArb and arb_violated(log["arbCheck"]):
+            raise RuntimeError("arbCheck failed: arbitrage violations or no arbitrage flags, upload skipped")
+        if upload:
+            stage("upload", upload_volSurfaceSVI, volSurfaceSVI)
+    except Exception as e:
+        log["status"] = "error"
+        log["error"] = str(e)
+
+    log["timing"]["total"] = round(time.perf_counter() - t0, 4)
+
+    return log
+
+def _loadCheckpoint(checkpointPath, batchName):
+
+    if checkpointPath is None or not os.path.exists(checkpointPath):
+        return {}
+    with open(checkpointPath, "r") as f:
+        checkpoint = json.load(f)
+
+    return checkpoint["logs"] if checkpoint.get("batchName") == batchName else {}
+
+def _saveCheckpoint(checkpointPath, batchName, startTime, logs):
+
+    if checkpointPath is None:
+        return
+    tmpPath = checkpointPath + ".tmp"
+    with open(tmpPath, "w") as f:
+        json.dump({"batchName": batchName, "startTime": startTime, "logs": logs}, f, default=str)
+    os.replace(tmpPath, checkpointPath)
+
+def run_VSFBatch(VSFBatchConfig, chainLoader, maxWorkers=4, executor="process", checkpointPath=None, upload=True, uploadOnArb=False):
+
+    # VSFBatchConfig: {"batchName", "undlNames" (or "undlList"), "volModel", "username"}; chainLoader(undlName) -> optionChainData,
+    # must be a module level function when executor="process". Names already fitted in the checkpoint are skipped on resume.
+    batchName = VSFBatchConfig.get("batchName", VSFBatchConfig.get("name", "VSFBatch"))
+    undlNames = VSFBatchConfig.get("undlNames", VSFBatchConfig.get("undlList", []))
+    undlNames = list(dict.fromkeys([undlNames] if isinstance(undlNames, str) else undlNames))
+    volModel = VSFBatchConfig.get("volModel", "SVI-JW")
+    username = VSFBatchConfig.get("username")
+
+    startTime = datetime.strftime(datetime.now(), "%Y-%m-%dT%H:%M:%S")
+    t0 = time.perf_counter()
+    # checkpoint entries of names no longer in the batch are dropped
+    logs = {u: l for u, l in _loadCheckpoint(checkpointPath, batchName).items() if u in undlNames}
+    pending = [u for u in undlNames if logs.get(u, {}).get("status") != "ok"]
+
+    Pool = ProcessPoolExecutor if executor == "process" else ContextThreadPoolExecutor
+    with Pool(max_workers=maxWorkers) as pool:
+        futures = {pool.submit(run_VSFPipeline, u, chainLoader, volModel, username, upload, uploadOnArb): u for u in pending}
+        for future in as_completed(futures):
+            u = futures[future]
+            try:
+                logs[u] = future.result()
+            except Exception as e:
+                logs[u] = {"undlName": u, "status": "error", "error": str(e), "timing": {}}
+            _saveCheckpoint(checkpointPath, batchName, startTime, logs)
+
+    stageTotals = {s: round(sum(l["timing"].get(s, 0.0) for l in logs.values()), 4) for s in VSF_STAGES + ["total"]}
+    summary = {"nNames": len(undlNames), "nOk": sum(l["status"] == "ok" for l in logs.values()),
+               "nError": sum(l["status"] != "ok" for l in logs.values()), "nResumed": len(undlNames) - len(pending),
+               "wallTime": round(time.perf_counter() - t0, 4), "stageTotals": stageTotals}
+    log = {"summary": summary, "names": logs}
+
+    finishTime = datetime.strftime(datetime.now(), "%Y-%m-%dT%H:%M:%S")
+    if upload:
+        log["uploadResult"] = upload_VSFBatchLog(batchName, startTime, finishTime, log)
+    if checkpointPath is not None and summary["nError"] == 0 and os.path.exists(checkpointPath):
+        os.remove(checkpointPath)
+
+    return log
+
+# isolated client instances
+class OptionQuantLibClient:
+
+    # own session (pools, retries, breaker) and api url; every module function is available as a method, e.g.
+    # OptionQuantLibClient("http://host/", {"maxRetries": 5}).get_spot("NVDA.OQ"). Reference / historical caches stay module-wide.
+    def __init__(self, apiUrl=None, transport=None):
+
+        self.apiUrl = api_url if apiUrl is None else apiUrl
+        self.session = ResilientSession(mergeDict(config.get("transport", {}), {} if transport is None else transport))
+
+    def __getattr__(self, name):
+
+        fn = globals().get(name)
+        if name.startswith("_") or not inspect.isfunction(fn):
+            raise AttributeError(name)
+
+        def run(*args, **kwargs):
+            context = contextvars.copy_context()
+            context.run(activeClient.set, self)
+            if not inspect.isgeneratorfunction(fn):
+                return context.run(fn, *args, **kwargs)
+            return self._iterate(context, context.run(fn, *args, **kwargs))
+
+        return functools.wraps(fn)(run)
+
+    def _iterate(self, context, generator):
+
+        while True:
+            try:
+                item = context.run(next, generator)
+            except StopIteration:
+                return
+            yield item
+
+    def breaker_states(self):
+
+        return {host: breaker.state for host, breaker in self.session.breakers.items()}
+
+    def close(self):
+
+        self.session.close()
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *exc):
 
-    return result
\ No newline at end of file
+        self.close()
@@ -0,0 +1,203 @@
+import time, threading, bisect, warnings
+from collections import deque
+
+try:
+    from opentelemetry import trace as otelTrace
+except ImportError:
+    otelTrace = None
+
+# latency histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1200.0]
+RESERVOIR_SIZE = 2048
+
+# helper functions
+def endpoint_name(url):
+
+    return url.split("api/v1/")[-1].split("?")[0]
+
+def percentile(values, q):
+
+    if len(values) == 0:
+        return None
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+# sinks: anything with an emit(event) method; events are dicts with "type" in request / parse / retry
+class StatsSink:
+
+    # per-endpoint aggregates: latency histogram + recent-sample percentiles, bytes, parse time, errors, retries
+    def __init__(self, buckets=LATENCY_BUCKETS, reservoirSize=RESERVOIR_SIZE):
+
+        self.buckets = list(buckets)
+        self.reservoirSize = reservoirSize
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _endpoint(self, endpoint):
+
+        if endpoint not in self._stats.keys():
+            self._stats[endpoint] = {"count": 0, "errors": 0, "retries": 0, "totalTime": 0.0, "maxTime": 0.0,
+                                     "bucketCounts": [0] * (len(self.buckets) + 1), "samples": deque(maxlen=self.reservoirSize),
+                                     "bytesSent": 0, "bytesReceived": 0, "parseCount": 0, "parseTime": 0.0, "statusCodes": {}}
+        return self._stats[endpoint]
+
+    def emit(self, event):
+
+        with self._lock:
+            s = self._endpoint(event["endpoint"])
+            if event["type"] == "request":
+                s["count"] += 1
+                s["totalTime"] += event["duration"]
+                s["maxTime"] = max(s["maxTime"], event["duration"])
+                s["bucketCounts"][bisect.bisect_left(self.buckets, event["duration"])] += 1
+                s["samples"].append(event["duration"])
+                s["bytesSent"] += event.get("bytesSent", 0)
+                s["bytesReceived"] += event.get("bytesReceived", 0)
+                status = event.get("status")
+                s["statusCodes"][status] = s["statusCodes"].get(status, 0) + 1
+                if event.get("error") is not None or (isinstance(status, int) and status >= 400):
+                    s["errors"] += 1
+            elif event["type"] == "parse":
+                s["parseCount"] += 1
+                s["parseTime"] += event["duration"]
+            elif event["type"] == "retry":
+                s["retries"] += 1
+
+    def snapshot(self):
+
+        with self._lock:
+            result = {}
+            for endpoint, s in self._stats.items():
+                samples = list(s["samples"])
+                result[endpoint] = {"count": s["count"], "errors": s["errors"], "retries": s["retries"],
+                                    "totalTime": s["totalTime"], "meanTime": s["totalTime"] / s["count"] if s["count"] > 0 else None,
+                                    "maxTime": s["maxTime"], "p50": percentile(samples, 0.5), "p90": percentile(samples, 0.9),
+                                    "p99": percentile(samples, 0.99), "bytesSent": s["bytesSent"], "bytesReceived": s["bytesReceived"],
+                                    "parseTime": s["parseTime"], "parseCount": s["parseCount"], "statusCodes": dict(s["statusCodes"])}
+            return result
+
+    def top(self, n=10, by="totalTime"):
+
+        # endpoints dominating wall-clock time (or any other snapshot field)
+        stats = self.snapshot()
+        return sorted(stats.items(), key=lambda kv: kv[1][by] or 0, reverse=True)[:n]
+
+    def reset(self):
+
+        with self._lock:
+            self._stats = {}
+
+class PrometheusSink(StatsSink):
+
+    # StatsSink rendered in the Prometheus text exposition format
+    def render(self, prefix="eqvol_client"):
+
+        with self._lock:
+            stats = {k: {**v, "statusCodes": dict(v["statusCodes"])} for k, v in self._stats.items()}
+
+        lines = ["# TYPE {}_request_duration_seconds histogram".format(prefix)]
+        for endpoint, s in stats.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ["+Inf"], s["bucketCounts"]):
+                cumulative += count
+                lines.append('{}_request_duration_seconds_bucket{{endpoint="{}",le="{}"}} {}'.format(prefix, endpoint, bound, cumulative))
+            lines.append('{}_request_duration_seconds_sum{{endpoint="{}"}} {}'.format(prefix, endpoint, s["totalTime"]))
+            lines.append('{}_request_duration_seconds_count{{endpoint="{}"}} {}'.format(prefix, endpoint, s["count"]))
+
+        for name, field, kind in [("request_bytes_total", "bytesSent", "counter"), ("response_bytes_total", "bytesReceived", "counter"),
+                                  ("parse_seconds_total", "parseTime", "counter"), ("errors_total", "errors", "counter"),
+                                  ("retries_total", "retries", "counter")]:
+            lines.append("# TYPE {}_{} {}".format(prefix, name, kind))
+            for endpoint, s in stats.items():
+                lines.append('{}_{}{{endpoint="{}"}} {}'.format(prefix, name, endpoint, s[field]))
+
+        return "\n".join(lines) + "\n"
+
+class SpanSink:
+
+    # OpenTelemetry-style spans for request events; kept in memory, forwarded to an exporter callable
+    # and, when opentelemetry is installed and a tracer is given, replayed as real spans
+    def __init__(self, maxSpans=10000, exporter=None, tracer=None):
+
+        self.spans = deque(maxlen=maxSpans)
+        self.exporter = exporter
+        self.tracer = tracer
+
+    def emit(self, event):
+
+        if event["type"] != "request":
+            return
+
+        span = {"name": "{} api/v1/{}".format(event.get("method", "POST"), event["endpoint"]),
+                "startTimeUnixNano": int(event["start"] * 1e9), "endTimeUnixNano": int((event["start"] + event["duration"]) * 1e9),
+                "status": "ERROR" if event.get("error") is not None or (isinstance(event.get("status"), int) and event["status"] >= 400) else "OK",
+                "attributes": {"http.method": event.get("method"), "http.url": event.get("url"), "http.status_code": event.get("status"),
+                               "http.request.body.size": event.get("bytesSent", 0), "http.response.body.size": event.get("bytesReceived", 0),
+                               "error.message": event.get("error")}}
+        self.spans.append(span)
+
+        if self.exporter is not None:
+            self.exporter(span)
+        if self.tracer is not None and otelTrace is not None:
+            otelSpan = self.tracer.start_span(span["name"], start_time=span["startTimeUnixNano"],
+                                              attributes={k: v for k, v in span["attributes"].items() if v is not None})
+            if span["status"] == "ERROR":
+                otelSpan.set_status(otelTrace.Status(otelTrace.StatusCode.ERROR))
+            otelSpan.end(end_time=span["endTimeUnixNano"])
+
+# instrumentation registry shared by the sync and async clients
+class Instrumentation:
+
+    def __init__(self, sinks=None, enabled=True):
+
+        self.stats = StatsSink()
+        self.sinks = [self.stats] if sinks is None else list(sinks)
+        self.enabled = enabled
+        # failures per sink, {repr(sink): {"count", "lastError"}}; the first failure of each sink is also warned
+        self.sinkErrors = {}
+        self._errorLock = threading.Lock()
+
+    def add_sink(self, sink):
+
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def emit(self, event):
+
+        if not self.enabled:
+            return
+        for sink in self.sinks:
+            try:
+                sink.emit(event)
+            except Exception as e:
+                # a broken sink must not fail the request being recorded
+                with self._errorLock:
+                    errors = self.sinkErrors.setdefault(repr(sink), {"count": 0, "lastError": None})
+                    errors["count"] += 1
+                    errors["lastError"] = type(e).__name__ + ": " + str(e)
+                if errors["count"] == 1:
+                    warnings.warn("instrumentation sink {} failed: {}".format(repr(sink), errors["lastError"]), RuntimeWarning)
+
+    def record_request(self, url, method, start, duration, bytesSent=0, bytesReceived=0, status=None, error=None):
+
+        self.emit({"type": "request", "endpoint": endpoint_name(url), "url": url, "method": method, "start": start, "duration": duration,
+                   "bytesSent": bytesSent, "bytesReceived": bytesReceived, "status": status, "error": error})
+
+    def record_parse(self, url, duration):
+
+        self.emit({"type": "parse", "endpoint": endpoint_name(url), "duration": duration})
+
+    def record_retry(self, url):
+
+        self.emit({"type": "retry", "endpoint": endpoint_name(url)})
+
+instrumentation = Instrumentation()
+
+def get_endpointStats(n=None, by="totalTime"):
+
+    return instrumentation.stats.snapshot() if n is None else dict(instrumentation.stats.top(n, by))
@@ -0,0 +1,361 @@
+import numpy as np
+import json, time, random, threading, zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import OptionQuantLibAnalytics as oqa
+import OptionQuantLibClientAPI as api
+
+# local stand-in for the api/v1 server with deterministic canned data and injected latency, for offline benchmarks.
+# Analytic endpoints (LATENCY_ONLY) answer by running OptionQuantLibAnalytics, the same code as the local path, so they measure
+# round trip cost only and are not a check of local results; those replies carry "X-Mock-Latency-Only: 1"
+VALUE_DATE = "2026-01-02"
+CALENDAR = "XNYS"
+HOLIDAYS = {"XNYS": ["2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19", "2026-07-03",
+                     "2026-09-07", "2026-11-26", "2026-12-25", "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26"]}
+# client-side rules the benchmark registers with register_expiryCalendar (not served: the getListedMaturityRule format is unknown)
+LISTED_RULES = {"XNYS_Stock": {"expiryDay": "3FRI", "monthly": 6, "quarterly": 6, "quarterMonths": [3, 6, 9, 12], "yearly": 3,
+                               "yearlyMonths": [12], "weekly": 4, "roll": "preceding"}}
+# expected XNYS_Stock listed set on VALUE_DATE, written out by hand from the rule and HOLIDAYS (2026-06-19 rolls to the 18th);
+# getListedMaturity answers from this list so local expiry tables are checked against data they did not produce
+LISTED_EXPIRIES = {"XNYS_Stock": ["2026-01-02", "2026-01-09", "2026-01-16", "2026-01-23", "2026-01-30", "2026-02-20", "2026-03-20",
+                                  "2026-04-17", "2026-05-15", "2026-06-18", "2026-09-18", "2026-12-18", "2027-03-19", "2027-06-18",
+                                  "2027-12-17", "2028-12-15"]}
+MOCK_LATENCY = {"default": 0.02, "getOptionChainVol": 0.5, "fitVolSurfaceSVI": 0.5, "American": 0.05}
+TICK_INTERVAL = 0.05
+MOCK_UNIVERSE = 2000
+
+# canned data, seeded by the underlying name so every call for a name returns the same market
+def _seed(name):
+
+    return zlib.crc32(str(name).encode())
+
+def mock_spot(undlName):
+
+    return round(20 + _seed(undlName) % 480 + (_seed(undlName) % 100) / 100, 2)
+
+def mock_yieldCurve(ccy="USD"):
+
+    tenors = [0.25, 0.5, 1, 2, 3, 5, 7, 10]
+    return {"currency": ccy, "yieldCurve": {str(t): round(float(0.04 + 0.002 * np.log1p(t)), 6) for t in tenors}}
+
+def listed_maturities(n=12, valueDate=VALUE_DATE):
+
+    # third Fridays, monthly then quarterly
+    d0 = oqa.to_date(valueDate)
+    months = [(d0.year + (d0.month - 1 + i) // 12, (d0.month - 1 + i) % 12 + 1) for i in range(1, 7)]
+    months += [(d0.year + (d0.month - 1 + i) // 12, (d0.month - 1 + i) % 12 + 1) for i in range(9, 9 + 3 * (n - 6), 3)]
+    result = []
+    for y, m in months:
+        first = date(y, m, 1)
+        result.append((first + timedelta(days=(4 - first.weekday()) % 7 + 14)).strftime("%Y-%m-%d"))
+    return result
+
+def mock_divCurve(undlName, valueDate=VALUE_DATE):
+
+    spot = mock_spot(undlName)
+    d0 = oqa.to_date(valueDate)
+    schedule = {(d0 + timedelta(days=45 + 91 * i)).strftime("%Y-%m-%d"): {"value": round(spot * 0.004, 4), "type": "Cash"} for i in range(20)}
+    return {"undlName": undlName, "lastUpdate": valueDate, "lastUpdateTime": valueDate + "T00:00:00", "Schedule": schedule}
+
+def mock_repoCurve(undlName, valueDate=VALUE_DATE):
+
+    d0 = oqa.to_date(valueDate)
+    schedule = {(d0 + timedelta(days=365 * t)).strftime("%Y-%m-%d"): round(0.002 + 0.0005 * t, 6) for t in [1, 2, 5]}
+    return {"undlName": undlName, "lastUpdate": valueDate, "lastUpdateTime": valueDate + "T00:00:00", "Schedule": schedule}
+
+def mock_volSurfaceSVI(undlName, valueDate=VALUE_DATE):
+
+    rng = np.random.default_rng(_seed(undlName))
+    atm = 0.2 + 0.3 * rng.random()
+    forwardCurve = oqa.ForwardCurve(mock_spot(undlName), valueDate, mock_yieldCurve(), mock_divCurve(undlName, valueDate), mock_repoCurve(undlName, valueDate))
+    slices = {}
+    for m in listed_maturities():
+        tau = oqa.year_fraction(valueDate, m)
+        vol = atm * (1 + 0.1 * np.exp(-4 * tau))
+        slices[m] = {"vol": round(vol, 6), "skew": round(-0.15 / np.sqrt(1 + 4 * tau), 6), "pWing": round(0.5 / np.sqrt(1 + tau), 6),
+                     "cWing": round(0.2 / np.sqrt(1 + tau), 6), "minVol": round(vol * 0.9, 6), "tau": round(tau, 8),
+                     "forward": round(float(forwardCurve.forward([tau])[0]) / forwardCurve.spotRef, 8)}
+    return {"undlName": undlName, "anchor": mock_spot(undlName), "anchorDate": valueDate, "lastUpdate": valueDate,
+            "lastUpdateTime": valueDate + "T00:00:00", "SVI-JW": slices}
+
+def mock_optionChain(undlName, valueDate=VALUE_DATE, strikesPerExpiry=40, spread=0.02):
+
+    # quotes priced off the mock surface, in the layout the chain IV endpoints take
+    spot = mock_spot(undlName)
+    surface = oqa.VolSurfaceSVI(mock_volSurfaceSVI(undlName, valueDate))
+    yieldCurve, divCurve, repoCurve = mock_yieldCurve(), mock_divCurve(undlName, valueDate), mock_repoCurve(undlName, valueDate)
+    strikes = np.round(spot * np.linspace(0.6, 1.5, strikesPerExpiry), 1)
+    divTimes, divAmounts = oqa.div_schedule(divCurve, valueDate)
+
+    data = []
+    for m in surface.maturities:
+        tau = oqa.year_fraction(valueDate, m)
+        vols = surface.vol_smile(strikes, tau)
+        for isCall, optionType in [(True, "C"), (False, "P")]:
+            npv = oqa.calc_EuropeanArrays(spot, strikes, tau, oqa.interp_yieldCurve(yieldCurve, tau), oqa.interp_repoCurve(repoCurve, valueDate, tau),
+                                          vols, isCall, divTimes, divAmounts)["NPV"]
+            for k, px in zip(strikes, npv):
+                if px > 0.01:
+                    data.append({"maturity": m, "strike": float(k), "optionType": optionType, "bid": round(float(px) * (1 - spread), 4),
+                                 "ask": round(float(px) * (1 + spread), 4), "mid": round(float(px), 4)})
+
+    return {"undlName": undlName, "spotRef": spot, "valueDate": valueDate, "yieldCurve": yieldCurve, "divCurve": divCurve,
+            "repoCurve": repoCurve, "data": data}
+
+# endpoint handlers: body dict -> response object
+def _reference(field):
+
+    values = {"RIC": lambda u: u, "BBG": lambda u: u.split(".")[0] + " US Equity", "OBB": lambda u: u.split(".")[0],
+              "symbol": lambda u: u.split(".")[0], "systemName": lambda u: u, "undlType": lambda u: "Stock", "calendar": lambda u: CALENDAR,
+              "CCY": lambda u: "USD", "DVDCCY": lambda u: "USD", "listedExerciseType": lambda u: "American", "exchange": lambda u: "NASDAQ"}
+    return lambda body: {"result": values[field](body["undlName"])}
+
+def _underlyingDatabase(n=MOCK_UNIVERSE):
+
+    # column-oriented table, one row per mock underlying, reference fields under their getter names
+    names = ["MOCK{:03d}.OQ".format(i) for i in range(n)]
+    table = {"undlName": names}
+    table.update({field: [_reference(field)({"undlName": u})["result"] for u in names] for field in REFERENCE_ENDPOINTS.values()})
+    return table
+
+def _chainVol(body):
+
+    chain = body["data"]
+    frame = oqa.solve_chainImpliedVol(chain)
+    frame = frame.replace([np.inf, -np.inf], np.nan).astype(object).where(frame.notna(), None)
+    return {"undlName": chain.get("undlName"), "data": frame.to_dict(orient="records")}
+
+def _price(body, exerciseType):
+
+    calcWhat = body.get("calcWhat", ["NPV"])
+    params = {k: v for k, v in body.items() if k != "calcWhat"}
+    result = oqa.calc_AmericanLocal(params, calcWhat, "fast") if exerciseType == "American" else oqa.calc_EuropeanLocal(params, calcWhat)
+    return {k: float(np.asarray(v).ravel()[0]) for k, v in result.items()}
+
+def _unpackBatch(body):
+
+    columns, marketData = body["columns"], body["marketData"]
+    fields = [f for f in columns.keys() if f != "marketDataKey"]
+    return [api.mergeDict(marketData[key], {f: columns[f][i] for f in fields}) for i, key in enumerate(columns["marketDataKey"])]
+
+def _priceBatch(body, exerciseType):
+
+    calcWhat = body.get("calcWhat", ["NPV"])
+    rows = _unpackBatch(body)
+    result = oqa.calc_AmericanBatch(rows, calcWhat, "fast") if exerciseType == "American" else oqa.calc_EuropeanBatch(rows, calcWhat)
+    return {"results": {k: np.asarray(v).tolist() for k, v in result.items()}}
+
+def _impliedVol(rows, exerciseType):
+
+    cols = oqa.params_to_columns(rows)
+    price = [float(oqa._getParam(oqa.flatten_params(p), ["price", "NPV", "premium"], np.nan)) for p in rows]
+    solver = oqa.calc_AmericanImpliedVolArrays if exerciseType == "American" else oqa.calc_EuropeanImpliedVolArrays
+    result = solver(price, cols["spot"], cols["strike"], cols["tau"], cols["rate"], cols["repo"], cols["isCall"], cols["divTimes"], cols["divAmounts"])
+    return {"vol": [None if np.isnan(v) else float(v) for v in result["vol"]], "converged": result["converged"].tolist(), "iterations": result["iterations"].tolist()}
+
+def _volGrid(body):
+
+    surface = oqa.VolSurfaceSVI(mock_volSurfaceSVI(body["undlName"]))
+    vols = surface.vol_grid(body["strikes"], body["maturities"])
+    return {str(m): {str(k): float(v) for k, v in zip(body["strikes"], row)} for m, row in zip(body["maturities"], vols)}
+
+def _calendar(body):
+
+    return oqa.BusinessCalendar(HOLIDAYS.get(body.get("calendar"), []))
+
+def _listedMaturity(body):
+
+    # listed expiry closest to VALUE_DATE + whole months, earlier one on a tie
+    months = int(body["months"])
+    if months != float(body["months"]) or body["calendar_undlType"] not in LISTED_EXPIRIES.keys():
+        return {"error": "no listed expiries for {} {}M".format(body["calendar_undlType"], body["months"])}
+    d0 = oqa.to_date(VALUE_DATE)
+    target = date(d0.year + (d0.month - 1 + months) // 12, (d0.month - 1 + months) % 12 + 1, d0.day)
+    expiries = [oqa.to_date(d) for d in LISTED_EXPIRIES[body["calendar_undlType"]]]
+    return {"maturity": str(min(expiries, key=lambda d: abs((d - target).days)))}
+
+POST_ENDPOINTS = {"getSpot": lambda b: {b["undlName"]: mock_spot(b["undlName"])},
+                  "getSpotHistorical": lambda b: {b["undlName"]: mock_spot(b["undlName"])},
+                  "getFX": lambda b: {b["undlName"]: 1.0},
+                  "getExchangeDate": lambda b: {"result": VALUE_DATE + "T00:00:00"},
+                  "getYieldCurve": lambda b: mock_yieldCurve(b.get("ccy", "USD")),
+                  "getDividend": lambda b: mock_divCurve(b["undlName"]),
+                  "getRepo": lambda b: mock_repoCurve(b["undlName"]),
+                  "getVolSurfaceSVI": lambda b: mock_volSurfaceSVI(b["undlName"]),
+                  "getVol": lambda b: {"vol": float(oqa.VolSurfaceSVI(mock_volSurfaceSVI(b["undlName"])).vol(float(b["strike"]), b["maturity"]))},
+                  "getVolGrid": _volGrid,
+                  "getOptionChainVol": _chainVol,
+                  "getOptionChainRepo": lambda b: mock_repoCurve(b["data"].get("undlName") if isinstance(b["data"], dict) else None),
+                  "fitVolSurfaceSVI": lambda b: mock_volSurfaceSVI(b["volData"].get("undlName") if isinstance(b["volData"], dict) else None),
+                  "checkVolSurfaceArb": lambda b: {k: v for k, v in oqa.check_SVIArb(b["volSurfaceSVI"]).items() if k not in ("butterfly", "calendar")},
+                  "uploadVolSurfaceSVI": lambda b: {"result": "ok"},
+                  "uploadVSFBatchLog": lambda b: {"result": "ok"},
+                  "European": lambda b: _price(b, "European"),
+                  "American": lambda b: _price(b, "American"),
+                  "EuropeanBatch": lambda b: _priceBatch(b, "European"),
+                  "AmericanBatch": lambda b: _priceBatch(b, "American"),
+                  "EuropeanImpliedVol": lambda b: {k: v[0] for k, v in _impliedVol([b], "European").items()},
+                  "AmericanImpliedVol": lambda b: {k: v[0] for k, v in _impliedVol([b], "American").items()},
+                  "EuropeanImpliedVolBatch": lambda b: {"results": _impliedVol(_unpackBatch(b), "European")},
+                  "AmericanImpliedVolBatch": lambda b: {"results": _impliedVol(_unpackBatch(b), "American")},
+                  "getListedMaturity": _listedMaturity,
+                  "fetchUnderlyingDatabase": lambda b: _underlyingDatabase(),
+                  "netBusinessDays": lambda b: {"days": int(_calendar(b).net_businessDays(b["fromDate"], b["toDate"]))},
+                  "nextBusinessDay": lambda b: {"date": str(_calendar(b).next_businessDay(b["refDate"], int(b["dayShift"])))},
+                  "isHoliday": lambda b: {"isHoliday": bool(_calendar(b).is_holiday(b["refDate"]))},
+                  "calcForward": lambda b: {"forward": float(oqa.ForwardCurve(b["spotRef"], b["valueDate"], b["yieldCurve"], b["divCurve"], b["repoCurve"]).forward([b["maturity"]])[0])}}
+LATENCY_ONLY = {"getVol", "getVolGrid", "getOptionChainVol", "checkVolSurfaceArb", "European", "American", "EuropeanBatch", "AmericanBatch",
+                "EuropeanImpliedVol", "AmericanImpliedVol", "EuropeanImpliedVolBatch", "AmericanImpliedVolBatch", "netBusinessDays",
+                "nextBusinessDay", "isHoliday", "calcForward"}
+REFERENCE_ENDPOINTS = {"getRIC": "RIC", "getBBG": "BBG", "getOBB": "OBB", "getSymbol": "symbol", "getSystemName": "systemName",
+                       "getUndlType": "undlType", "getCalendar": "calendar", "getCCY": "CCY", "getDVDCCY": "DVDCCY",
+                       "getListedExerciseType": "listedExerciseType", "getExchange": "exchange"}
+POST_ENDPOINTS.update({endpoint: _reference(field) for endpoint, field in REFERENCE_ENDPOINTS.items()})
+
+GET_ENDPOINTS = {"getHolidayCalendar": lambda: HOLIDAYS,
+                 "getPayloadCodecs": lambda: {"codecs": [c for c, spec in api.PAYLOAD_CODECS.items() if spec["available"]],
+                                              "compression": [c for c, spec in api.PAYLOAD_COMPRESSION.items() if spec["available"]]},
+                 "getVSFBatchConfig": lambda: {"batchName": "mock", "undlNames": ["MOCK{:03d}.OQ".format(i) for i in range(10)]}}
+
+class MockHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+
+        pass
+
+    def _endpoint(self):
+
+        return self.path.split("api/v1/")[-1].split("?")[0]
+
+    def _reply(self, status, obj):
+
+        endpoint = self._endpoint()
+        latency = self.server.latency.get(endpoint, self.server.latency["default"])
+        time.sleep(max(latency * (1 + self.server.jitter * random.uniform(-1, 1)), 0.0))
+
+        data = api.json_dumps(obj)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if endpoint in LATENCY_ONLY:
+            self.send_header("X-Mock-Latency-Only", "1")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.requestCount += 1
+
+    def _streamSpot(self):
+
+        # server-sent events, one random-walk tick per underlying and field every tickInterval until the client disconnects
+        query = parse_qs(urlparse(self.path).query)
+        undlNames = [u for u in query.get("undlNames", [""])[0].split(",") if u]
+        fields = [f for f in query.get("fields", ["spot"])[0].split(",") if f]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.server.requestCount += 1
+
+        rng = np.random.default_rng(_seed(",".join(undlNames)))
+        levels = {u: mock_spot(u) for u in undlNames}
+        try:
+            self.wfile.write(b": connected\n\n")
+            while self.server.streaming:
+                for u in undlNames:
+                    levels[u] = round(levels[u] * float(np.exp(0.001 * rng.standard_normal())), 4)
+                    tick = {"undlName": u, "timestamp": time.time()}
+                    if "spot" in fields:
+                        tick["spot"] = levels[u]
+                    if "FX" in fields:
+                        tick["FX"] = 1.0
+                    self.wfile.write(b"data: " + api.json_dumps(tick) + b"\n\n")
+                self.wfile.flush()
+                time.sleep(self.server.tickInterval)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def do_GET(self):
+
+        endpoint = self._endpoint()
+        if endpoint == "streamSpot" and self.server.tickInterval is not None:
+            return self._streamSpot()
+        if endpoint not in GET_ENDPOINTS.keys():
+            return self._reply(404, {"error": "unknown endpoint " + endpoint})
+        self._reply(200, GET_ENDPOINTS[endpoint]())
+
+    def do_POST(self):
+
+        endpoint = self._endpoint()
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if endpoint not in POST_ENDPOINTS.keys():
+            return self._reply(404, {"error": "unknown endpoint " + endpoint})
+        try:
+            body = api.decode_payload(data, {"X-Payload-Codec": self.headers.get("X-Payload-Codec", "repr"),
+                                             "Content-Encoding": self.headers.get("Content-Encoding")}) if len(data) > 0 else {}
+            self._reply(200, POST_ENDPOINTS[endpoint](body))
+        except Exception as e:
+            self._reply(500, {"error": type(e).__name__ + ": " + str(e)})
+
+class MockServer:
+
+    # MockServer(latency={"default": 0.02}).start() -> base url usable as api_url; tickInterval=None disables api/v1/streamSpot
+    def __init__(self, host="127.0.0.1", port=0, latency=None, jitter=0.2, tickInterval=TICK_INTERVAL):
+
+        self.host = host
+        self.port = port
+        self.latency = oqa.mergeDict(MOCK_LATENCY, {} if latency is None else latency)
+        self.jitter = jitter
+        self.tickInterval = tickInterval
+        self._server = None
+        self._thread = None
+
+    def start(self):
+
+        self._server = ThreadingHTTPServer((self.host, self.port), MockHandler)
+        self._server.daemon_threads = True
+        self._server.latency = self.latency
+        self._server.jitter = self.jitter
+        self._server.requestCount = 0
+        self._server.tickInterval = self.tickInterval
+        self._server.streaming = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+
+        if self._server is not None:
+            self._server.streaming = False
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self):
+
+        return "http://{}:{}/".format(self.host, self._server.server_address[1])
+
+    @property
+    def requestCount(self):
+
+        return self._server.requestCount
+
+    def __enter__(self):
+
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+
+        self.stop()
+
+if __name__ == "__main__":
+
+    import sys
+    server = MockServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
+    print("mock api/v1 server on", server.start())
+    server._thread.join()
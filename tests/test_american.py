@@ -0,0 +1,90 @@
+import math
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+def crr_american(spot, strike, tau, rate, repo, vol, isCall, nSteps=2000):
+
+    # textbook Cox-Ross-Rubinstein tree, no dividends
+    dt = tau / nSteps
+    u = math.exp(vol * math.sqrt(dt))
+    d = 1 / u
+    p = (math.exp((rate - repo) * dt) - d) / (u - d)
+    disc = math.exp(-rate * dt)
+    omega = 1 if isCall else -1
+    s = spot * u ** np.arange(-nSteps, nSteps + 1, 2)
+    values = np.maximum(omega * (s - strike), 0.0)
+    for i in range(nSteps, 0, -1):
+        s = s[:-1] * u
+        values = np.maximum(disc * (p * values[1:] + (1 - p) * values[:-1]), omega * (s - strike))
+    return values[0]
+
+def bs_price(spot, strike, tau, rate, repo, vol, isCall):
+
+    N = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    d1 = (math.log(spot / strike) + (rate - repo + 0.5 * vol ** 2) * tau) / (vol * math.sqrt(tau))
+    d2 = d1 - vol * math.sqrt(tau)
+    omega = 1 if isCall else -1
+    return omega * (spot * math.exp(-repo * tau) * N(omega * d1) - strike * math.exp(-rate * tau) * N(omega * d2))
+
+@pytest.mark.parametrize("strike,tau,rate,repo,vol,isCall", [(100, 1.0, 0.05, 0.0, 0.2, False), (110, 0.5, 0.08, 0.0, 0.3, False),
+                                                            (90, 2.0, 0.03, 0.01, 0.25, False), (100, 1.0, 0.02, 0.06, 0.3, True)])
+def test_fd_matches_crr(strike, tau, rate, repo, vol, isCall):
+
+    fd = oqa.calc_AmericanFDArrays(100.0, strike, tau, vol, isCall, rate, repo, preset="accurate")["NPV"][0]
+    # grid and tree discretization errors are both a few 1e-3 at these sizes
+    assert fd == pytest.approx(crr_american(100.0, strike, tau, rate, repo, vol, isCall), abs=5e-3)
+
+def test_put_textbook_value():
+
+    # S = K = 100, T = 1, r = 5%, vol = 20% American put ~ 6.090
+    assert oqa.calc_AmericanFDArrays(100.0, 100.0, 1.0, 0.2, False, 0.05, preset="accurate")["NPV"][0] == pytest.approx(6.090, abs=2e-3)
+
+def test_call_without_dividends_is_european():
+
+    strike = np.array([80.0, 100.0, 125.0])
+    fd = oqa.calc_AmericanFDArrays(100.0, strike, 1.0, 0.25, True, 0.04, preset="accurate")["NPV"]
+    assert fd == pytest.approx([bs_price(100.0, k, 1.0, 0.04, 0.0, 0.25, True) for k in strike], abs=2e-3)
+
+def test_early_exercise_premium_and_dividend():
+
+    result = oqa.calc_AmericanFDArrays(100.0, [100.0, 100.0], 1.0, 0.2, [True, False], 0.05, 0.0, np.array([0.5]), np.array([5.0]))["NPV"]
+    european = oqa.calc_EuropeanArrays(100.0, 100.0, 1.0, 0.05, 0.0, 0.2, [True, False], np.array([0.5]), np.array([5.0]))["NPV"]
+    # a large dividend makes early exercise of the call worth something, the put is always worth at least the European
+    assert result[0] > european[0] + 0.05
+    assert result[1] > european[1]
+
+def test_greeks_match_bumped_prices():
+
+    base = dict(strike=95.0, tau=0.75, vol=0.3, isCall=False, rate=0.05, repo=0.0, preset="standard")
+    price = lambda spot=100.0, **bump: oqa.calc_AmericanFDArrays(spot, **{**base, **bump})["NPV"][0]
+    greeks = oqa.calc_AmericanFDArrays(100.0, calcWhat=["delta", "gamma", "vega", "rho"], **base)
+    assert greeks["delta"][0] == pytest.approx((price(101.0) - price(99.0)) / 2, abs=2e-3)
+    assert greeks["gamma"][0] == pytest.approx(price(101.0) - 2 * price() + price(99.0), abs=2e-3)
+    assert greeks["vega"][0] == pytest.approx(price(vol=0.31) - price(), abs=1e-10)
+    assert greeks["rho"][0] == pytest.approx(price(rate=0.06) - price(), abs=1e-10)
+
+def test_expired():
+
+    result = oqa.calc_AmericanFDArrays(100.0, [90.0, 110.0], 0.0, 0.2, [True, True], 0.05, calcWhat=["NPV", "delta", "gamma"])
+    assert result["NPV"] == pytest.approx([10.0, 0.0])
+    assert result["delta"] == pytest.approx([1.0, 0.0])
+    assert result["gamma"] == pytest.approx([0.0, 0.0])
+
+def test_batch_on_curves():
+
+    yieldCurve = {"yieldCurve": {"0.25": 0.02, "1.0": 0.04, "3.0": 0.05}}
+    flat = {"yieldCurve": {"0.25": 0.035, "1.0": 0.035, "3.0": 0.035}}
+    params = {"valueDate": "2026-01-02", "maturity": "2026-09-30", "spotRef": 100.0, "strike": 100.0, "optionType": "Call", "vol": 0.25, "repo": 0.0}
+    tau = oqa.year_fraction("2026-01-02", "2026-09-30")
+    rate = float(np.interp(tau, [0.25, 1.0, 3.0], [0.02, 0.04, 0.05]))
+
+    curve, flatCurve, flatRate = oqa.calc_AmericanBatch([{**params, "yieldCurve": yieldCurve}, {**params, "yieldCurve": flat}, {**params, "rate": 0.035}])["NPV"]
+    # only the maturity zero rate matters to a call without dividends
+    assert curve == pytest.approx(bs_price(100.0, 100.0, tau, rate, 0.0, 0.25, True), abs=5e-3)
+    assert flatCurve == pytest.approx(flatRate, abs=1e-10)
+
+    put = {**params, "optionType": "Put", "strike": 110.0, "yieldCurve": yieldCurve}
+    american = oqa.calc_AmericanBatch([put])["NPV"][0]
+    assert american > oqa.calc_EuropeanBatch([put])["NPV"][0]
+    assert american > 10.0
@@ -0,0 +1,81 @@
+import pickle
+from datetime import date, timedelta
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+HOLIDAYS = ["2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19", "2026-07-03", "2026-09-07",
+            "2026-11-26", "2026-12-25"]
+
+def is_business(d):
+
+    return d.weekday() < 5 and d.isoformat() not in HOLIDAYS
+
+def days(fromDate, toDate):
+
+    d = date.fromisoformat(fromDate)
+    while d <= date.fromisoformat(toDate):
+        yield d
+        d += timedelta(days=1)
+
+@pytest.fixture
+def calendar():
+
+    return oqa.BusinessCalendar(HOLIDAYS, name="TEST")
+
+def test_business_days_match_iteration(calendar):
+
+    reference = [d.isoformat() for d in days("2025-12-20", "2027-01-10") if is_business(d)]
+    assert list(calendar.business_days("2025-12-20", "2027-01-10").astype(str)) == reference
+    assert len([d for d in days("2026-01-01", "2026-12-31") if is_business(d)]) == 251
+
+def test_flags(calendar):
+
+    dates = [d.isoformat() for d in days("2026-06-15", "2026-07-06")]
+    assert list(calendar.is_businessDay(dates)) == [is_business(date.fromisoformat(d)) for d in dates]
+    assert list(calendar.is_holiday(["2026-06-19", "2026-06-20", "2026-06-22"])) == [True, True, False]
+
+@pytest.mark.parametrize("fromDate,toDate", [("2026-01-01", "2026-12-31"), ("2026-06-18", "2026-06-22"), ("2026-03-02", "2026-03-02"),
+                                             ("2026-07-10", "2026-07-01")])
+def test_net_business_days(calendar, fromDate, toDate):
+
+    # counts [fromDate, toDate), negative when the dates are reversed
+    lo, hi = sorted([fromDate, toDate])
+    count = len([d for d in days(lo, hi) if is_business(d) and d.isoformat() != hi])
+    assert calendar.net_businessDays(fromDate, toDate) == (count if fromDate <= toDate else -count)
+
+def test_rolls(calendar):
+
+    # Juneteenth Friday: forward roll to Monday, one business day after Thursday is Monday
+    assert str(calendar.next_businessDay("2026-06-19", 0)) == "2026-06-22"
+    assert str(calendar.next_businessDay("2026-06-18", 1)) == "2026-06-22"
+    assert str(calendar.next_businessDay("2026-06-18", 0)) == "2026-06-18"
+    # a shift from a holiday counts from the previous business day; negative shifts go back
+    assert str(calendar.next_businessDay("2026-07-03", 1)) == "2026-07-06"
+    assert str(calendar.next_businessDay("2026-01-20", -1)) == "2026-01-16"
+
+    refDates = [d.isoformat() for d in days("2026-11-20", "2026-12-31")]
+    rolled = calendar.next_businessDay(refDates, 2).astype(str)
+    for refDate, result in zip(refDates, rolled):
+        d = date.fromisoformat(refDate)
+        for i in range(2):
+            d += timedelta(days=1)
+            while not is_business(d):
+                d += timedelta(days=1)
+        assert result == d.isoformat()
+
+def test_weekmask():
+
+    # a six-day week with no holidays
+    calendar = oqa.BusinessCalendar([], weekmask="1111110")
+    assert calendar.net_businessDays("2026-01-05", "2026-01-19") == 12
+
+def test_immutable_and_pickles(calendar):
+
+    with pytest.raises(AttributeError):
+        calendar.weekmask = "1111111"
+    with pytest.raises(ValueError):
+        calendar.holidays[0] = np.datetime64("2026-01-02")
+    copy = pickle.loads(pickle.dumps(calendar))
+    assert copy.name == "TEST"
+    assert copy.net_businessDays("2026-01-01", "2026-12-31") == calendar.net_businessDays("2026-01-01", "2026-12-31")
@@ -0,0 +1,69 @@
+import math
+from datetime import date
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+VALUE_DATE = "2026-01-02"
+YIELD = {"currency": "USD", "yieldCurve": {"0.5": 0.03, "0.25": 0.02, "1.0": 0.035, "2.0": 0.04}}
+DIVIDENDS = {"undlName": "TEST.N", "Schedule": {"2025-12-15": {"value": 9.0, "type": "Cash"}, "2026-03-13": {"value": 0.5, "type": "Cash"},
+                                                "2026-09-11": {"value": 0.75, "type": "Cash"}}}
+REPO = {"undlName": "TEST.N", "Schedule": {"2027-01-02": 0.004, "2028-01-02": 0.006}}
+
+def tau(d):
+
+    return (date.fromisoformat(d) - date.fromisoformat(VALUE_DATE)).days / 365
+
+def log_df(t):
+
+    # log discount factor linear in t between pillars, flat zero rate outside
+    pillars = [(0.25, 0.02), (0.5, 0.03), (1.0, 0.035), (2.0, 0.04)]
+    if t <= pillars[0][0]:
+        return -pillars[0][1] * t
+    if t >= pillars[-1][0]:
+        return -pillars[-1][1] * t
+    for (t1, r1), (t2, r2) in zip(pillars[:-1], pillars[1:]):
+        if t1 <= t <= t2:
+            return -r1 * t1 + (t - t1) / (t2 - t1) * (-r2 * t2 + r1 * t1)
+
+def test_discount_on_and_between_pillars():
+
+    curve = oqa.YieldCurve(YIELD)
+    assert curve.discount([0.25, 0.5, 1.0, 2.0]) == pytest.approx([math.exp(-0.02 * 0.25), math.exp(-0.03 * 0.5), math.exp(-0.035), math.exp(-0.08)], rel=1e-14)
+    for t in [0.1, 0.3, 0.75, 1.6, 3.0]:
+        assert float(curve.discount(t)) == pytest.approx(math.exp(log_df(t)), rel=1e-14)
+        assert float(curve.zero_rate(t)) == pytest.approx(-log_df(t) / t, rel=1e-12)
+    assert curve.currency == "USD"
+
+def test_repo_curve():
+
+    curve = oqa.RepoCurve(REPO, VALUE_DATE)
+    t1, t2 = tau("2027-01-02"), tau("2028-01-02")
+    assert curve.rate([0.5, t1, 0.5 * (t1 + t2), 5.0]) == pytest.approx([0.004, 0.004, 0.005, 0.006], rel=1e-12)
+    assert float(curve.growth(1.5)) == pytest.approx(math.exp(-0.005 * 1.5), rel=1e-12)
+
+def test_dividends_before_value_date_dropped():
+
+    divTimes, divAmounts = oqa.div_schedule(DIVIDENDS, VALUE_DATE)
+    assert list(divTimes) == pytest.approx([tau("2026-03-13"), tau("2026-09-11")])
+    assert list(divAmounts) == [0.5, 0.75]
+
+def test_forward():
+
+    curve = oqa.ForwardCurve(100.0, VALUE_DATE, YIELD, DIVIDENDS, REPO)
+    for maturity in ["2026-02-20", "2026-03-13", "2026-06-19", "2026-12-18", "2027-06-18"]:
+        T = tau(maturity)
+        pvDiv = sum(a * math.exp(log_df(tau(d))) for d, a in [("2026-03-13", 0.5), ("2026-09-11", 0.75)] if tau(d) <= T)
+        repo = float(np.interp(T, [tau("2027-01-02"), tau("2028-01-02")], [0.004, 0.006]))
+        forward = (100.0 - pvDiv) / math.exp(log_df(T)) * math.exp(-repo * T)
+        assert float(curve.forward([maturity])[0]) == pytest.approx(forward, rel=1e-13)
+
+    data = curve.market_data(["2026-12-18"])
+    T = tau("2026-12-18")
+    assert data["rate"][0] == pytest.approx(-log_df(T) / T, rel=1e-12)
+    assert data["pvDiv"][0] == pytest.approx(0.5 * math.exp(log_df(tau("2026-03-13"))) + 0.75 * math.exp(log_df(tau("2026-09-11"))), rel=1e-13)
+
+def test_forward_without_dividends_or_repo():
+
+    curve = oqa.ForwardCurve(100.0, VALUE_DATE, YIELD)
+    assert float(curve.forward([1.0])[0]) == pytest.approx(100.0 * math.exp(0.035), rel=1e-13)
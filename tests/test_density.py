@@ -0,0 +1,64 @@
+import math
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+VALUE_DATE = "2026-01-02"
+
+def surface_dict(smile=True):
+
+    # per maturity: (tau, vol, forward as a ratio of spot); a flat smile is lognormal
+    slices = {}
+    for maturity, (tau, vol, forward) in {"2026-03-20": (0.2137, 0.3, 1.004), "2026-06-18": (0.4603, 0.28, 1.01), "2026-12-18": (0.9589, 0.26, 1.021)}.items():
+        if smile:
+            slices[maturity] = {"vol": vol, "skew": -0.1, "pWing": 0.4, "cWing": 0.2, "minVol": 0.9 * vol, "tau": tau, "forward": forward}
+        else:
+            slices[maturity] = {"vol": vol, "skew": 0.0, "pWing": 0.0, "cWing": 0.0, "minVol": vol, "tau": tau, "forward": forward}
+    return {"undlName": "TEST.N", "anchor": 100.0, "anchorDate": VALUE_DATE, "SVI-JW": slices}
+
+def lognormal_pdf(x, forward, vol, tau):
+
+    s = vol * math.sqrt(tau)
+    return np.exp(-(np.log(x / forward) + 0.5 * s ** 2) ** 2 / (2 * s ** 2)) / (x * s * math.sqrt(2 * math.pi))
+
+def test_flat_smile_is_lognormal():
+
+    result = oqa.calc_impliedDistributionSVI(surface_dict(smile=False), step=0.001)
+    x = result["grossReturn"]
+    for i, (tau, vol, forward) in enumerate([(0.2137, 0.3, 1.004), (0.4603, 0.28, 1.01), (0.9589, 0.26, 1.021)]):
+        assert result["density"][i] == pytest.approx(lognormal_pdf(x, forward, vol, tau), abs=2e-3)
+        assert result["moments"]["mean"][i] == pytest.approx(forward, rel=1e-4)
+        assert result["moments"]["variance"][i] == pytest.approx(forward ** 2 * (math.exp(vol ** 2 * tau) - 1), rel=1e-3)
+
+def test_smile_distribution():
+
+    result = oqa.calc_impliedDistributionSVI(surface_dict())
+    # a probability density whose mean is the forward, the put wing skews it left of the lognormal at the same ATM vol
+    assert result["moments"]["mass"] == pytest.approx([1.0, 1.0, 1.0], abs=1e-3)
+    assert result["moments"]["mean"] == pytest.approx(result["forward"], rel=1e-3)
+    s2 = np.array([0.3 ** 2 * 0.2137, 0.28 ** 2 * 0.4603, 0.26 ** 2 * 0.9589])
+    assert (result["moments"]["skewness"] < (np.exp(s2) + 2) * np.sqrt(np.exp(s2) - 1)).all()
+    assert result["minDensity"] > -1e-8
+    assert np.all(np.diff(result["cdf"], axis=1) >= -1e-12)
+    assert result["binProbability"].sum(axis=1) == pytest.approx([1.0, 1.0, 1.0], abs=1e-3)
+    assert result["binEdges"][0] == pytest.approx(-1.0)
+
+def test_cdf_prices_digitals():
+
+    # P(S_T > K) = -dC/dK / DF, checked against the undiscounted call on the same smile
+    surface = oqa.VolSurfaceSVI(surface_dict())
+    result = oqa.calc_impliedDistributionSVI(surface)
+    tau, forward = result["tau"][2], result["forward"][2]
+    strike, h = 1.05, 1e-4
+    vol = surface.vol_smile([strike - h, strike + h], tau, spotRef=1.0)
+    call = oqa.calc_EuropeanArrays(1.0, [strike - h, strike + h], tau, 0.0, -math.log(forward) / tau, vol, True)["NPV"]
+    digital = (call[0] - call[1]) / (2 * h)
+    assert 1 - np.interp(strike, result["grossReturn"], result["cdf"][2]) == pytest.approx(digital, abs=2e-4)
+
+def test_results_read_only_and_cached():
+
+    result = oqa.calc_impliedDistributionSVI(surface_dict(), maturities=["2026-06-18"])
+    assert result["maturities"] == ("2026-06-18",)
+    with pytest.raises(ValueError):
+        result["density"][0, 0] = 0.0
+    assert oqa.calc_impliedDistributionSVI(surface_dict(), maturities=["2026-06-18"]) is result
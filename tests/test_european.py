@@ -0,0 +1,52 @@
+import math
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+# Black-Scholes written out with math.erf, independent of the library's vectorized pricer
+def bs_reference(spot, strike, tau, rate, repo, vol, isCall):
+
+    N = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    d1 = (math.log(spot / strike) + (rate - repo + 0.5 * vol ** 2) * tau) / (vol * math.sqrt(tau))
+    d2 = d1 - vol * math.sqrt(tau)
+    if isCall:
+        return spot * math.exp(-repo * tau) * N(d1) - strike * math.exp(-rate * tau) * N(d2), math.exp(-repo * tau) * N(d1)
+    return strike * math.exp(-rate * tau) * N(-d2) - spot * math.exp(-repo * tau) * N(-d1), -math.exp(-repo * tau) * N(-d1)
+
+def test_textbook_values():
+
+    # Hull, S = K = 100, T = 1, r = 5%, vol = 20%: call 10.4506, put 5.5735
+    result = oqa.calc_EuropeanArrays([100, 100], 100, 1.0, 0.05, 0.0, 0.2, [True, False], calcWhat=["NPV", "delta"])
+    assert result["NPV"] == pytest.approx([10.4506, 5.5735], abs=1e-4)
+    assert result["delta"] == pytest.approx([0.6368, -0.3632], abs=1e-4)
+
+@pytest.mark.parametrize("spot,strike,tau,rate,repo,vol,isCall", [(100, 80, 0.25, 0.03, 0.01, 0.35, True), (100, 120, 2.0, 0.04, 0.02, 0.15, False),
+                                                                 (50, 50, 0.01, 0.0, 0.0, 0.6, True), (250, 200, 5.0, 0.06, -0.01, 0.25, False)])
+def test_closed_form(spot, strike, tau, rate, repo, vol, isCall):
+
+    npv, delta = bs_reference(spot, strike, tau, rate, repo, vol, isCall)
+    result = oqa.calc_EuropeanArrays(spot, strike, tau, rate, repo, vol, isCall, calcWhat=["NPV", "delta"])
+    assert result["NPV"][0] == pytest.approx(npv, rel=1e-10, abs=1e-12)
+    assert result["delta"][0] == pytest.approx(delta, rel=1e-10, abs=1e-12)
+
+def test_put_call_parity_with_cash_dividends():
+
+    # C - P = (S - PV(divs)) e^{-q T} - K e^{-r T}, dividends escrowed at the risk-free rate
+    spot, strike, tau, rate, repo = 100.0, 95.0, 1.5, 0.04, 0.01
+    divTimes, divAmounts = np.array([0.3, 0.8, 1.3, 1.8]), np.array([1.0, 1.2, 1.2, 1.5])
+    result = oqa.calc_EuropeanArrays(spot, strike, tau, rate, repo, 0.3, [True, False], divTimes, divAmounts)
+    pvDiv = sum(a * math.exp(-rate * t) for t, a in zip(divTimes, divAmounts) if t <= tau)
+    parity = (spot - pvDiv) * math.exp(-repo * tau) - strike * math.exp(-rate * tau)
+    assert result["NPV"][0] - result["NPV"][1] == pytest.approx(parity, abs=1e-10)
+
+def test_greeks_match_finite_differences():
+
+    spot, strike, tau, rate, repo, vol = 100.0, 105.0, 0.75, 0.03, 0.01, 0.25
+    greeks = oqa.calc_EuropeanArrays(spot, strike, tau, rate, repo, vol, True, calcWhat=["gamma", "vega", "theta", "rho"])
+    price = lambda **bump: bs_reference(**{**dict(spot=spot, strike=strike, tau=tau, rate=rate, repo=repo, vol=vol, isCall=True), **bump})[0]
+    h = 0.01
+    assert greeks["gamma"][0] == pytest.approx((price(spot=spot + h) - 2 * price() + price(spot=spot - h)) / h ** 2, rel=1e-5)
+    # vega per vol point, theta per calendar day, rho per 1% rate move
+    assert greeks["vega"][0] == pytest.approx((price(vol=vol + 1e-5) - price(vol=vol - 1e-5)) / 2e-5 * 0.01, rel=1e-6)
+    assert greeks["theta"][0] == pytest.approx(price(tau=tau - 1 / 365) - price(), rel=1e-10)
+    assert greeks["rho"][0] == pytest.approx(price(rate=rate + 0.01) - price(), rel=1e-10)
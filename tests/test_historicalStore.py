@@ -0,0 +1,84 @@
+import pytest
+import OptionQuantLibClientAPI as api
+
+VALUES = {"yieldCurve": {"currency": "USD", "yieldCurve": {"0.25": 0.021, "1.0": 0.034, "5.0": 0.041}},
+          "optionChain": {"valueDate": "2025-06-02", "spotRef": 101.5, "data": [{"strike": 95.0, "optionType": "Put", "mid": 1.25},
+                                                                               {"strike": 105.0, "optionType": "Call", "mid": 2.5, "volume": 12}]},
+          "volSurfaceSVI": {"valueDate": "2025-06-02", "SVI-JW": {"2025-09-19": {"vol": 0.25, "skew": -0.1, "minVol": 0.2},
+                                                                  "2025-12-19": {"vol": 0.24, "skew": -0.08, "minVol": 0.19}}},
+          "spotHist": {"undlName": "TEST.N", "close": 101.5},
+          "mixed": {"valueDate": "2025-06-02", "rows": [{"strike": 95.0}, {"strike": "ATM"}]}}
+
+@pytest.mark.parametrize("dataType", list(VALUES.keys()))
+def test_round_trip_through_disk(tmp_path, dataType):
+
+    store = api.HistoricalStore(str(tmp_path))
+    store.put(dataType, "TEST.N", "2025-06-02", VALUES[dataType])
+    assert store.get(dataType, "TEST.N", "2025-06-02") == (True, VALUES[dataType])
+    store.flush()
+
+    reopened = api.HistoricalStore(str(tmp_path))
+    assert reopened.get(dataType, "TEST.N", "2025-06-02") == (True, VALUES[dataType])
+    assert reopened.get(dataType, "TEST.N", "2025-06-03") == (False, None)
+    assert reopened.dates(dataType, "TEST.N") == ["2025-06-02"]
+
+def test_queries_kept_apart(tmp_path):
+
+    store = api.HistoricalStore(str(tmp_path))
+    store.put("vol", "TEST.N", "2025-06-02", {"vol": 0.2}, "['2025-09-19', 95.0]")
+    store.put("vol", "TEST.N", "2025-06-02", {"vol": 0.3}, "['2025-09-19', 105.0]")
+    store.flush()
+
+    reopened = api.HistoricalStore(str(tmp_path))
+    assert reopened.get("vol", "TEST.N", "2025-06-02", "['2025-09-19', 95.0]") == (True, {"vol": 0.2})
+    assert reopened.get("vol", "TEST.N", "2025-06-02", "['2025-09-19', 105.0]") == (True, {"vol": 0.3})
+    assert reopened.get("vol", "TEST.N", "2025-06-02")[0] is False
+
+def test_lru_bound_flushes_evicted_values(tmp_path):
+
+    store = api.HistoricalStore(str(tmp_path), autoFlush=100, maxValues=3)
+    dates = ["2025-06-%02d" % d for d in range(2, 9)]
+    for i, d in enumerate(dates):
+        store.put("spotHist", "TEST.N", d, {"close": 100.0 + i})
+        assert len(store._values) <= 3
+
+    # evicted values were written before they were dropped, the rest still wait for flush
+    assert store.dates("spotHist", "TEST.N") == dates
+    store.flush()
+    reopened = api.HistoricalStore(str(tmp_path), maxValues=3)
+    assert [reopened.get("spotHist", "TEST.N", d)[1]["close"] for d in dates] == [100.0 + i for i in range(len(dates))]
+
+def test_decorator_stores_only_before_cutoff(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(api, "historicalStore", api.HistoricalStore(str(tmp_path)))
+    monkeypatch.setattr(api, "store_cutoff", lambda undlName=None: "2025-06-03")
+    calls = []
+
+    @api.historical_store("spotHist", "undlName", "dateRef")
+    def get_close(undlName, dateRef=None):
+        calls.append(dateRef)
+        return {"error": "no data"} if dateRef == "2025-06-01" else {"close": float(len(calls))}
+
+    # historical date: fetched once, then served from the store
+    assert get_close("TEST.N", "2025-06-02") == {"close": 1.0}
+    assert get_close("TEST.N", "2025-06-02") == {"close": 1.0}
+    # on / after the cutoff, live and error values are never stored
+    assert get_close("TEST.N", "2025-06-03") == {"close": 2.0}
+    assert get_close("TEST.N", "2025-06-03") == {"close": 3.0}
+    assert get_close("TEST.N") == {"close": 4.0}
+    get_close("TEST.N", "2025-06-01")
+    get_close("TEST.N", "2025-06-01")
+    assert calls == ["2025-06-02", "2025-06-03", "2025-06-03", None, "2025-06-01", "2025-06-01"]
+    assert api.historicalStore.dates("spotHist", "TEST.N") == ["2025-06-02"]
+
+def test_unknown_cutoff_stores_nothing(tmp_path, monkeypatch):
+
+    monkeypatch.setattr(api, "historicalStore", api.HistoricalStore(str(tmp_path)))
+    monkeypatch.setattr(api, "store_cutoff", lambda undlName=None: None)
+
+    @api.historical_store("spotHist", "undlName", "dateRef")
+    def get_close(undlName, dateRef=None):
+        return {"close": 1.0}
+
+    get_close("TEST.N", "2020-01-02")
+    assert api.historicalStore.dates("spotHist", "TEST.N") == []
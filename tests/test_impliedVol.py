@@ -0,0 +1,66 @@
+import math
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+def bs_price(spot, strike, tau, rate, repo, vol, isCall):
+
+    N = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+    d1 = (math.log(spot / strike) + (rate - repo + 0.5 * vol ** 2) * tau) / (vol * math.sqrt(tau))
+    d2 = d1 - vol * math.sqrt(tau)
+    omega = 1 if isCall else -1
+    return omega * (spot * math.exp(-repo * tau) * N(omega * d1) - strike * math.exp(-rate * tau) * N(omega * d2))
+
+def test_european_round_trip():
+
+    cases = [(100, 100, 1.0, 0.05, 0.0, 0.2, True), (100, 60, 0.1, 0.02, 0.01, 0.8, False), (100, 140, 2.0, 0.03, 0.0, 0.35, True),
+             (100, 90, 0.5, 0.0, 0.02, 0.12, False), (3000, 3300, 0.25, 0.045, 0.0, 0.55, True), (100, 100, 5.0, 0.06, 0.03, 1.5, False)]
+    spot, strike, tau, rate, repo, vol, isCall = [np.array(c) for c in zip(*cases)]
+    price = [bs_price(*c) for c in cases]
+
+    result = oqa.calc_EuropeanImpliedVolArrays(price, spot, strike, tau, rate, repo, isCall)
+    assert result["converged"].all()
+    assert result["vol"] == pytest.approx(vol, abs=1e-7)
+
+def test_european_round_trip_with_dividends():
+
+    divTimes, divAmounts = np.array([0.2, 0.7]), np.array([1.5, 1.5])
+    vol = np.array([0.15, 0.25, 0.45])
+    price = oqa.calc_EuropeanArrays(100, [90, 100, 115], 1.0, 0.04, 0.0, vol, [False, True, True], divTimes, divAmounts)["NPV"]
+
+    result = oqa.calc_EuropeanImpliedVolArrays(price, 100, [90, 100, 115], 1.0, 0.04, 0.0, [False, True, True], divTimes, divAmounts)
+    assert result["vol"] == pytest.approx(vol, abs=1e-7)
+
+def test_european_outside_bounds_not_converged():
+
+    # below intrinsic, above the forward, and expired
+    result = oqa.calc_EuropeanImpliedVolArrays([5.0, 120.0, 1.0], 100, [90, 100, 100], [1.0, 1.0, 0.0], 0.0, 0.0, [True, True, True])
+    assert not result["converged"].any()
+    assert np.isnan(result["vol"]).all()
+
+def test_american_round_trip():
+
+    strike = np.array([80.0, 100.0, 120.0, 100.0])
+    isCall = np.array([False, False, False, True])
+    vol = np.array([0.3, 0.25, 0.2, 0.4])
+    divTimes, divAmounts = np.array([0.4]), np.array([2.0])
+    price = oqa.calc_AmericanTreeArrays(100, strike, 1.0, 0.05, 0.0, vol, isCall, divTimes, divAmounts)
+
+    result = oqa.calc_AmericanImpliedVolArrays(price, 100, strike, 1.0, 0.05, 0.0, isCall, divTimes, divAmounts)
+    assert result["converged"].all()
+    assert result["vol"] == pytest.approx(vol, abs=1e-6)
+
+def test_american_put_vol_below_european():
+
+    # the early exercise premium is attributed to vol by a European solver
+    price = oqa.calc_AmericanTreeArrays(100, 110, 1.0, 0.08, 0.0, 0.25, False)
+    american = oqa.calc_AmericanImpliedVolArrays(price, 100, 110, 1.0, 0.08, 0.0, False)["vol"][0]
+    european = oqa.calc_EuropeanImpliedVolArrays(price, 100, 110, 1.0, 0.08, 0.0, False)["vol"][0]
+    assert american == pytest.approx(0.25, abs=1e-6)
+    assert european > american
+
+def test_tree_low_vol_is_deterministic():
+
+    # near-zero vol the put is worth its best deterministic exercise, here immediate exercise at 120 - 100
+    price = oqa.calc_AmericanTreeArrays(100, 120, 1.0, 0.05, 0.0, [1e-4, 1e-2], False, np.array([0.4]), np.array([2.0]))
+    assert price == pytest.approx([20.0, 20.0], abs=1e-9)
@@ -0,0 +1,83 @@
+import calendar as cal
+from datetime import date, timedelta
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+HOLIDAYS = ["2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19", "2026-07-03", "2026-09-07",
+            "2026-11-26", "2026-12-25"]
+RULE = {"expiryDay": "3FRI", "monthly": 6, "quarterly": 6, "quarterMonths": [3, 6, 9, 12], "yearly": 3, "yearlyMonths": [12],
+        "weekly": 4, "roll": "preceding"}
+
+@pytest.fixture
+def expiries():
+
+    return oqa.ExpiryCalendar(RULE, oqa.BusinessCalendar(HOLIDAYS), startDate="2026-01-02", years=5, name="TEST")
+
+def third_friday(year, month):
+
+    first = date(year, month, 1)
+    return first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+
+def test_monthly_table_is_third_friday(expiries):
+
+    reference = []
+    for year in range(2026, 2031):
+        for month in range(1, 13):
+            d = third_friday(year, month)
+            while d.weekday() >= 5 or d.isoformat() in HOLIDAYS:
+                d -= timedelta(days=1)
+            reference.append(d.isoformat())
+    monthly = expiries.tables["monthly"].astype(str)
+    assert [d for d in monthly if "2026" <= d < "2031"] == reference
+    # Juneteenth 2026 is the third Friday of June
+    assert "2026-06-18" in monthly and "2026-06-19" not in monthly
+
+def test_listed_set(expiries):
+
+    # 4 weeklies (Fridays that are not a monthly), 6 monthlies, quarterlies to Jun 2027, Dec yearlies to 2028
+    listed = ["2026-01-02", "2026-01-09", "2026-01-16", "2026-01-23", "2026-01-30", "2026-02-20", "2026-03-20", "2026-04-17", "2026-05-15",
+              "2026-06-18", "2026-09-18", "2026-12-18", "2027-03-19", "2027-06-18", "2027-12-17", "2028-12-15"]
+    assert list(expiries.listed("2026-01-02").astype(str)) == listed
+    assert list(expiries.is_listed("2026-01-02", ["2026-06-18", "2026-06-19", "2026-02-13"])) == [True, False, False]
+    # a day later the 2026-01-02 weekly has expired and the 2026-02-06 weekly comes in
+    later = list(expiries.listed("2026-01-03").astype(str))
+    assert "2026-01-02" not in later and "2026-02-06" in later and len(later) == len(listed)
+
+def test_last_thursday_following():
+
+    rule = dict(RULE, expiryDay="LASTTHU", roll="following", weekly=0)
+    expiries = oqa.ExpiryCalendar(rule, oqa.BusinessCalendar(["2026-11-26"]), startDate="2026-01-02", years=2)
+    monthly = expiries.tables["monthly"].astype(str)
+    for year, month in [(2026, 1), (2026, 4), (2026, 12), (2027, 2)]:
+        last = date(year, month, cal.monthrange(year, month)[1])
+        assert (last - timedelta(days=(last.weekday() - 3) % 7)).isoformat() in monthly
+    # Thanksgiving is the last Thursday of November 2026
+    assert "2026-11-27" in monthly and "2026-11-26" not in monthly
+
+def test_nearest(expiries):
+
+    # 3M from 2026-01-02 is 2026-04-02, between 2026-03-20 (13 days) and 2026-04-17 (15 days)
+    assert str(expiries.nearest("2026-01-02", "3M")[0]) == "2026-03-20"
+    assert str(expiries.nearest("2026-01-02", "3M", mode="after")[0]) == "2026-04-17"
+    assert list(expiries.nearest("2026-01-02", ["6M", "1Y"]).astype(str)) == ["2026-06-18", "2026-12-18"]
+    assert list(expiries.nearest("2026-01-02", targetDates=["2026-06-18", "2026-08-01"], mode="before").astype(str)) == ["2026-06-18", "2026-06-18"]
+    # past the last listed expiry
+    assert str(expiries.nearest("2026-01-02", "10Y")[0]) == "2028-12-15"
+
+@pytest.mark.parametrize("change", [{"roll": None}, {"settlement": "AM"}, {"expiryDay": "5FRI"}, {"expiryDay": "3XYZ"}, {"weekly": True},
+                                    {"monthly": -1}, {"monthly": 2.0}, {"quarterMonths": [3, 13]}, {"roll": "modifiedFollowing"}])
+def test_strict_rule(change):
+
+    rule = {k: v for k, v in dict(RULE, **change).items() if v is not None}
+    with pytest.raises(ValueError):
+        oqa.listed_rule(rule)
+    with pytest.raises(ValueError):
+        oqa.ExpiryCalendar(rule, startDate="2026-01-02")
+
+def test_table_bounds(expiries):
+
+    with pytest.raises(ValueError):
+        expiries.listed("2025-06-01")
+    with pytest.raises(ValueError):
+        expiries.listed("2030-06-01")
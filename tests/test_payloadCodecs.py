@@ -0,0 +1,42 @@
+import itertools
+import pytest
+import OptionQuantLibClientAPI as api
+
+CODECS = [c for c, v in api.PAYLOAD_CODECS.items() if v["available"]]
+COMPRESSION = [None] + [c for c, v in api.PAYLOAD_COMPRESSION.items() if v["available"]]
+
+def chain_body():
+
+    records = [{"maturity": "2026-%02d-18" % (1 + i % 12), "strike": 50.0 + 0.5 * i, "optionType": "Call" if i % 2 else "Put",
+                "bid": 1.25 + 0.01 * i, "ask": 1.5 + 0.01 * i, "mid": 1.375 + 0.01 * i} for i in range(400)]
+    return {"undlName": "TEST.N", "calcWhat": ["NPV", "delta"], "optionChain": {"valueDate": "2026-01-02", "spotRef": 101.25, "data": records}}
+
+@pytest.mark.parametrize("codec,compression", list(itertools.product(CODECS, COMPRESSION)))
+def test_round_trip(monkeypatch, codec, compression):
+
+    monkeypatch.setitem(api.payloadConfig, "minCompressSize", 0)
+    body = chain_body()
+    data, headers = api.encode_payload(body, ["optionChain"], codec, compression, tableField="optionChain")
+
+    assert headers["X-Payload-Codec"] == codec
+    assert headers.get("Content-Encoding") == compression
+    assert api.decode_payload(data, headers) == body
+
+def test_small_payload_not_compressed():
+
+    data, headers = api.encode_payload({"undlName": "TEST.N"}, [], "json", "gzip")
+    assert "Content-Encoding" not in headers
+    assert api.decode_payload(data, headers) == {"undlName": "TEST.N"}
+
+def test_arrow_without_table_falls_back_to_json():
+
+    data, headers = api.encode_payload({"undlName": "TEST.N", "strikes": [1.0, 2.0]}, [], "arrow")
+    assert headers["X-Payload-Codec"] == "json"
+    assert api.decode_payload(data, headers) == {"undlName": "TEST.N", "strikes": [1.0, 2.0]}
+
+def test_repr_matches_legacy_body():
+
+    # the repr codec is the str() body older servers literal_eval
+    body = chain_body()
+    data, headers = api.encode_payload(body, ["optionChain"], "repr")
+    assert api.json_loads(data) == {"undlName": "TEST.N", "calcWhat": ["NPV", "delta"], "optionChain": str(body["optionChain"])}
@@ -0,0 +1,93 @@
+import math
+import pickle
+import numpy as np
+import pytest
+import OptionQuantLibAnalytics as oqa
+
+VALUE_DATE = "2026-01-02"
+# hand-picked raw SVI slices: maturity -> (a, b, rho, m, sigma), forward as a ratio of spot
+RAW = {"2026-03-20": (0.004, 0.06, -0.5, 0.02, 0.08), "2026-06-18": (0.012, 0.08, -0.45, 0.03, 0.12), "2026-12-18": (0.028, 0.1, -0.4, 0.05, 0.18)}
+FORWARD = {"2026-03-20": 1.004, "2026-06-18": 1.01, "2026-12-18": 1.021}
+
+def raw_svi(k, a, b, rho, m, sigma):
+
+    return a + b * (rho * (k - m) + math.sqrt((k - m) ** 2 + sigma ** 2))
+
+def surface_dict():
+
+    slices = {}
+    for maturity, (a, b, rho, m, sigma) in RAW.items():
+        tau = oqa.year_fraction(VALUE_DATE, maturity)
+        jw = oqa.SVI_to_SVIJW({"a": a, "b": b, "rho": rho, "m": m, "sigma": sigma, "tau": tau, "forward": FORWARD[maturity]})
+        slices[maturity] = {key: float(v[0]) for key, v in jw.items()}
+    return {"undlName": "TEST.N", "anchor": 100.0, "anchorDate": VALUE_DATE, "SVI-JW": slices}
+
+def test_jw_definitions():
+
+    # ATM vol and minimum vol of the raw smile, found on a fine grid
+    grid = np.linspace(-1, 1, 20001)
+    for maturity, raw in RAW.items():
+        tau = oqa.year_fraction(VALUE_DATE, maturity)
+        jw = surface_dict()["SVI-JW"][maturity]
+        assert jw["vol"] == pytest.approx(math.sqrt(raw_svi(0.0, *raw) / tau), rel=1e-12)
+        assert jw["minVol"] == pytest.approx(math.sqrt(min(raw_svi(k, *raw) for k in grid) / tau), rel=1e-4)
+        assert jw["minVol"] <= jw["vol"]
+
+def test_jw_round_trip():
+
+    back = oqa.SVIJW_to_SVI(list(surface_dict()["SVI-JW"].values()))
+    for key, i in zip(["a", "b", "rho", "m", "sigma"], range(5)):
+        assert back[key] == pytest.approx([raw[i] for raw in RAW.values()], rel=1e-9, abs=1e-12)
+
+def test_vol_on_slices():
+
+    surface = oqa.VolSurfaceSVI(surface_dict())
+    for maturity, raw in RAW.items():
+        tau = oqa.year_fraction(VALUE_DATE, maturity)
+        for strike in [70.0, 95.0, 100.0, 110.0, 140.0]:
+            k = math.log(strike / (100.0 * FORWARD[maturity]))
+            assert surface.vol(strike, maturity) == pytest.approx(math.sqrt(raw_svi(k, *raw) / tau), rel=1e-9)
+
+def test_total_variance_interpolation():
+
+    surface = oqa.VolSurfaceSVI(surface_dict())
+    (t1, t2, t3), raws = surface.tau, list(RAW.values())
+    k = np.array([-0.3, 0.0, 0.2])
+    w = lambda raw: np.array([raw_svi(x, *raw) for x in k])
+
+    # linear in tau between slices at fixed log-forward-moneyness
+    tau = 0.3 * t1 + 0.7 * t2
+    assert surface.total_variance(k, [tau])[0] == pytest.approx(0.3 * w(raws[0]) + 0.7 * w(raws[1]), rel=1e-12)
+    # flat vol before the first and after the last slice
+    assert surface.total_variance(k, [0.5 * t1])[0] == pytest.approx(0.5 * w(raws[0]), rel=1e-12)
+    assert surface.total_variance(k, [2 * t3])[0] == pytest.approx(2 * w(raws[2]), rel=1e-12)
+
+def test_frozen():
+
+    surface = oqa.VolSurfaceSVI(surface_dict())
+    with pytest.raises(TypeError):
+        surface.surface["SVI-JW"]["2026-03-20"]["vol"] = 0.5
+    with pytest.raises(AttributeError):
+        surface.spotRef = 50.0
+    with pytest.raises(ValueError):
+        surface.paramsSVI["a"][0] = 0.0
+
+    # the source dict can change without touching the surface
+    source = surface_dict()
+    surface = oqa.VolSurfaceSVI(source)
+    before = surface.vol(100.0, "2026-06-18")
+    source["SVI-JW"]["2026-06-18"]["vol"] = 0.9
+    assert surface.surface["SVI-JW"]["2026-06-18"]["vol"] != 0.9
+    assert surface.vol(100.0, "2026-06-18") == before
+
+def test_pickle():
+
+    surface = oqa.VolSurfaceSVI(surface_dict())
+    copy = pickle.loads(pickle.dumps(surface))
+    assert copy.vol_grid([80.0, 100.0, 120.0], list(RAW.keys())) == pytest.approx(surface.vol_grid([80.0, 100.0, 120.0], list(RAW.keys())), rel=1e-15)
+    assert oqa.thaw_surface(copy.surface) == surface_dict()
+
+def test_no_slices():
+
+    with pytest.raises(ValueError):
+        oqa.VolSurfaceSVI({"anchor": 100.0, "anchorDate": VALUE_DATE, "SVI-JW": {}})